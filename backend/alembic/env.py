@@ -21,6 +21,13 @@ from app.models.meeting import Meeting
 from app.models.plan import Plan
 from app.models.service import Service, UserService
 from app.models.admin_request import AdminRequest
+from app.models.idea_cache import IdeaCacheEntry
+from app.models.file_blob import FileBlob
+from app.models.admin_stat import AdminStat, AdminStatDelta
+from app.models.idea_quota import IdeaQuota
+from app.models.rate_limit_bucket import RateLimitBucket
+from app.models.activity_log import ActivityLog, ActivityDailyRollup
+from app.services.activity_partitions import is_partition_table
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -38,6 +45,13 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 target_metadata = Base.metadata
 
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Monthly activity_logs partitions are managed at runtime, not by autogenerate"""
+    if type_ == "table" and reflected and is_partition_table(name):
+        return False
+    return True
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -64,6 +78,7 @@ def run_migrations_offline() -> None:
         dialect_opts={"paramstyle": "named"},
         compare_type=True,
         compare_server_default=True,
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -89,6 +104,7 @@ def run_migrations_online() -> None:
             target_metadata=target_metadata,
             compare_type=True,
             compare_server_default=True,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
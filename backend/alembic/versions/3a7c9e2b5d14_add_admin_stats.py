@@ -0,0 +1,39 @@
+"""add admin stats
+
+Revision ID: 3a7c9e2b5d14
+Revises: 8d4f2a6c1e57
+Create Date: 2026-10-17 22:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '3a7c9e2b5d14'
+down_revision: Union[str, None] = '8d4f2a6c1e57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('admin_stats',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('value', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    # Seed the counters from the existing rows
+    op.execute("""
+        INSERT INTO admin_stats (name, value, updated_at) VALUES
+        ('total_users', (SELECT count(*) FROM users), now() AT TIME ZONE 'utc'),
+        ('total_orders', (SELECT count(*) FROM orders), now() AT TIME ZONE 'utc'),
+        ('total_projects', (SELECT count(*) FROM projects), now() AT TIME ZONE 'utc'),
+        ('pending_synopsis', (SELECT count(*) FROM synopsis WHERE status = 'Pending'), now() AT TIME ZONE 'utc'),
+        ('pending_requests', (SELECT count(*) FROM admin_requests WHERE status = 'pending'), now() AT TIME ZONE 'utc')
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('admin_stats')
@@ -0,0 +1,36 @@
+"""add idea cache
+
+Revision ID: 5b1e7c9a2f30
+Revises: d24918ffed14
+Create Date: 2026-10-17 20:50:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '5b1e7c9a2f30'
+down_revision: Union[str, None] = 'd24918ffed14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('idea_cache',
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('topic', sa.Text(), nullable=False),
+    sa.Column('has_specifics', sa.Boolean(), nullable=False),
+    sa.Column('variants', postgresql.JSON(astext_type=sa.Text()), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index(op.f('ix_idea_cache_expires_at'), 'idea_cache', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_idea_cache_expires_at'), table_name='idea_cache')
+    op.drop_table('idea_cache')
@@ -0,0 +1,27 @@
+"""index created_at for cursor pagination
+
+Revision ID: 6e2d8b4f1a93
+Revises: 3a7c9e2b5d14
+Create Date: 2026-10-17 22:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '6e2d8b4f1a93'
+down_revision: Union[str, None] = '3a7c9e2b5d14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_admin_requests_created_at'), 'admin_requests', ['created_at'], unique=False)
+    op.create_index(op.f('ix_meetings_created_at'), 'meetings', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_meetings_created_at'), table_name='meetings')
+    op.drop_index(op.f('ix_admin_requests_created_at'), table_name='admin_requests')
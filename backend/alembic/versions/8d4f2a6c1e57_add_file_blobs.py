@@ -0,0 +1,35 @@
+"""add file blobs
+
+Revision ID: 8d4f2a6c1e57
+Revises: 5b1e7c9a2f30
+Create Date: 2026-10-17 21:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '8d4f2a6c1e57'
+down_revision: Union[str, None] = '5b1e7c9a2f30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('file_blobs',
+    sa.Column('path', sa.String(), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('size', sa.BigInteger(), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('path')
+    )
+    op.create_index(op.f('ix_file_blobs_sha256'), 'file_blobs', ['sha256'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_file_blobs_sha256'), table_name='file_blobs')
+    op.drop_table('file_blobs')
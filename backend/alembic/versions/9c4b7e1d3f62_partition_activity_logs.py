@@ -0,0 +1,134 @@
+"""partition activity_logs by month and add daily rollups
+
+Revision ID: 9c4b7e1d3f62
+Revises: 6e2d8b4f1a93
+Create Date: 2026-10-17 23:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4b7e1d3f62'
+down_revision: Union[str, None] = '6e2d8b4f1a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Monthly partitions created ahead of time (the app keeps extending this)
+PARTITIONS_AHEAD = 3
+
+LEGACY_INDEXES = [
+    'idx_activity_entity',
+    'idx_activity_status_action',
+    'idx_activity_user_action_date',
+    'ix_activity_logs_action',
+    'ix_activity_logs_created_at',
+    'ix_activity_logs_user_id',
+]
+
+COLUMNS = "id, user_id, action, entity_type, entity_id, details, ip_address, user_agent, status, error_message, created_at"
+
+
+def upgrade() -> None:
+    op.rename_table('activity_logs', 'activity_logs_legacy')
+    op.execute("ALTER TABLE activity_logs_legacy RENAME CONSTRAINT activity_logs_pkey TO activity_logs_legacy_pkey")
+    for index in LEGACY_INDEXES:
+        op.drop_index(index, table_name='activity_logs_legacy')
+
+    op.create_table('activity_logs',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=True),
+    sa.Column('action', sa.String(), nullable=False),
+    sa.Column('entity_type', sa.String(), nullable=True),
+    sa.Column('entity_id', sa.String(), nullable=True),
+    sa.Column('details', postgresql.JSON(astext_type=sa.Text()), nullable=True),
+    sa.Column('ip_address', sa.String(), nullable=True),
+    sa.Column('user_agent', sa.String(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('error_message', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id', 'created_at'),
+    postgresql_partition_by='RANGE (created_at)'
+    )
+    op.create_index('idx_activity_entity', 'activity_logs', ['entity_type', 'entity_id'], unique=False)
+    op.create_index('idx_activity_user_action_date', 'activity_logs', ['user_id', 'action', 'created_at'], unique=False)
+    op.create_index(op.f('ix_activity_logs_created_at'), 'activity_logs', ['created_at'], unique=False)
+
+    # One partition per month from the oldest existing row to PARTITIONS_AHEAD months out
+    op.execute(f"""
+        DO $$
+        DECLARE
+            month date := date_trunc('month', COALESCE(
+                (SELECT min(created_at) FROM activity_logs_legacy), now() AT TIME ZONE 'utc'))::date;
+            last_month date := (date_trunc('month', now() AT TIME ZONE 'utc') + interval '{PARTITIONS_AHEAD} months')::date;
+        BEGIN
+            WHILE month <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE IF NOT EXISTS %I PARTITION OF activity_logs FOR VALUES FROM (%L) TO (%L)',
+                    'activity_logs_y' || to_char(month, 'YYYY') || 'm' || to_char(month, 'MM'),
+                    month, (month + interval '1 month')::date
+                );
+                month := (month + interval '1 month')::date;
+            END LOOP;
+        END $$;
+    """)
+    op.execute(f"""
+        INSERT INTO activity_logs ({COLUMNS})
+        SELECT {COLUMNS.replace('created_at', "COALESCE(created_at, now() AT TIME ZONE 'utc')")}
+        FROM activity_logs_legacy
+    """)
+    op.drop_table('activity_logs_legacy')
+
+    op.create_table('activity_daily_rollups',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('action', sa.String(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('count', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('day', 'action', 'status')
+    )
+    op.execute("""
+        INSERT INTO activity_daily_rollups (day, action, status, count, updated_at)
+        SELECT created_at::date, action, COALESCE(status, 'unknown'), count(*), now() AT TIME ZONE 'utc'
+        FROM activity_logs
+        GROUP BY 1, 2, 3
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('activity_daily_rollups')
+
+    op.rename_table('activity_logs', 'activity_logs_partitioned')
+    op.execute("ALTER TABLE activity_logs_partitioned RENAME CONSTRAINT activity_logs_pkey TO activity_logs_partitioned_pkey")
+    for index in ('idx_activity_entity', 'idx_activity_user_action_date', 'ix_activity_logs_created_at'):
+        op.drop_index(index, table_name='activity_logs_partitioned')
+
+    op.create_table('activity_logs',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=True),
+    sa.Column('action', sa.String(), nullable=False),
+    sa.Column('entity_type', sa.String(), nullable=True),
+    sa.Column('entity_id', sa.String(), nullable=True),
+    sa.Column('details', postgresql.JSON(astext_type=sa.Text()), nullable=True),
+    sa.Column('ip_address', sa.String(), nullable=True),
+    sa.Column('user_agent', sa.String(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('error_message', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute(f"INSERT INTO activity_logs ({COLUMNS}) SELECT {COLUMNS} FROM activity_logs_partitioned")
+    # Dropping the parent drops every monthly partition with it
+    op.drop_table('activity_logs_partitioned')
+
+    op.create_index('idx_activity_entity', 'activity_logs', ['entity_type', 'entity_id'], unique=False)
+    op.create_index('idx_activity_status_action', 'activity_logs', ['status', 'action'], unique=False)
+    op.create_index('idx_activity_user_action_date', 'activity_logs', ['user_id', 'action', 'created_at'], unique=False)
+    op.create_index(op.f('ix_activity_logs_action'), 'activity_logs', ['action'], unique=False)
+    op.create_index(op.f('ix_activity_logs_created_at'), 'activity_logs', ['created_at'], unique=False)
+    op.create_index(op.f('ix_activity_logs_user_id'), 'activity_logs', ['user_id'], unique=False)
@@ -0,0 +1,34 @@
+"""make created_at not null on paginated tables
+
+Revision ID: a6d2f8e4c5b1
+Revises: f3b8d1c6a724
+Create Date: 2026-10-18 16:45:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d2f8e4c5b1'
+down_revision: Union[str, None] = 'f3b8d1c6a724'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tables listed newest-first with keyset cursors on (created_at, id)
+TABLES_WITH_UPDATED_AT = ['users', 'orders', 'projects', 'synopsis', 'meetings', 'admin_requests']
+TABLES = TABLES_WITH_UPDATED_AT + ['idea_submissions', 'approved_idea_submissions']
+
+
+def upgrade() -> None:
+    # Rows without a creation time sort as the oldest (or as old as their last update)
+    for table in TABLES:
+        fallback = "COALESCE(updated_at, TIMESTAMP '1970-01-01')" if table in TABLES_WITH_UPDATED_AT else "TIMESTAMP '1970-01-01'"
+        op.execute(f"UPDATE {table} SET created_at = {fallback} WHERE created_at IS NULL")
+        op.alter_column(table, 'created_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.alter_column(table, 'created_at', existing_type=sa.DateTime(), nullable=True)
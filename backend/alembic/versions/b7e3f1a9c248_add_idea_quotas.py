@@ -0,0 +1,43 @@
+"""add idea quotas
+
+Revision ID: b7e3f1a9c248
+Revises: 9c4b7e1d3f62
+Create Date: 2026-10-18 10:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e3f1a9c248'
+down_revision: Union[str, None] = '9c4b7e1d3f62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('idea_quotas',
+    sa.Column('kind', sa.String(), nullable=False),
+    sa.Column('subject', sa.String(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('kind', 'subject')
+    )
+    # Seed the counters from the existing submissions (phones normalized to digits, as in app.services.idea_quota)
+    op.execute(r"""
+        INSERT INTO idea_quotas (kind, subject, count, updated_at)
+        SELECT 'phone', COALESCE(NULLIF(regexp_replace(phone, '\D', '', 'g'), ''), btrim(phone)), count(*), now() AT TIME ZONE 'utc'
+        FROM idea_submissions
+        GROUP BY 2
+        UNION ALL
+        SELECT 'user', user_id, count(*), now() AT TIME ZONE 'utc'
+        FROM idea_submissions
+        WHERE user_id IS NOT NULL
+        GROUP BY user_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('idea_quotas')
@@ -0,0 +1,36 @@
+"""add admin stat deltas
+
+Revision ID: f3b8d1c6a724
+Revises: e5a2c8d4b913
+Create Date: 2026-10-18 16:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b8d1c6a724'
+down_revision: Union[str, None] = 'e5a2c8d4b913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('admin_stat_deltas',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('delta', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    # Keep pending changes in the totals
+    op.execute("""
+        UPDATE admin_stats SET value = admin_stats.value + d.delta
+        FROM (SELECT name, sum(delta) AS delta FROM admin_stat_deltas GROUP BY name) d
+        WHERE admin_stats.name = d.name
+    """)
+    op.drop_table('admin_stat_deltas')
@@ -15,6 +15,52 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 43200  # 30 days
     
+    # Password hashing (bcrypt runs on a dedicated thread pool)
+    BCRYPT_ROUNDS: int = 12  # hashes with another cost are upgraded on next login
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 64  # queued jobs beyond this get a 503
+    
+    # Per-worker auth caches used by get_current_user
+    AUTH_CACHE_ENABLED: bool = True
+    AUTH_USER_CACHE_TTL: int = 60  # seconds; bounds staleness across workers
+    AUTH_USER_CACHE_MAX: int = 5000
+    AUTH_TOKEN_CACHE_TTL: int = 300  # seconds (never past the token's exp)
+    AUTH_TOKEN_CACHE_MAX: int = 5000
+    
+    # Activity log: buffered in memory and bulk-inserted by a background task
+    ACTIVITY_LOG_BATCH_SIZE: int = 200  # rows per INSERT
+    ACTIVITY_LOG_FLUSH_INTERVAL_MS: int = 500  # max time an entry waits for its batch
+    ACTIVITY_LOG_MAX_QUEUE: int = 10000
+    ACTIVITY_LOG_OVERFLOW: str = "drop_oldest"  # or "drop_newest" when the queue is full
+    ACTIVITY_LOG_RETENTION_MONTHS: int = 12  # older monthly partitions are dropped (after rollup)
+    ACTIVITY_LOG_PARTITIONS_AHEAD: int = 3  # future monthly partitions kept ready
+    ACTIVITY_LOG_MAINTENANCE_INTERVAL_HOURS: float = 6.0
+    
+    # Prometheus-style /metrics endpoint (per worker)
+    METRICS_ENABLED: bool = True
+    METRICS_TOKEN: str = ""  # when set, scrapes must send Authorization: Bearer <token>
+    
+    # Per-request query budgets / N+1 detection (see app.core.query_budget)
+    QUERY_BUDGET_MODE: str = "off"  # "log" in development, "raise" in CI
+    QUERY_BUDGET_DEFAULT: int = 20  # statements allowed for routes without @query_budget
+    QUERY_BUDGET_DUPLICATE_THRESHOLD: int = 5  # same statement this often in one request = likely N+1
+    
+    # Admin dashboard counters (see app.services.admin_stats)
+    ADMIN_STATS_COMPACT_AFTER: int = 1000  # pending delta rows folded into the totals on the next dashboard read
+    
+    # Rate limits for the public endpoints (see app.core.rate_limit): "<requests>/<second|minute|hour|day>"
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"  # "memory" (per worker) or "postgres" (shared by all workers)
+    RATE_LIMIT_MAX_BUCKETS: int = 100000  # memory backend: idle buckets beyond this are evicted
+    RATE_LIMIT_IDEA_GENERATE: str = "10/minute"  # per user, or per IP for guests
+    RATE_LIMIT_IDEA_SUBMIT: str = "20/hour"  # per IP/user and per phone number
+    RATE_LIMIT_APPROVED_IDEA_SUBMIT: str = "10/hour"  # per IP/user and per phone number
+    TRUSTED_PROXY_HOPS: int = 0  # proxies in front of the app that append to X-Forwarded-For (0 = key guests on the TCP peer)
+    
+    # Load shedding: concurrent LLM generations per worker (0 = unlimited)
+    LLM_MAX_IN_FLIGHT: int = 32
+    LLM_MAX_IN_FLIGHT_ANONYMOUS: int = 16  # guests are refused first, keeping the rest for logged-in students
+    
     # CORS
     FRONTEND_URL: str
     
@@ -22,13 +68,63 @@ class Settings(BaseSettings):
     MAX_FILE_SIZE: int = 10485760  # 10MB
     ALLOWED_EXTENSIONS: str = "pdf,zip,jpg,jpeg,png"
     
+    # File storage: "local" (worker disk) or "s3" (any S3-compatible store, e.g. MinIO)
+    STORAGE_BACKEND: str = "local"
+    STORAGE_PRESIGNED_DOWNLOADS: bool = True  # s3: redirect downloads to a presigned URL instead of proxying
+    S3_ENDPOINT_URL: str = ""
+    S3_PUBLIC_ENDPOINT_URL: str = ""  # endpoint used in presigned URLs, if browsers reach it differently
+    S3_BUCKET: str = ""
+    S3_REGION: str = "us-east-1"
+    S3_ACCESS_KEY_ID: str = ""
+    S3_SECRET_ACCESS_KEY: str = ""
+    S3_PRESIGN_EXPIRY: int = 300  # seconds
+    DOWNLOAD_BLACKBOOK_MAX_AGE: int = 3600  # seconds browsers may reuse a downloaded BlackBook without revalidating
+    
     # X.AI Grok API
     XAI_API_KEY: str = ""
+    XAI_BASE_URL: str = "https://api.x.ai/v1"  # any OpenAI-compatible endpoint, e.g. benchmarks/llm_stub.py
     XAI_MODEL: str = "grok-4-1-fast-non-reasoning"
+    XAI_TIMEOUT: float = 30.0
     
     # Groq API (Fallback)
     GROQ_API_KEY: str = ""
+    GROQ_BASE_URL: str = "https://api.groq.com/openai/v1"
     GROQ_MODEL: str = "llama-3.3-70b-versatile"
+    GROQ_TIMEOUT: float = 30.0
+    
+    # Shared LLM HTTP client pool (per provider, per worker)
+    LLM_CONNECT_TIMEOUT: float = 5.0
+    LLM_MAX_CONNECTIONS: int = 20
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    LLM_KEEPALIVE_EXPIRY: float = 60.0
+    
+    # LLM gateway: circuit breaker and hedged requests
+    LLM_BREAKER_FAILURE_THRESHOLD: int = 3  # consecutive failures before a provider is skipped
+    LLM_BREAKER_COOLDOWN: float = 30.0  # seconds a tripped provider is skipped
+    LLM_HEDGE_ENABLED: bool = True
+    LLM_HEDGE_DEFAULT_DELAY: float = 4.0  # used until enough latency samples exist
+    LLM_HEDGE_MIN_DELAY: float = 1.0
+    LLM_HEDGE_MAX_DELAY: float = 10.0
+    LLM_HEDGE_MIN_SAMPLES: int = 20
+    LLM_LATENCY_WINDOW: int = 200  # recent calls kept per provider for p50/p95
+    
+    # Idea generation response cache
+    IDEA_CACHE_ENABLED: bool = True
+    IDEA_CACHE_MAX_ENTRIES: int = 1000  # topics kept in the per-worker LRU
+    IDEA_CACHE_TTL: int = 21600  # seconds (6 hours)
+    IDEA_CACHE_VARIANTS: int = 3  # distinct cached ideas served per topic before generating a fresh one
+    IDEA_CACHE_SHARED: bool = False  # also share entries across workers via the idea_cache table
+    IDEA_QUOTA_CACHE_TTL: int = 30  # seconds a worker serves /count from memory; limits are always enforced on the row
+    IDEA_QUOTA_CACHE_MAX: int = 10000
+    
+    # Chatbot context window (see app.services.chat_context); token counts are estimates
+    CHAT_CONTEXT_TOKENS: int = 1500  # prompt budget for plans not listed below
+    CHAT_CONTEXT_TOKENS_BY_PLAN: str = "Basic:1500,Standard:2500,Premium:4000"
+    CHAT_SUMMARY_TRIGGER: float = 0.75  # fraction of the budget unsummarized turns may fill before compaction
+    CHAT_KEEP_RECENT_MESSAGES: int = 4  # newest messages always sent verbatim, never summarized
+    CHAT_SUMMARY_MAX_TOKENS: int = 250
+    CHAT_SESSION_CACHE_MAX: int = 2000  # active sessions whose transcript a worker keeps for delta requests
+    CHAT_SESSION_CACHE_TTL: int = 1800  # seconds an idle session stays cached
     
     # Admin
     ADMIN_EMAIL: str
@@ -1,16 +1,35 @@
 from sqlalchemy import create_engine, pool, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.metrics import DB_POOL_CHECKOUT, record_query
+from app.core.query_budget import record_statement
+from datetime import datetime, timedelta, timezone
 import logging
 import time
 
 logger = logging.getLogger(__name__)
 
+class TimedQueuePool(pool.QueuePool):
+    """QueuePool recording how long each checkout waited for a connection"""
+    metrics_label = "sync"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT.observe(time.perf_counter() - start, engine=self.metrics_label)
+
+class TimedAsyncQueuePool(TimedQueuePool, pool.AsyncAdaptedQueuePool):
+    metrics_label = "async"
+
 # Create engine optimized for Neon PostgreSQL (cloud-native)
 engine = create_engine(
     settings.DATABASE_URL,
-    poolclass=pool.QueuePool,
+    poolclass=TimedQueuePool,
     pool_size=5,  # Neon handles pooling, keep this conservative
     max_overflow=10,
     pool_timeout=30,
@@ -23,19 +42,86 @@ engine = create_engine(
     }
 )
 
-# Log slow queries (>500ms) for performance monitoring
-@event.listens_for(engine, "before_cursor_execute")
+def _async_database_url(url: str):
+    """
+    Translate the libpq-style DATABASE_URL into an asyncpg URL.
+    asyncpg does not understand sslmode/channel_binding query params (Neon adds both).
+    """
+    url = make_url(url).set(drivername="postgresql+asyncpg")
+    query = dict(url.query)
+    sslmode = query.pop("sslmode", None)
+    query.pop("channel_binding", None)
+    if sslmode and sslmode != "disable":
+        query["ssl"] = sslmode
+    return url.set(query=query)
+
+# Async engine used by the request handlers so queries never block the event loop
+async_engine = create_async_engine(
+    _async_database_url(settings.DATABASE_URL),
+    poolclass=TimedAsyncQueuePool,
+    pool_size=5,
+    max_overflow=10,
+    pool_timeout=30,
+    pool_recycle=300,
+    pool_pre_ping=True,
+    echo=False,
+    connect_args={
+        "timeout": 10,
+        "server_settings": {"timezone": "utc"}
+    }
+)
+
+# The models write timezone-aware UTC datetimes into TIMESTAMP WITHOUT TIME ZONE
+# columns. psycopg2 lets Postgres drop the offset; asyncpg refuses, so encode them
+# (and decode results) as naive UTC the same way.
+PG_EPOCH = datetime(2000, 1, 1)
+
+def _encode_timestamp(value: datetime):
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return ((value - PG_EPOCH) // timedelta(microseconds=1),)
+
+def _decode_timestamp(value) -> datetime:
+    return PG_EPOCH + timedelta(microseconds=value[0])
+
+@event.listens_for(async_engine.sync_engine, "connect")
+def register_timestamp_codec(dbapi_connection, connection_record):
+    dbapi_connection.run_async(
+        lambda conn: conn.set_type_codec(
+            "timestamp",
+            schema="pg_catalog",
+            encoder=_encode_timestamp,
+            decoder=_decode_timestamp,
+            format="tuple"
+        )
+    )
+
+# Count and time every query (see app.core.metrics), check it against the
+# request's query budget (app.core.query_budget) and log slow ones (>500ms)
 def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
-    conn.info.setdefault('query_start_time', []).append(time.time())
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
 
-@event.listens_for(engine, "after_cursor_execute")
 def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
-    total = time.time() - conn.info['query_start_time'].pop(-1)
+    total = time.perf_counter() - conn.info['query_start_time'].pop(-1)
+    record_query(total)
+    record_statement(statement)
     if total > 0.5:
         logger.warning(f"Slow query ({total:.2f}s): {statement[:200]}")
 
+for _engine in (engine, async_engine.sync_engine):
+    event.listen(_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(_engine, "after_cursor_execute", after_cursor_execute)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# expire_on_commit=False: attribute access after commit would otherwise trigger
+# an implicit (and, under asyncio, illegal) lazy refresh
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 Base = declarative_base()
 
 def get_db():
@@ -51,3 +137,15 @@ def get_db():
         raise
     finally:
         db.close()
+
+async def get_async_db():
+    """
+    Async database session dependency for `async def` routes
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception as e:
+            logger.error(f"Database session error: {str(e)}")
+            await db.rollback()
+            raise
@@ -0,0 +1,271 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+A small registry of counters, gauges and histograms (no client library
+needed) rendered by GET /metrics. MetricsMiddleware times every request
+under its route template (so /api/orders/{order_id} is one series, not one
+per id), tracks in-flight requests, and reports the DB queries and DB time
+each request spent, collected by the cursor hooks in app.core.database
+through the request_db_stats context variable. Pool checkout wait, LLM
+provider latency, upload bytes and rate limit rejections are recorded where
+they happen.
+
+Values are per worker process; Prometheus sums the workers' series.
+"""
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import bisect
+import threading
+import time
+
+# Prometheus client defaults (seconds)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Per-request query counts
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+# Upstream LLM calls take seconds, not milliseconds
+LLM_BUCKETS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+# Pool checkouts are sub-millisecond unless the pool is exhausted
+POOL_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        # Cursor hooks of the sync engine run on worker threads
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        header = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        return "\n".join(header + self.samples())
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}" for key, value in items]
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: str):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+@dataclass
+class _HistogramSeries:
+    bucket_counts: List[int]
+    count: int = 0
+    total: float = 0.0
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, _HistogramSeries] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _HistogramSeries(bucket_counts=[0] * len(self.buckets))
+            if index < len(self.buckets):
+                series.bucket_counts[index] += 1
+            series.count += 1
+            series.total += value
+
+    def snapshot(self, **labels: str) -> Tuple[int, float]:
+        """(count, sum) of one series"""
+        series = self._series.get(self._key(labels))
+        return (series.count, series.total) if series else (0, 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(
+                (key, list(series.bucket_counts), series.count, series.total)
+                for key, series in self._series.items()
+            )
+        lines = []
+        for key, bucket_counts, count, total in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                le = _format_labels(self.label_names, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            le = _format_labels(self.label_names, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {count}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labels: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labels))
+
+    def histogram(self, name: str, documentation: str, labels: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+registry = MetricsRegistry()
+
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total", "HTTP requests by route template, method and status", ("method", "route", "status")
+)
+HTTP_LATENCY = registry.histogram(
+    "http_request_duration_seconds", "Time to complete an HTTP request, including streamed bodies", ("method", "route")
+)
+HTTP_IN_FLIGHT = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served", ("method",)
+)
+REQUEST_DB_QUERIES = registry.histogram(
+    "http_request_db_queries", "DB queries executed per HTTP request", ("method", "route"), QUERY_COUNT_BUCKETS
+)
+REQUEST_DB_TIME = registry.histogram(
+    "http_request_db_seconds", "Time spent in DB queries per HTTP request", ("method", "route")
+)
+DB_QUERIES = registry.counter("db_queries_total", "DB queries executed (requests and background tasks)")
+DB_QUERY_TIME = registry.counter("db_query_seconds_total", "Time spent in DB queries")
+DB_POOL_CHECKOUT = registry.histogram(
+    "db_pool_checkout_seconds", "Time to get a connection from the pool (waiting and connecting)", ("engine",), POOL_BUCKETS
+)
+LLM_LATENCY = registry.histogram(
+    "llm_request_duration_seconds", "LLM provider call latency", ("provider", "mode", "outcome"), LLM_BUCKETS
+)
+QUERY_BUDGET_VIOLATIONS = registry.counter(
+    "query_budget_violations_total", "Requests over their query budget or with repeated statements", ("route",)
+)
+RATE_LIMIT_REJECTIONS = registry.counter(
+    "rate_limit_rejections_total", "Requests answered 429 by a rate limit policy", ("policy", "key")
+)
+LLM_SHED = registry.counter(
+    "llm_load_shed_total", "LLM requests refused with 503 because the worker's LLM slots were full", ("caller",)
+)
+LLM_IN_FLIGHT = registry.gauge("llm_requests_in_flight", "LLM generations currently holding a slot")
+UPLOAD_BYTES = registry.counter("upload_bytes_total", "Bytes received in file uploads", ("kind",))
+UPLOADS = registry.counter("uploads_total", "File uploads received", ("kind",))
+
+@dataclass
+class RequestDBStats:
+    queries: int = 0
+    seconds: float = 0.0
+
+request_db_stats: ContextVar[Optional[RequestDBStats]] = ContextVar("request_db_stats", default=None)
+
+def record_query(elapsed: float):
+    """Called by the after_cursor_execute hook for every statement"""
+    DB_QUERIES.inc()
+    DB_QUERY_TIME.inc(elapsed)
+    stats = request_db_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += elapsed
+
+def _route_label(scope: Scope) -> str:
+    route = scope.get("route")
+    # Unmatched paths are lumped together to keep the series count bounded
+    return getattr(route, "path", None) or "unmatched"
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (BaseHTTPMiddleware would run the endpoint in
+    another task, hiding its context variables) recording latency,
+    status, in-flight requests and per-request DB usage.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        stats = RequestDBStats()
+        token = request_db_stats.set(stats)
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc(method=method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            request_db_stats.reset(token)
+            HTTP_IN_FLIGHT.dec(method=method)
+            route = _route_label(scope)
+            HTTP_REQUESTS.inc(method=method, route=route, status=str(status))
+            HTTP_LATENCY.observe(elapsed, method=method, route=route)
+            REQUEST_DB_QUERIES.observe(stats.queries, method=method, route=route)
+            REQUEST_DB_TIME.observe(stats.seconds, method=method, route=route)
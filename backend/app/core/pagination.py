@@ -0,0 +1,69 @@
+"""
+Offset and keyset (cursor) pagination for list endpoints
+
+Without a cursor, endpoints keep their OFFSET/LIMIT behaviour and return a
+plain list (now in a deterministic order). With ?cursor= (empty for the
+first page) they return a Page envelope and seek past the last row seen on
+(created_at, id) using the created_at index, so page 500 costs the same as
+page one.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Tuple, Union
+from fastapi import HTTPException, status
+from sqlalchemy import Select, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas.pagination import Page
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), str(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    model: Any,
+    serialize: Callable[[Any], Any],
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None
+) -> Union[List[Any], Page]:
+    """
+    Run a newest-first list query in offset mode (cursor is None) or keyset
+    mode. `model` must have a NOT NULL created_at column (a NULL could
+    neither be encoded in a cursor nor sought past) and an id column;
+    `serialize` turns a row into its response item.
+    """
+    query = query.order_by(model.created_at.desc(), model.id.desc())
+
+    if cursor is None:
+        rows = (await db.scalars(query.offset(skip).limit(limit))).all()
+        return [serialize(row) for row in rows]
+
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        # created_at <= x keeps the seek on the created_at index; id breaks ties
+        query = query.where(and_(
+            model.created_at <= created_at,
+            or_(model.created_at < created_at, model.id < row_id)
+        ))
+
+    # One extra row tells whether another page exists
+    rows = (await db.scalars(query.limit(limit + 1))).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return Page(items=[serialize(row) for row in rows], next_cursor=next_cursor)
@@ -0,0 +1,177 @@
+"""
+Per-request query budgets and N+1 detection for development and CI.
+
+Every statement seen by the after_cursor_execute hook in app.core.database
+is counted against the current request's budget: the route's own, declared
+with @query_budget(n) under the @router decorator, or QUERY_BUDGET_DEFAULT.
+The same SQL text executed QUERY_BUDGET_DUPLICATE_THRESHOLD times in one
+request is reported as a likely N+1 (a lazy load or a per-row query in a
+loop). QUERY_BUDGET_MODE picks what happens on a violation:
+
+- "off": nothing is tracked (the production default);
+- "log": a warning naming the route and the most repeated statements;
+- "raise": the offending statement raises QueryBudgetExceeded, so the
+  request fails with a 500 and check_query_budgets.py (or any CI run with
+  the mode set) catches the regression before deploy.
+
+track_queries() applies the same accounting to a block of code outside
+a request, e.g. in a script.
+"""
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core.config import settings
+from app.core.exceptions import AppException
+from app.core.metrics import QUERY_BUDGET_VIOLATIONS
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+_BUDGET_ATTRIBUTE = "__query_budget__"
+_WHITESPACE = re.compile(r"\s+")
+
+class QueryBudgetExceeded(AppException):
+    """A request ran more queries than its budget, or repeated one statement too often"""
+    def __init__(self, message: str, details: dict = None):
+        super().__init__(message, 500, details)
+
+def query_budget(max_queries: int) -> Callable:
+    """Declare how many statements a route may run (place under @router.get/post)"""
+    def decorator(endpoint: Callable) -> Callable:
+        setattr(endpoint, _BUDGET_ATTRIBUTE, max_queries)
+        return endpoint
+    return decorator
+
+def _fingerprint(statement: str) -> str:
+    # Statements are already parametrized, so only layout needs normalizing
+    return _WHITESPACE.sub(" ", statement).strip()
+
+@dataclass
+class QueryTracker:
+    label: str
+    max_queries: Optional[int] = None
+    duplicate_threshold: int = 0
+    raise_on_violation: bool = False
+    queries: int = 0
+    statements: Counter = field(default_factory=Counter)
+    violation: Optional[str] = None
+    # Background tasks started inside a request inherit its tracker; once the
+    # request is over their statements are no longer charged to it
+    finished: bool = False
+
+    def duplicates(self, limit: int = 3) -> List[Tuple[str, int]]:
+        """Most repeated statements at or above the duplicate threshold"""
+        threshold = max(self.duplicate_threshold, 2)
+        return [(sql, count) for sql, count in self.statements.most_common(limit) if count >= threshold]
+
+    def record(self, statement: str):
+        self.queries += 1
+        fingerprint = _fingerprint(statement)
+        self.statements[fingerprint] += 1
+        if self.violation is not None:
+            return
+        if self.max_queries is not None and self.queries > self.max_queries:
+            self.violation = f"{self.label} exceeded its budget of {self.max_queries} queries"
+        elif self.duplicate_threshold and self.statements[fingerprint] >= self.duplicate_threshold:
+            self.violation = f"{self.label} ran the same statement {self.statements[fingerprint]} times (likely N+1)"
+        else:
+            return
+        if self.raise_on_violation:
+            raise QueryBudgetExceeded(self.violation, self.report())
+
+    def report(self) -> dict:
+        return {
+            "queries": self.queries,
+            "budget": self.max_queries,
+            "repeated": [{"count": count, "sql": sql[:200]} for sql, count in self.duplicates()],
+        }
+
+    def assert_within(self, max_queries: Optional[int] = None):
+        """Raise QueryBudgetExceeded if the block broke its budget (for scripts and CI)"""
+        limit = self.max_queries if max_queries is None else max_queries
+        if self.violation is None and limit is not None and self.queries > limit:
+            self.violation = f"{self.label} exceeded its budget of {limit} queries"
+        if self.violation is not None:
+            raise QueryBudgetExceeded(self.violation, self.report())
+
+_current_tracker: ContextVar[Optional[QueryTracker]] = ContextVar("query_budget_tracker", default=None)
+
+def record_statement(statement: str):
+    """Called by the after_cursor_execute hook for every statement"""
+    tracker = _current_tracker.get()
+    if tracker is not None and not tracker.finished:
+        tracker.record(statement)
+
+@contextmanager
+def track_queries(
+    label: str = "block",
+    max_queries: Optional[int] = None,
+    duplicate_threshold: Optional[int] = None
+) -> Iterator[QueryTracker]:
+    """Count the statements run inside the block; call assert_within() afterwards to enforce"""
+    tracker = QueryTracker(
+        label=label,
+        max_queries=max_queries,
+        duplicate_threshold=settings.QUERY_BUDGET_DUPLICATE_THRESHOLD if duplicate_threshold is None else duplicate_threshold
+    )
+    token = _current_tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        tracker.finished = True
+        _current_tracker.reset(token)
+
+def _route_budget(scope: Scope) -> Tuple[str, Optional[int]]:
+    route = scope.get("route")
+    if route is None:
+        return scope["path"], None
+    budget = getattr(getattr(route, "endpoint", None), _BUDGET_ATTRIBUTE, settings.QUERY_BUDGET_DEFAULT)
+    return f"{scope['method']} {route.path}", budget
+
+def _route_path(scope: Scope) -> str:
+    return getattr(scope.get("route"), "path", None) or "unmatched"
+
+class _RouteTracker(QueryTracker):
+    """Tracker whose route (and so budget) is resolved once routing has matched"""
+
+    def __init__(self, scope: Scope, **kwargs: Any):
+        super().__init__(label=scope["path"], **kwargs)
+        self.scope = scope
+        self.resolved = False
+
+    def record(self, statement: str):
+        if not self.resolved and "route" in self.scope:
+            self.label, self.max_queries = _route_budget(self.scope)
+            self.resolved = True
+        super().record(statement)
+
+class QueryBudgetMiddleware:
+    """Pure ASGI middleware tracking each HTTP request's statements (enabled unless QUERY_BUDGET_MODE=off)"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        tracker = _RouteTracker(
+            scope,
+            duplicate_threshold=settings.QUERY_BUDGET_DUPLICATE_THRESHOLD,
+            raise_on_violation=settings.QUERY_BUDGET_MODE == "raise"
+        )
+        token = _current_tracker.set(tracker)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            tracker.finished = True
+            _current_tracker.reset(token)
+            if tracker.violation is not None:
+                # Counted as well as logged: routes that swallow the exception still show up
+                QUERY_BUDGET_VIOLATIONS.inc(route=_route_path(scope))
+                logger.warning(f"Query budget: {tracker.violation} {tracker.report()}")
@@ -0,0 +1,284 @@
+"""
+Rate limiting and load shedding for the public LLM endpoints.
+
+Rate limits are token buckets: a policy ("10/minute") allows a burst of
+10 requests and refills one token every 6 seconds. Routes opt in with
+Depends(rate_limit("<policy>")), which keys the bucket by user for a valid
+bearer token and by client IP otherwise, so logged-in students never share
+a bucket with an anonymous script on the same network. Handlers can charge
+extra keys (e.g. the phone number in a submission) with
+rate_limiter.hit(). A refused call gets a 429 with Retry-After.
+
+Buckets live in this worker's memory (RATE_LIMIT_BACKEND=memory), or in
+the rate_limit_buckets table (postgres), where one conditional upsert
+refills and takes a token atomically, so all workers share the limit.
+
+llm_slots caps the LLM generations a worker runs at once. Guests are
+refused with a 503 once LLM_MAX_IN_FLIGHT_ANONYMOUS slots are busy, while
+logged-in students can still use the remaining slots up to
+LLM_MAX_IN_FLIGHT.
+"""
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Callable, Dict, Optional, Tuple
+from fastapi import HTTPException, Request, status
+from sqlalchemy import delete, text
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import LLM_IN_FLIGHT, LLM_SHED, RATE_LIMIT_REJECTIONS
+from app.core.security import decode_access_token
+from app.models.rate_limit_bucket import RateLimitBucket
+import logging
+import math
+import time
+
+logger = logging.getLogger(__name__)
+
+# Policy name -> setting holding its "<requests>/<period>" spec
+POLICIES: Dict[str, str] = {
+    "idea_generate": "RATE_LIMIT_IDEA_GENERATE",
+    "idea_submit": "RATE_LIMIT_IDEA_SUBMIT",
+    "approved_idea_submit": "RATE_LIMIT_APPROVED_IDEA_SUBMIT",
+}
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+SHED_RETRY_AFTER = 5  # seconds
+
+class RateLimitExceeded(HTTPException):
+    def __init__(self, retry_after: float):
+        seconds = max(1, math.ceil(retry_after))
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Too many requests, please try again in {seconds} seconds",
+            headers={"Retry-After": str(seconds)}
+        )
+
+@dataclass(frozen=True)
+class RatePolicy:
+    name: str
+    capacity: float  # burst size
+    refill_per_second: float
+
+    @classmethod
+    def parse(cls, name: str, spec: str) -> "RatePolicy":
+        try:
+            count, _, period = spec.strip().partition("/")
+            requests = float(count)
+            seconds = PERIODS[period.strip().rstrip("s") or "second"]
+        except (KeyError, ValueError):
+            raise ValueError(f"Invalid rate limit {spec!r} for {name} (expected e.g. '10/minute')")
+        if requests <= 0:
+            raise ValueError(f"Invalid rate limit {spec!r} for {name} (must allow at least one request)")
+        return cls(name, requests, requests / seconds)
+
+    @property
+    def refill_seconds(self) -> float:
+        """Time an empty bucket takes to fill up (an idle bucket older than this is full)"""
+        return self.capacity / self.refill_per_second
+
+def get_policy(name: str) -> RatePolicy:
+    return RatePolicy.parse(name, getattr(settings, POLICIES[name]))
+
+class MemoryBuckets:
+    """Per-worker buckets (single event loop: take() never awaits, so it is atomic)"""
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, policy: RatePolicy) -> float:
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (policy.capacity, now))
+        tokens = min(policy.capacity, tokens + (now - updated) * policy.refill_per_second)
+        if tokens >= 1:
+            self._buckets[key] = (tokens - 1, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_entries:
+                self._buckets.popitem(last=False)
+            return 0.0
+        self._buckets[key] = (tokens, now)
+        return (1 - tokens) / policy.refill_per_second
+
+    def __len__(self):
+        return len(self._buckets)
+
+class PostgresBuckets:
+    """Buckets in rate_limit_buckets, shared by every worker"""
+    PURGE_INTERVAL = 600  # seconds between deletions of idle (full) buckets
+
+    # Refill by the elapsed time, then take a token only if one is available
+    _TAKE = text("""
+        INSERT INTO rate_limit_buckets AS b (key, tokens, updated_at)
+        VALUES (:key, :capacity - 1, now() AT TIME ZONE 'utc')
+        ON CONFLICT (key) DO UPDATE SET
+            tokens = LEAST(:capacity, b.tokens + EXTRACT(EPOCH FROM (now() AT TIME ZONE 'utc') - b.updated_at) * :rate) - 1,
+            updated_at = now() AT TIME ZONE 'utc'
+        WHERE LEAST(:capacity, b.tokens + EXTRACT(EPOCH FROM (now() AT TIME ZONE 'utc') - b.updated_at) * :rate) >= 1
+        RETURNING b.tokens
+    """)
+    _AVAILABLE = text("""
+        SELECT LEAST(:capacity, tokens + EXTRACT(EPOCH FROM (now() AT TIME ZONE 'utc') - updated_at) * :rate)
+        FROM rate_limit_buckets WHERE key = :key
+    """)
+
+    def __init__(self):
+        self._last_purge = time.monotonic()
+
+    async def take(self, key: str, policy: RatePolicy) -> float:
+        params = {"key": key, "capacity": policy.capacity, "rate": policy.refill_per_second}
+        # Own short transaction, so the token is spent even if the request later fails
+        async with AsyncSessionLocal() as db:
+            taken = (await db.execute(self._TAKE, params)).scalar_one_or_none()
+            if taken is not None:
+                await db.commit()
+                await self._maybe_purge(db)
+                return 0.0
+            available = await db.scalar(self._AVAILABLE, params) or 0.0
+            await db.rollback()
+        return (1 - available) / policy.refill_per_second
+
+    async def _maybe_purge(self, db):
+        if time.monotonic() - self._last_purge < self.PURGE_INTERVAL:
+            return
+        self._last_purge = time.monotonic()
+        idle = max(get_policy(name).refill_seconds for name in POLICIES)
+        cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=idle)
+        result = await db.execute(delete(RateLimitBucket).where(RateLimitBucket.updated_at < cutoff))
+        await db.commit()
+        if result.rowcount:
+            logger.info(f"Purged {result.rowcount} idle rate limit buckets")
+
+class RateLimiter:
+    def __init__(self):
+        self._backend = None
+        self.allowed = 0
+        self.rejected: Dict[str, int] = {}
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            if settings.RATE_LIMIT_BACKEND == "postgres":
+                self._backend = PostgresBuckets()
+            else:
+                self._backend = MemoryBuckets(settings.RATE_LIMIT_MAX_BUCKETS)
+        return self._backend
+
+    async def hit(self, policy_name: str, identity: str):
+        """Spend one token of `identity`'s bucket (e.g. "ip:1.2.3.4") or raise RateLimitExceeded"""
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        policy = get_policy(policy_name)
+        retry_after = await self.backend.take(f"{policy.name}:{identity}", policy)
+        if retry_after <= 0:
+            self.allowed += 1
+            return
+        self.rejected[policy.name] = self.rejected.get(policy.name, 0) + 1
+        RATE_LIMIT_REJECTIONS.inc(policy=policy.name, key=identity.partition(":")[0])
+        logger.warning(f"Rate limit {policy.name} hit by {identity}, retry after {retry_after:.1f}s")
+        raise RateLimitExceeded(retry_after)
+
+    def get_metrics(self) -> dict:
+        return {
+            "enabled": settings.RATE_LIMIT_ENABLED,
+            "backend": settings.RATE_LIMIT_BACKEND,
+            "policies": {name: getattr(settings, setting) for name, setting in POLICIES.items()},
+            "allowed": self.allowed,
+            "rejected": dict(self.rejected),
+            "memory_buckets": len(self._backend) if isinstance(self._backend, MemoryBuckets) else None,
+            "llm_slots": llm_slots.get_metrics()
+        }
+
+rate_limiter = RateLimiter()
+
+def client_address(request: Request) -> Optional[str]:
+    """
+    Address guests are rate limited by. X-Forwarded-For entries left of the
+    ones our own proxies appended are whatever the client sent, so only the
+    entry added by the outermost of TRUSTED_PROXY_HOPS proxies is used, and
+    with no trusted proxies (or too few entries) the TCP peer.
+    """
+    hops = settings.TRUSTED_PROXY_HOPS
+    if hops > 0:
+        forwarded = [
+            address.strip()
+            for header in request.headers.getlist("x-forwarded-for")
+            for address in header.split(",")
+            if address.strip()
+        ]
+        if len(forwarded) >= hops:
+            return forwarded[-hops]
+    return request.client.host if request.client else None
+
+def requester_identity(request: Request) -> str:
+    """user:<id> for a valid bearer token, otherwise ip:<client address>"""
+    authorization = request.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        try:
+            user_id = decode_access_token(authorization[7:].strip()).get("sub")
+            if user_id:
+                return f"user:{user_id}"
+        except HTTPException:
+            pass
+    return f"ip:{client_address(request) or 'unknown'}"
+
+def rate_limit(policy_name: str) -> Callable:
+    """Route dependency charging the caller's bucket of a policy in POLICIES"""
+    if policy_name not in POLICIES:
+        raise ValueError(f"Unknown rate limit policy {policy_name!r}")
+
+    async def dependency(request: Request):
+        await rate_limiter.hit(policy_name, requester_identity(request))
+    return dependency
+
+class LLMSlots:
+    """Concurrent LLM generations in this worker, with slots reserved for logged-in users"""
+    def __init__(self):
+        self.in_flight = 0
+        self.shed: Dict[str, int] = {"guest": 0, "user": 0}
+
+    def _limit(self, authenticated: bool) -> int:
+        return settings.LLM_MAX_IN_FLIGHT if authenticated else settings.LLM_MAX_IN_FLIGHT_ANONYMOUS
+
+    def admits(self, authenticated: bool) -> bool:
+        limit = self._limit(authenticated)
+        return limit <= 0 or self.in_flight < limit
+
+    def check(self, authenticated: bool):
+        """Raise a 503 if a generation would be refused right now"""
+        if self.admits(authenticated):
+            return
+        caller = "user" if authenticated else "guest"
+        self.shed[caller] += 1
+        LLM_SHED.inc(caller=caller)
+        logger.warning(f"Shedding {caller} LLM request ({self.in_flight} generations in flight)")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="AI service is busy, please try again in a moment",
+            headers={"Retry-After": str(SHED_RETRY_AFTER)}
+        )
+
+    @asynccontextmanager
+    async def slot(self, authenticated: bool) -> AsyncIterator[None]:
+        self.check(authenticated)
+        self.in_flight += 1
+        LLM_IN_FLIGHT.inc()
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            LLM_IN_FLIGHT.dec()
+
+    def get_metrics(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "max": settings.LLM_MAX_IN_FLIGHT,
+            "max_anonymous": settings.LLM_MAX_IN_FLIGHT_ANONYMOUS,
+            "shed": dict(self.shed)
+        }
+
+llm_slots = LLMSlots()
+
+def is_authenticated(identity: Optional[str]) -> bool:
+    return bool(identity) and identity.startswith("user:")
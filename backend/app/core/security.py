@@ -4,10 +4,13 @@ from jose import JWTError, jwt
 import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.models.user import User
+from app.services import principal_cache
+from app.services.password_pool import run_password_job
 
 security = HTTPBearer()
 
@@ -23,19 +26,13 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         return False
 
 def get_password_hash(password: str) -> str:
-    # Debug: Print password details
-    print(f"DEBUG - Raw password: {repr(password)}")
-    print(f"DEBUG - Password length: {len(password)}")
-    print(f"DEBUG - Password bytes: {len(password.encode('utf-8'))}")
-    
     # Truncate password to 72 bytes to comply with bcrypt limit
     password_bytes = password.encode('utf-8')
     if len(password_bytes) > 72:
         password_bytes = password_bytes[:72]
-        print(f"DEBUG - Truncated password bytes to: {len(password_bytes)}")
     
     try:
-        salt = bcrypt.gensalt()
+        salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
         hashed = bcrypt.hashpw(password_bytes, salt)
         return hashed.decode('utf-8')
     except Exception as e:
@@ -45,6 +42,21 @@ def get_password_hash(password: str) -> str:
             detail="Password hashing failed"
         )
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True if the hash was made with a different bcrypt cost than BCRYPT_ROUNDS"""
+    try:
+        return int(hashed_password.split("$")[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+# Async variants for request handlers: bcrypt runs on the password pool
+# instead of blocking the event loop
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await run_password_job(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await run_password_job(get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     if expires_delta:
@@ -56,8 +68,12 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 def decode_access_token(token: str) -> dict:
+    payload = principal_cache.get_cached_payload(token)
+    if payload is not None:
+        return payload
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        principal_cache.cache_payload(token, payload)
         return payload
     except JWTError:
         raise HTTPException(
@@ -68,7 +84,7 @@ def decode_access_token(token: str) -> dict:
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     token = credentials.credentials
     payload = decode_access_token(token)
@@ -79,12 +95,19 @@ async def get_current_user(
             detail="Could not validate credentials"
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    # Cached principal skips the users round-trip; merged without a SELECT so
+    # handlers can still modify and commit current_user
+    user = principal_cache.get_cached_user(user_id)
+    if user is not None:
+        return await db.merge(user, load=False)
+    
+    user = await db.scalar(select(User).where(User.id == user_id))
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
+    principal_cache.cache_user(user)
     return user
 
 async def get_current_admin_user(current_user: User = Depends(get_current_user)) -> User:
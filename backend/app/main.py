@@ -1,13 +1,24 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, HTTPException
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.core.database import engine, Base
+from app.core.metrics import MetricsMiddleware, registry
+from app.core.query_budget import QueryBudgetMiddleware
 from app.routers import auth, users, orders, projects, synopsis, meetings, plans, admin, blackbook, select_plan, compatibility, idea_generation, payment_proof, approved_ideas, chatbot
 from app.core.exceptions import (
     AppException, app_exception_handler,
     sqlalchemy_exception_handler, general_exception_handler
 )
+from app.services.llm_clients import close_llm_clients
+from app.services.password_pool import shutdown_password_pool
+from app.services.storage import close_storage
+from app.services.activity_logger import activity_log_writer
+from app.services.chat_context import chat_compactor
+from app.services.activity_partitions import start_activity_maintenance, stop_activity_maintenance
 from sqlalchemy.exc import SQLAlchemyError
+import hmac
 import logging
 
 # Configure logging
@@ -20,10 +31,23 @@ logging.basicConfig(
 if settings.AUTO_CREATE_TABLES:
     Base.metadata.create_all(bind=engine)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await start_activity_maintenance()
+    yield
+    await stop_activity_maintenance()
+    await chat_compactor.close()
+    # Close pooled LLM provider connections on shutdown
+    await close_llm_clients()
+    shutdown_password_pool()
+    await close_storage()
+    await activity_log_writer.close()
+
 app = FastAPI(
     title="TY Project Launchpad API",
     description="Final Year Engineering Project Management Platform",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
 
@@ -42,6 +66,14 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+# Development/CI guard against N+1 queries and routes outgrowing their query budget
+if settings.QUERY_BUDGET_MODE != "off":
+    app.add_middleware(QueryBudgetMiddleware)
+
+# Outermost, so timings include CORS handling and error responses
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Register exception handlers (AFTER CORS)
 app.add_exception_handler(AppException, app_exception_handler)
 app.add_exception_handler(SQLAlchemyError, sqlalchemy_exception_handler)
@@ -76,6 +108,17 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Prometheus text exposition of this worker's metrics"""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if settings.METRICS_TOKEN:
+        expected = f"Bearer {settings.METRICS_TOKEN}"
+        if not hmac.compare_digest(request.headers.get("authorization", ""), expected):
+            raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
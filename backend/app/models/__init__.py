@@ -6,11 +6,16 @@ from app.models.meeting import Meeting
 from app.models.plan import Plan
 from app.models.service import Service, UserService
 from app.models.admin_request import AdminRequest
-from app.models.activity_log import ActivityLog
+from app.models.activity_log import ActivityLog, ActivityDailyRollup
 from app.models.chatbot_history import ChatbotHistory
 from app.models.idea_generation_history import IdeaGenerationHistory
 from app.models.idea_submission import IdeaSubmission
 from app.models.approved_idea_submission import ApprovedIdeaSubmission
+from app.models.idea_cache import IdeaCacheEntry
+from app.models.file_blob import FileBlob
+from app.models.admin_stat import AdminStat, AdminStatDelta
+from app.models.idea_quota import IdeaQuota
+from app.models.rate_limit_bucket import RateLimitBucket
 
 __all__ = [
     "User",
@@ -23,8 +28,15 @@ __all__ = [
     "UserService",
     "AdminRequest",
     "ActivityLog",
+    "ActivityDailyRollup",
     "ChatbotHistory",
     "IdeaGenerationHistory",
     "IdeaSubmission",
-    "ApprovedIdeaSubmission"
+    "ApprovedIdeaSubmission",
+    "IdeaCacheEntry",
+    "FileBlob",
+    "AdminStat",
+    "AdminStatDelta",
+    "IdeaQuota",
+    "RateLimitBucket"
 ]
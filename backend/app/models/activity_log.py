@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Index
+from sqlalchemy import Column, String, DateTime, Date, Text, ForeignKey, Index, BigInteger
 from sqlalchemy.dialects.postgresql import JSON
 from datetime import datetime, timezone
 from app.core.database import Base
@@ -8,14 +8,17 @@ class ActivityLog(Base):
     """
     Activity log for tracking user actions and system events.
     Essential for monitoring user behavior, debugging, and compliance.
+    
+    Range-partitioned by month on created_at (partitions are created and
+    dropped by app.services.activity_partitions), so the key is (id, created_at).
     """
     __tablename__ = "activity_logs"
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(String, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
+    user_id = Column(String, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
     
     # Action details
-    action = Column(String, nullable=False, index=True)  # login, create_project, upload_synopsis, etc.
+    action = Column(String, nullable=False)  # login, create_project, upload_synopsis, etc.
     entity_type = Column(String, nullable=True)  # project, order, synopsis, chatbot
     entity_id = Column(String, nullable=True)
     
@@ -30,11 +33,23 @@ class ActivityLog(Base):
     status = Column(String, default="success")  # success, failed, error
     error_message = Column(Text, nullable=True)
     
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)
+    created_at = Column(DateTime, primary_key=True, default=lambda: datetime.now(timezone.utc), index=True)
     
     __table_args__ = (
-        # Composite indexes for common queries
+        # Composite indexes for common queries (per-action/status counts
+        # come from ActivityDailyRollup instead of more indexes here)
         Index('idx_activity_user_action_date', 'user_id', 'action', 'created_at'),
         Index('idx_activity_entity', 'entity_type', 'entity_id'),
-        Index('idx_activity_status_action', 'status', 'action'),
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
+
+class ActivityDailyRollup(Base):
+    """Activity counts per day, action and status for dashboards (kept after raw partitions are dropped)"""
+    __tablename__ = "activity_daily_rollups"
+    
+    day = Column(Date, primary_key=True)
+    action = Column(String, primary_key=True)
+    status = Column(String, primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+    
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
@@ -18,7 +18,7 @@ class AdminRequest(Base):
     admin_response = Column(Text, nullable=True)
     admin_id = Column(String, nullable=True)  # Admin who responded
     
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False, index=True)
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
     
     # Relationships
@@ -0,0 +1,24 @@
+"""
+Admin Stat Model - Precomputed dashboard counters
+"""
+from sqlalchemy import Column, String, DateTime, BigInteger, Integer
+from datetime import datetime, timezone
+from app.core.database import Base
+
+class AdminStat(Base):
+    """One row per dashboard counter, kept current by app.services.admin_stats"""
+    __tablename__ = "admin_stats"
+
+    # e.g. total_users, pending_synopsis
+    name = Column(String, primary_key=True)
+    value = Column(BigInteger, default=0, nullable=False)
+
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+class AdminStatDelta(Base):
+    """A change to one counter not yet folded into its admin_stats row (insert-only, so writers never wait on each other)"""
+    __tablename__ = "admin_stat_deltas"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    name = Column(String, nullable=False)
+    delta = Column(Integer, nullable=False)
@@ -24,7 +24,7 @@ class ApprovedIdeaSubmission(Base):
     # The approved idea text
     approved_idea = Column(Text, nullable=False)
 
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False, index=True)
 
     __table_args__ = (
         Index("idx_approved_idea_phone_date", "phone", "created_at"),
@@ -0,0 +1,21 @@
+"""
+File Blob Model - Content-addressed upload storage
+"""
+from sqlalchemy import Column, String, DateTime, Integer, BigInteger
+from datetime import datetime, timezone
+from app.core.database import Base
+
+class FileBlob(Base):
+    """One stored file per distinct content, shared by every row that references it"""
+    __tablename__ = "file_blobs"
+
+    # uploads/blobs/ab/cd/<sha256>.<ext> (the value stored in *_path columns)
+    path = Column(String, primary_key=True)
+    sha256 = Column(String(64), nullable=False, index=True)
+    size = Column(BigInteger, nullable=False)
+
+    # Rows referencing this blob; recomputed by garbage collection
+    ref_count = Column(Integer, default=0, nullable=False)
+
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
@@ -0,0 +1,22 @@
+"""
+Idea Cache Model - Shared tier of the idea generation response cache
+"""
+from sqlalchemy import Column, String, DateTime, Text, Boolean
+from sqlalchemy.dialects.postgresql import JSON
+from datetime import datetime, timezone
+from app.core.database import Base
+
+class IdeaCacheEntry(Base):
+    """Cached AI ideas per normalized topic, shared by all workers"""
+    __tablename__ = "idea_cache"
+
+    # sha256 of prompt branch + normalized field_of_interest
+    key = Column(String, primary_key=True)
+    topic = Column(Text, nullable=False)  # Normalized input (for inspection only)
+    has_specifics = Column(Boolean, default=False, nullable=False)
+
+    # Distinct generated ideas served in rotation
+    variants = Column(JSON, nullable=False)
+
+    expires_at = Column(DateTime, nullable=False, index=True)
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
@@ -0,0 +1,16 @@
+"""
+Idea Quota Model - Generation counters for the idea generation limit
+"""
+from sqlalchemy import Column, String, DateTime, Integer
+from datetime import datetime, timezone
+from app.core.database import Base
+
+class IdeaQuota(Base):
+    """Ideas submitted per phone number or user, kept by app.services.idea_quota"""
+    __tablename__ = "idea_quotas"
+
+    kind = Column(String, primary_key=True)  # phone, user
+    subject = Column(String, primary_key=True)  # normalized phone number or user id
+    count = Column(Integer, default=0, nullable=False)
+
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
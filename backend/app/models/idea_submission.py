@@ -26,7 +26,7 @@ class IdeaSubmission(Base):
     # Tracking
     generation_count = Column(Integer, default=1)  # How many times this user generated
     
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False, index=True)
     
     __table_args__ = (
         Index('idx_idea_phone', 'phone', 'created_at'),
@@ -16,8 +16,9 @@ class Meeting(Base):
     meeting_link = Column(String, nullable=True)
     status = Column(String, default="requested")  # requested, scheduled, completed, cancelled
     
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False, index=True)
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
     
     # Relationships
-    user = relationship("User", back_populates="meetings")
+    # Always joined: MeetingResponse serializes the user, and lazy loads are not allowed under asyncio
+    user = relationship("User", back_populates="meetings", lazy="joined")
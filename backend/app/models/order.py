@@ -25,7 +25,7 @@ class Order(Base):
     payment_verified_at = Column(DateTime, nullable=True)
     payment_verified_by = Column(String, ForeignKey("users.id"), nullable=True)
     
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False, index=True)
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
     
     # Relationships
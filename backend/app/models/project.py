@@ -30,7 +30,7 @@ class Project(Base):
     url_approved = Column(Boolean, default=False)  # Admin approval for download
     admin_notes = Column(Text, nullable=True)  # Admin updates visible to student
     
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False, index=True)
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
     
     # Relationships
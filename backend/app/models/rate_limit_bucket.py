@@ -0,0 +1,16 @@
+"""
+Rate Limit Bucket Model - Shared token buckets for app.core.rate_limit
+"""
+from sqlalchemy import Column, String, DateTime, Float
+from datetime import datetime, timezone
+from app.core.database import Base
+
+class RateLimitBucket(Base):
+    """Token bucket state per policy and caller (RATE_LIMIT_BACKEND=postgres)"""
+    __tablename__ = "rate_limit_buckets"
+
+    # e.g. idea_generate:ip:203.0.113.7
+    key = Column(String, primary_key=True)
+    tokens = Column(Float, nullable=False)
+
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False, index=True)
@@ -21,27 +21,30 @@ class User(Base):
     needs_idea_generation = Column(Boolean, default=False)
     onboarding_completed = Column(Boolean, default=False)
     
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False, index=True)
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
     
     # Relationships
+    # passive_deletes: child rows are removed by the ON DELETE CASCADE foreign keys,
+    # so deleting a user never has to lazy-load its collections (not allowed under asyncio)
     # Order has two FKs to users: user_id (owner) and payment_verified_by (admin)
     orders = relationship(
         "Order",
         back_populates="user",
         cascade="all, delete-orphan",
         foreign_keys="Order.user_id",
+        passive_deletes=True,
     )
     verified_orders = relationship(
         "Order",
         foreign_keys="Order.payment_verified_by",
         viewonly=True,
     )
-    projects = relationship("Project", back_populates="user", cascade="all, delete-orphan")
-    synopsis = relationship("Synopsis", back_populates="user", cascade="all, delete-orphan")
-    meetings = relationship("Meeting", back_populates="user", cascade="all, delete-orphan")
-    user_services = relationship("UserService", back_populates="user", cascade="all, delete-orphan")
-    admin_requests = relationship("AdminRequest", back_populates="user", cascade="all, delete-orphan")
+    projects = relationship("Project", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    synopsis = relationship("Synopsis", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    meetings = relationship("Meeting", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    user_services = relationship("UserService", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    admin_requests = relationship("AdminRequest", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
     
     __table_args__ = (
         Index('idx_user_email_admin', 'email', 'is_admin'),
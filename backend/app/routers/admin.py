@@ -1,14 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.core.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, or_, exists
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload, lazyload
+from typing import List, Optional, Union
+from datetime import datetime, timedelta, timezone
+from app.core.database import get_async_db
 from app.core.security import get_current_admin_user, get_current_user
 from app.models.user import User
 from app.models.admin_request import AdminRequest
 from app.models.project import Project
+from app.models.order import Order
+from app.models.meeting import Meeting
+from app.schemas.user import UserResponse
 from app.schemas.admin_request import AdminRequestCreate, AdminRequestResponse, AdminRequestUpdate
+from app.core.pagination import paginate
+from app.core.query_budget import query_budget
+from app.core.rate_limit import rate_limiter
+from app.schemas.pagination import Page
+from app.schemas.student import StudentOverview
+from app.schemas.order import OrderResponse
+from app.schemas.project import ProjectResponse
+from app.schemas.synopsis import SynopsisResponse
+from app.schemas.meeting import MeetingResponse
 from app.services.file_service import save_upload_file
-from fastapi.responses import FileResponse
+from app.services.blob_store import save_upload_blob, release_blob, collect_garbage
+from app.services.downloads import file_download
+from app.services.llm_gateway import gateway
+from app.services.idea_cache import idea_cache
+from app.services.chat_context import chat_compactor
+from app.services.exports import EXPORTS, EXPORT_MEDIA_TYPES, build_export_query, stream_export
+from app.services.activity_logger import activity_log_writer
+from app.services.activity_partitions import run_maintenance
+from app.models.activity_log import ActivityDailyRollup
+from app.services import principal_cache, password_pool, admin_stats, idea_quota
 from fastapi import Response
 from pydantic import BaseModel
 import os
@@ -26,50 +51,51 @@ class ProjectUrlShare(BaseModel):
 async def create_admin_request(
     request_data: AdminRequestCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     new_request = AdminRequest(
         user_id=current_user.id,
         **request_data.model_dump()
     )
     db.add(new_request)
-    db.commit()
-    db.refresh(new_request)
+    await db.commit()
+    await db.refresh(new_request)
     return AdminRequestResponse.model_validate(new_request)
 
 @router.get("/requests/me", response_model=List[AdminRequestResponse])
 async def get_my_requests(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all requests submitted by the current user"""
-    requests = db.query(AdminRequest).filter(
+    requests = (await db.scalars(select(AdminRequest).where(
         AdminRequest.user_id == current_user.id
-    ).order_by(AdminRequest.created_at.desc()).all()
+    ).order_by(AdminRequest.created_at.desc()))).all()
     return [AdminRequestResponse.model_validate(r) for r in requests]
 
-@router.get("/requests", response_model=List[AdminRequestResponse])
+@router.get("/requests", response_model=Union[List[AdminRequestResponse], Page[AdminRequestResponse]])
+@query_budget(3)
 async def get_all_admin_requests(
     skip: int = 0,
     limit: int = 50,  # Reduced default limit for better performance
+    cursor: Optional[str] = None,
     admin_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Add maximum limit to prevent excessive data retrieval
     if limit > 100:
         limit = 100
     
-    requests = db.query(AdminRequest).order_by(AdminRequest.created_at.desc()).offset(skip).limit(limit).all()
-    return [AdminRequestResponse.model_validate(r) for r in requests]
+    return await paginate(db, select(AdminRequest), AdminRequest, AdminRequestResponse.model_validate, skip, limit, cursor)
 
 @router.put("/requests/{request_id}", response_model=AdminRequestResponse)
 async def update_admin_request(
     request_id: str,
     request_update: AdminRequestUpdate,
     admin_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    admin_request = db.query(AdminRequest).filter(AdminRequest.id == request_id).first()
+    admin_request = await db.scalar(select(AdminRequest).where(AdminRequest.id == request_id))
     if not admin_request:
         raise HTTPException(status_code=404, detail="Request not found")
     
@@ -80,16 +106,75 @@ async def update_admin_request(
     for field, value in update_data.items():
         setattr(admin_request, field, value)
     
-    db.commit()
-    db.refresh(admin_request)
+    await db.commit()
+    await db.refresh(admin_request)
     return AdminRequestResponse.model_validate(admin_request)
 
+# Students Grid
+def _newest_first(rows):
+    return sorted(rows, key=lambda row: row.created_at or datetime.min, reverse=True)
+
+def _student_overview(user: User) -> StudentOverview:
+    orders = _newest_first(user.orders)
+    paid = [order for order in orders if order.status == "completed"]
+    current = paid[0] if paid else orders[0] if orders else None
+    return StudentOverview(
+        **UserResponse.model_validate(user).model_dump(),
+        latest_order=OrderResponse.model_validate(orders[0]) if orders else None,
+        current_order=OrderResponse.model_validate(current) if current else None,
+        order_count=len(orders),
+        total_paid=sum(order.amount for order in paid),
+        has_paid=bool(paid),
+        projects=[ProjectResponse.model_validate(p) for p in _newest_first(user.projects)],
+        synopsis=[SynopsisResponse.model_validate(s) for s in _newest_first(user.synopsis)],
+        meetings=[MeetingResponse.model_validate(m) for m in _newest_first(user.meetings)]
+    )
+
+@router.get("/students", response_model=Union[List[StudentOverview], Page[StudentOverview]])
+@query_budget(6)
+async def get_students(
+    skip: int = 0,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    search: Optional[str] = None,
+    paid: Optional[bool] = None,
+    signup_step: Optional[str] = None,
+    admin_user: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Students with their orders, projects, synopsis and meetings, for the
+    Students Grid. Each relationship is loaded with one batched IN query per
+    page, so a page costs the same five queries however many students it holds
+    (six with the user lookup behind authentication, hence the budget).
+    """
+    if limit > 100:
+        limit = 100
+
+    has_paid = exists().where(Order.user_id == User.id, Order.status == "completed")
+    query = select(User).where(User.is_admin.is_(False)).options(
+        selectinload(User.orders),
+        selectinload(User.projects),
+        selectinload(User.synopsis),
+        # The meeting's user is the student already loaded; skip Meeting.user's join back to users
+        selectinload(User.meetings).options(lazyload(Meeting.user))
+    )
+    if search:
+        pattern = f"%{search.strip()}%"
+        query = query.where(or_(User.name.ilike(pattern), User.email.ilike(pattern), User.phone.ilike(pattern)))
+    if paid is not None:
+        query = query.where(has_paid if paid else ~has_paid)
+    if signup_step:
+        query = query.where(User.signup_step == signup_step)
+
+    return await paginate(db, query, User, _student_overview, skip, limit, cursor)
+
 # BlackBook Management
 @router.post("/blackbook/upload")
 async def upload_blackbook(
     file: UploadFile = File(...),
     admin_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     file_path = await save_upload_file(file, "blackbook")
     return {"message": "BlackBook uploaded successfully", "file_path": file_path}
@@ -99,14 +184,12 @@ async def download_blackbook(
     admin_user: User = Depends(get_current_admin_user)
 ):
     # Look for blackbook.pdf in uploads/blackbook
-    blackbook_path = "uploads/blackbook/blackbook.pdf"
-    if not os.path.exists(blackbook_path):
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, message="No blackbook available right now")
-    
-    return FileResponse(
-        path=blackbook_path,
-        filename="BlackBook.pdf",
-        media_type="application/pdf"
+    return await file_download(
+        "uploads/blackbook/blackbook.pdf",
+        "BlackBook.pdf",
+        "application/pdf",
+        cache_policy="blackbook",
+        not_found_detail="No blackbook available right now"
     )
 
 # File Management
@@ -127,25 +210,128 @@ async def upload_file(
 @router.get("/stats")
 async def get_admin_stats(
     admin_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    from app.models.order import Order
-    from app.models.project import Project
-    from app.models.synopsis import Synopsis
-    
-    total_users = db.query(User).count()
-    total_orders = db.query(Order).count()
-    total_projects = db.query(Project).count()
-    pending_synopsis = db.query(Synopsis).filter(Synopsis.status == "Pending").count()
-    pending_requests = db.query(AdminRequest).filter(AdminRequest.status == "pending").count()
-    
-    return {
-        "total_users": total_users,
-        "total_orders": total_orders,
-        "total_projects": total_projects,
-        "pending_synopsis": pending_synopsis,
-        "pending_requests": pending_requests
-    }
+    return await admin_stats.get_stats(db)
+
+@router.post("/stats/recompute")
+async def recompute_admin_stats(
+    admin_user: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Rebuild the dashboard counters from the source tables and report any drift"""
+    return await admin_stats.recompute_stats(db)
+
+# Bulk export
+@router.get("/export/{entity}")
+async def export_entity(
+    entity: str,
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    admin_user: User = Depends(get_current_admin_user)
+):
+    """
+    Stream every matching row of orders, idea_submissions, synopsis or
+    activity_logs as CSV or NDJSON (created_at in [date_from, date_to));
+    ?status= is not available for idea_submissions
+    """
+    if entity not in EXPORTS:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Unknown export '{entity}'. Available: {', '.join(EXPORTS)}"
+        )
+    # Built here, so a bad filter is a 400 and not a truncated 200 body
+    try:
+        query = build_export_query(EXPORTS[entity], status_filter, date_from, date_to)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+    return StreamingResponse(
+        stream_export(entity, format, query),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{entity}-{stamp}.{format}"',
+            "Cache-Control": "no-store"
+        }
+    )
+
+# AI provider health
+@router.get("/llm/metrics")
+async def get_llm_metrics(admin_user: User = Depends(get_current_admin_user)):
+    """Per-provider latency, error and circuit breaker state for this worker"""
+    return gateway.get_metrics()
+
+@router.get("/idea-cache/metrics")
+async def get_idea_cache_metrics(admin_user: User = Depends(get_current_admin_user)):
+    """Idea generation cache hit rate and size for this worker"""
+    return idea_cache.get_metrics()
+
+@router.get("/rate-limit/metrics")
+async def get_rate_limit_metrics(admin_user: User = Depends(get_current_admin_user)):
+    """Rate limit rejections per policy and LLM slot usage/shedding for this worker"""
+    return rate_limiter.get_metrics()
+
+@router.get("/idea-quota/metrics")
+async def get_idea_quota_metrics(admin_user: User = Depends(get_current_admin_user)):
+    """Idea generation /count cache hit rate for this worker"""
+    return idea_quota.get_metrics()
+
+@router.get("/chat-context/metrics")
+async def get_chat_context_metrics(admin_user: User = Depends(get_current_admin_user)):
+    """Chatbot prompt sizes, truncated turns and background summary updates for this worker"""
+    return chat_compactor.get_metrics()
+
+@router.get("/auth-cache/metrics")
+async def get_auth_cache_metrics(admin_user: User = Depends(get_current_admin_user)):
+    """Principal/token cache hit rate for this worker"""
+    return principal_cache.get_metrics()
+
+@router.get("/password-pool/metrics")
+async def get_password_pool_metrics(admin_user: User = Depends(get_current_admin_user)):
+    """bcrypt thread pool queue depth and timings for this worker"""
+    return password_pool.get_metrics()
+
+@router.get("/activity-log/metrics")
+async def get_activity_log_metrics(admin_user: User = Depends(get_current_admin_user)):
+    """Buffered activity log writer: queue depth, batches written and dropped entries"""
+    return activity_log_writer.get_metrics()
+
+@router.get("/activity/rollups")
+async def get_activity_rollups(
+    days: int = Query(30, ge=1, le=3660),
+    action: Optional[str] = None,
+    admin_user: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Daily activity counts per action and status (kept after raw logs expire)"""
+    since = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+    query = select(ActivityDailyRollup).where(ActivityDailyRollup.day >= since)
+    if action:
+        query = query.where(ActivityDailyRollup.action == action)
+    rollups = (await db.scalars(query.order_by(ActivityDailyRollup.day, ActivityDailyRollup.action, ActivityDailyRollup.status))).all()
+    return [
+        {"day": r.day.isoformat(), "action": r.action, "status": r.status, "count": r.count}
+        for r in rollups
+    ]
+
+@router.post("/activity/maintenance")
+async def run_activity_maintenance(
+    admin_user: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create upcoming partitions, refresh rollups and apply retention now"""
+    return await run_maintenance(db)
+
+@router.post("/storage/gc")
+async def run_storage_gc(
+    dry_run: bool = True,
+    admin_user: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Recount upload blob references and delete unreferenced blobs (dry run by default)"""
+    return await collect_garbage(db, dry_run=dry_run)
 
 # Project File Upload for Students
 @router.post("/upload-project")
@@ -153,20 +339,21 @@ async def upload_project_file(
     file: UploadFile = File(...),
     user_id: str = Form(...),
     admin_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Upload project ZIP file for a student"""
     # Verify user exists
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).where(User.id == user_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Save file to user's project folder
-    file_path = await save_upload_file(file, f"projects/{user_id}")
+    # Save file (deduplicated by content)
+    file_path = await save_upload_blob(file, db)
     
     # Update or create project record
-    project = db.query(Project).filter(Project.user_id == user_id).first()
+    project = await db.scalar(select(Project).where(Project.user_id == user_id))
     if project:
+        await release_blob(db, project.project_file_path)
         project.project_file_path = file_path
         project.project_file_original_name = file.filename
         project.status = "completed"
@@ -181,7 +368,7 @@ async def upload_project_file(
         )
         db.add(new_project)
     
-    db.commit()
+    await db.commit()
     
     return {
         "message": "Project file uploaded successfully",
@@ -194,20 +381,19 @@ async def upload_project_file(
 async def share_project_url(
     data: ProjectUrlShare,
     admin_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Share or revoke project URL access based on payment status"""
     # Verify user exists
-    user = db.query(User).filter(User.id == data.user_id).first()
+    user = await db.scalar(select(User).where(User.id == data.user_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
     # Check payment status
-    from app.models.order import Order
-    has_paid = db.query(Order).filter(
+    has_paid = await db.scalar(select(Order).where(
         Order.user_id == data.user_id,
         Order.status == "completed"
-    ).first() is not None
+    ).limit(1)) is not None
     
     if data.approved and not has_paid:
         raise HTTPException(
@@ -216,7 +402,7 @@ async def share_project_url(
         )
     
     # Update or create project with URL
-    project = db.query(Project).filter(Project.user_id == data.user_id).first()
+    project = await db.scalar(select(Project).where(Project.user_id == data.user_id))
     if project:
         if data.approved:
             project.project_url = data.project_url
@@ -235,7 +421,7 @@ async def share_project_url(
             )
             db.add(new_project)
     
-    db.commit()
+    await db.commit()
     
     return {
         "message": "Project URL updated successfully",
@@ -248,15 +434,14 @@ async def share_project_url(
 async def download_project(
     user_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Download project file - requires payment verification"""
     # Check if requesting user has paid
-    from app.models.order import Order
-    has_paid = db.query(Order).filter(
+    has_paid = await db.scalar(select(Order).where(
         Order.user_id == current_user.id,
         Order.status == "completed"
-    ).first() is not None
+    ).limit(1)) is not None
     
     if not has_paid and not current_user.is_admin:
         raise HTTPException(
@@ -265,10 +450,10 @@ async def download_project(
         )
     
     # Get project - find the one with a file path
-    project = db.query(Project).filter(
+    project = await db.scalar(select(Project).where(
         Project.user_id == user_id,
         Project.project_file_path.isnot(None)
-    ).first()
+    ))
     if not project or not project.project_file_path:
         raise HTTPException(status_code=404, detail="Project file not found")
     
@@ -279,36 +464,31 @@ async def download_project(
         )
     
     file_path = project.project_file_path
-    if not os.path.exists(file_path):
-        raise HTTPException(status_code=404, detail="File not found on server")
     
     # Use original filename if available, otherwise fallback to UUID filename
     download_filename = project.project_file_original_name or os.path.basename(file_path)
     
-    response = FileResponse(
-        path=file_path,
-        filename=download_filename,
-        media_type="application/zip"
+    return await file_download(
+        file_path,
+        download_filename,
+        "application/zip",
+        cache_policy="project",
+        not_found_detail="File not found on server"
     )
-    
-    # Ensure content-disposition header is set correctly
-    response.headers["Content-Disposition"] = f"attachment; filename=\"{download_filename}\""
-    
-    return response
 
 # Update Project Status and Notes (for student view)
 @router.put("/update-project/{project_id}")
 async def update_project_for_student(
     project_id: str,
     admin_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     status: Optional[str] = None,
     admin_notes: Optional[str] = None,
     project_url: Optional[str] = None,
     url_approved: Optional[bool] = None
 ):
     """Update project status, notes, and download access for student"""
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await db.scalar(select(Project).where(Project.id == project_id))
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
@@ -322,8 +502,8 @@ async def update_project_for_student(
     if url_approved is not None:
         project.url_approved = url_approved
     
-    db.commit()
-    db.refresh(project)
+    await db.commit()
+    await db.refresh(project)
     
     return {
         "message": "Project updated successfully",
@@ -1,11 +1,16 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
 
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.security import get_current_admin_user
 from app.models.user import User
 from app.models.approved_idea_submission import ApprovedIdeaSubmission
+from app.core.pagination import paginate
+from app.core.rate_limit import rate_limit, rate_limiter
+from app.services.idea_quota import normalize_phone
+from app.schemas.pagination import Page
 from app.schemas.approved_idea_submission import (
     ApprovedIdeaSubmissionCreate,
     ApprovedIdeaSubmissionResponse,
@@ -14,17 +19,18 @@ from app.schemas.approved_idea_submission import (
 router = APIRouter(prefix="/api/approved-ideas", tags=["Approved Ideas"])
 
 
-@router.post("/submit", response_model=dict)
-async def submit_approved_idea(payload: ApprovedIdeaSubmissionCreate, db: Session = Depends(get_db)):
+@router.post("/submit", response_model=dict, dependencies=[Depends(rate_limit("approved_idea_submit"))])
+async def submit_approved_idea(payload: ApprovedIdeaSubmissionCreate, db: AsyncSession = Depends(get_async_db)):
     """Public endpoint (no login required) for submitting an already-approved project idea."""
+    await rate_limiter.hit("approved_idea_submit", f"phone:{normalize_phone(payload.phone)}")
     submission = ApprovedIdeaSubmission(
         name=payload.name.strip(),
         phone=payload.phone.strip(),
         approved_idea=payload.approved_idea.strip(),
     )
     db.add(submission)
-    db.commit()
-    db.refresh(submission)
+    await db.commit()
+    await db.refresh(submission)
 
     return {
         "success": True,
@@ -33,18 +39,23 @@ async def submit_approved_idea(payload: ApprovedIdeaSubmissionCreate, db: Sessio
     }
 
 
-@router.get("/submissions", response_model=List[ApprovedIdeaSubmissionResponse])
+@router.get(
+    "/submissions",
+    response_model=Union[List[ApprovedIdeaSubmissionResponse], Page[ApprovedIdeaSubmissionResponse]],
+)
 async def admin_list_approved_ideas(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     admin_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    submissions = (
-        db.query(ApprovedIdeaSubmission)
-        .order_by(ApprovedIdeaSubmission.created_at.desc())
-        .offset(skip)
-        .limit(min(limit, 200))
-        .all()
+    return await paginate(
+        db,
+        select(ApprovedIdeaSubmission),
+        ApprovedIdeaSubmission,
+        ApprovedIdeaSubmissionResponse.model_validate,
+        skip,
+        min(limit, 200),
+        cursor,
     )
-    return [ApprovedIdeaSubmissionResponse.model_validate(s) for s in submissions]
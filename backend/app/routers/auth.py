@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.security import (
-    verify_password, 
-    get_password_hash, 
+    verify_password_async,
+    get_password_hash_async,
+    password_needs_rehash,
     create_access_token,
     get_current_user
 )
@@ -16,7 +18,7 @@ from app.schemas.user import UserCreate, UserLogin, TokenResponse, UserResponse
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 
 @router.post("/signup", response_model=TokenResponse)
-async def signup(user_data: UserCreate, db: Session = Depends(get_db)):
+async def signup(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     # Validate input
     email = validate_email(user_data.email)
     password = validate_password(user_data.password)
@@ -24,7 +26,7 @@ async def signup(user_data: UserCreate, db: Session = Depends(get_db)):
     phone = validate_phone(user_data.phone) or ""
     
     # Check if user exists
-    existing_user = db.query(User).filter(User.email == email).first()
+    existing_user = await db.scalar(select(User).where(User.email == email))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -32,7 +34,7 @@ async def signup(user_data: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(password)
+    hashed_password = await get_password_hash_async(password)
     new_user = User(
         email=email,
         password=hashed_password,
@@ -41,8 +43,8 @@ async def signup(user_data: UserCreate, db: Session = Depends(get_db)):
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     
     # Create access token
     access_token = create_access_token(
@@ -56,20 +58,25 @@ async def signup(user_data: UserCreate, db: Session = Depends(get_db)):
     )
 
 @router.post("/login", response_model=TokenResponse)
-async def login(credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(credentials: UserLogin, db: AsyncSession = Depends(get_async_db)):
     # Validate input
     email = validate_email(credentials.email)
     # NOTE: Do NOT enforce password complexity on login.
     # Existing users may have older/weak passwords; we only enforce complexity on signup.
     
     # Find user
-    user = db.query(User).filter(User.email == email).first()
-    if not user or not verify_password(credentials.password, user.password):
+    user = await db.scalar(select(User).where(User.email == email))
+    if not user or not await verify_password_async(credentials.password, user.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
         )
     
+    # Upgrade the stored hash if BCRYPT_ROUNDS changed since it was made
+    if password_needs_rehash(user.password):
+        user.password = await get_password_hash_async(credentials.password)
+        await db.commit()
+    
     # Create access token
     access_token = create_access_token(
         data={"sub": user.id},
@@ -2,16 +2,23 @@
 Chatbot API using Groq for conversational project assistance
 """
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from pydantic import BaseModel
-from app.core.database import get_db
+from dataclasses import dataclass
+from app.core.database import get_async_db, AsyncSessionLocal
 from app.core.config import settings
 from app.core.security import get_current_user
 from app.models.user import User
+from app.services.llm_gateway import gateway, ProviderRequest, ProviderError, LLMUnavailableError
+from app.services.streaming import sse_event, MarkerFilter, SSE_HEADERS
 from app.models.chatbot_history import ChatbotHistory
-import httpx
+from app.services import chat_context
+from app.services.chat_context import chat_compactor, session_transcripts
 import logging
+import time
 import uuid
 from datetime import datetime
 
@@ -23,14 +30,20 @@ class ChatMessage(BaseModel):
     content: str
 
 class ChatRequest(BaseModel):
-    messages: List[ChatMessage]
+    # Either the whole conversation (legacy clients)...
+    messages: List[ChatMessage] = []
+    # ...or only the new user message, with the session_id and turn of the previous reply
+    message: Optional[str] = None
+    turn: Optional[int] = None
     plan_name: str
+    plan_features: List[str] = []  # for the greeting that opens a new delta session
     session_id: Optional[str] = None
 
 class ChatResponse(BaseModel):
     message: str
     session_id: str
     should_finalize: bool = False
+    turn: int = 0  # completed exchanges in the session; echo it back with the next message
 
 class SummarizeRequest(BaseModel):
     text: str
@@ -41,26 +54,11 @@ class SummarizeRequest(BaseModel):
 class SummarizeResponse(BaseModel):
     summary: str
 
-@router.post("/chat", response_model=ChatResponse)
-async def chat(
-    request: ChatRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """
-    Chatbot endpoint for conversational project assistance
-    Uses Groq API (with Grok fallback)
-    """
-    if not settings.GROQ_API_KEY and not settings.XAI_API_KEY:
-        raise HTTPException(status_code=500, detail="AI API keys not configured")
-    
-    try:
-        # Generate or use existing session ID
-        session_id = request.session_id or str(uuid.uuid4())
-        
-        # Build system prompt
-        system_prompt = f"""You are a concise, friendly, and professional project assistant for TYForge.
-The user has selected the {request.plan_name} plan.
+FINALIZE_MARKER = "[FINALIZE]"
+
+def chat_system_prompt(plan_name: str) -> str:
+    return f"""You are a concise, friendly, and professional project assistant for TYForge.
+The user has selected the {plan_name} plan.
 
 Your goals:
 1. Help the user define their project by asking for:
@@ -75,115 +73,162 @@ Your goals:
 
 Be friendly, professional, and guide the conversation efficiently."""
 
-        # Prepare messages for API
-        api_messages = [{"role": "system", "content": system_prompt}]
-        
-        # Add conversation history
-        for msg in request.messages:
-            api_messages.append({
-                "role": "user" if msg.role == "user" else "assistant",
-                "content": msg.content
-            })
-        
-        generated_response = None
-        api_used = "unknown"
-        
-        # Try Groq first
-        if settings.GROQ_API_KEY:
-            try:
-                logger.info("Attempting chatbot response using Groq API...")
-                async with httpx.AsyncClient(timeout=30.0) as client:
-                    response = await client.post(
-                        "https://api.groq.com/openai/v1/chat/completions",
-                        headers={
-                            "Authorization": f"Bearer {settings.GROQ_API_KEY}",
-                            "Content-Type": "application/json"
-                        },
-                        json={
-                            "model": settings.GROQ_MODEL,
-                            "messages": api_messages,
-                            "temperature": 0.7,
-                            "max_tokens": 200
-                        }
-                    )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    generated_response = data['choices'][0]['message']['content'].strip()
-                    api_used = "groq"
-                    logger.info("✅ Chatbot response generated using Groq")
-                else:
-                    logger.warning(f"Groq API failed: {response.status_code}")
-            except Exception as e:
-                logger.warning(f"Groq API error: {str(e)}")
+def chat_greeting(plan_name: str, plan_features: List[str]) -> str:
+    """The assistant message the chat widget opens with, so the model sees the question the user answers"""
+    return f"Hello! You've selected the {plan_name}. This plan includes: {', '.join(plan_features)}. To get started, please tell me your name."
+
+def client_transcript(request: ChatRequest) -> List[dict]:
+    """The conversation so far as sent by the client, in provider format"""
+    return [
+        {"role": "user" if msg.role == "user" else "assistant", "content": msg.content}
+        for msg in request.messages
+    ]
+
+@dataclass
+class ChatTurn:
+    session_id: str
+    user_text: str
+    transcript: List[dict]  # the conversation, ending with the new user message
+    context: chat_context.ChatContext
+    summary: Optional[chat_context.ChatSummary]
+    session: Optional[chat_context.SessionTranscript] = None  # delta requests only
+    greeting: Optional[str] = None  # saved ahead of the first turn of a new delta session
+
+async def prepare_chat_turn(db: AsyncSession, user_id: str, request: ChatRequest) -> ChatTurn:
+    """Rebuild the conversation and fit it, with the running summary, into the plan's token budget"""
+    session_id = request.session_id or str(uuid.uuid4())
+    session = greeting = None
+    if request.message is not None:
+        # Delta request: the server's own transcript, so client-supplied assistant turns are never trusted
+        if request.session_id:
+            session = await session_transcripts.get(db, user_id, session_id, request.turn)
+        else:
+            greeting = chat_greeting(request.plan_name, request.plan_features)
+            session = chat_context.SessionTranscript([{"role": "assistant", "content": greeting}], None, 0)
+        user_text = request.message
+        transcript = session.messages + [{"role": "user", "content": user_text}]
+        summary = session.summary
+    else:
+        user_text = request.messages[-1].content if request.messages else ""
+        transcript = client_transcript(request)
+        summary = await chat_context.load_summary(db, user_id, session_id) if request.session_id else None
+
+    context = chat_context.build_context(
+        chat_system_prompt(request.plan_name), transcript, summary, chat_context.context_budget(request.plan_name)
+    )
+    chat_compactor.record_turn(context)
+    return ChatTurn(session_id, user_text, transcript, context, summary, session, greeting)
+
+def finish_chat_turn(user_id: str, turn: ChatTurn, reply: str) -> int:
+    """Update the session cache, schedule a summary update if due, and return the session's turn count"""
+    if turn.session is not None:
+        session_transcripts.append(user_id, turn.session_id, turn.session, turn.user_text, reply)
+        turns = turn.session.turns
+        transcript = list(turn.session.messages)
+    else:
+        # A full-conversation request moved the session on without the cache
+        session_transcripts.invalidate(user_id, turn.session_id)
+        turns = sum(1 for message in turn.transcript if message["role"] == "user")
+        transcript = turn.transcript + [{"role": "assistant", "content": reply}]
+    if turn.context.needs_compaction:
+        chat_compactor.schedule(user_id, turn.session_id, transcript, turn.summary)
+    return turns
+
+def chat_candidates(api_messages: List[dict]) -> List[ProviderRequest]:
+    """Groq first, Grok as (hedged) fallback"""
+    return [
+        ProviderRequest("groq", {
+            "model": settings.GROQ_MODEL,
+            "messages": api_messages,
+            "temperature": 0.7,
+            "max_tokens": 200
+        }),
+        ProviderRequest("grok", {
+            "model": settings.XAI_MODEL,
+            "messages": api_messages,
+            "temperature": 0.7,
+            "stream": False
+        }),
+    ]
+
+async def save_chat_turn(
+    db: AsyncSession, user_id: str, session_id: str, user_text: str, response_text: str, greeting: Optional[str] = None
+):
+    """Persist the user message and assistant reply (after the greeting of a new session); never fails the request"""
+    try:
+        if greeting is not None:
+            db.add(ChatbotHistory(
+                user_id=user_id,
+                session_id=session_id,
+                message_type="assistant",
+                message=greeting,
+                response=greeting,
+                intent="greeting"
+            ))
+
+        # Save user message
+        user_message = ChatbotHistory(
+            user_id=user_id,
+            session_id=session_id,
+            message_type="user",
+            message=user_text,
+            intent="project_definition"
+        )
+        db.add(user_message)
         
-        # Fallback to Grok if Groq failed
-        if not generated_response and settings.XAI_API_KEY:
-            try:
-                logger.info("Falling back to Grok API...")
-                async with httpx.AsyncClient(timeout=30.0) as client:
-                    response = await client.post(
-                        "https://api.x.ai/v1/chat/completions",
-                        headers={
-                            "Authorization": f"Bearer {settings.XAI_API_KEY}",
-                            "Content-Type": "application/json"
-                        },
-                        json={
-                            "model": settings.XAI_MODEL,
-                            "messages": api_messages,
-                            "temperature": 0.7,
-                            "stream": False
-                        }
-                    )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    generated_response = data['choices'][0]['message']['content'].strip()
-                    api_used = "grok"
-                    logger.info("✅ Chatbot response generated using Grok (fallback)")
-                else:
-                    logger.error(f"Grok API failed: {response.status_code}")
-            except Exception as e:
-                logger.error(f"Grok API error: {str(e)}")
+        # Save assistant response
+        assistant_message = ChatbotHistory(
+            user_id=user_id,
+            session_id=session_id,
+            message_type="assistant",
+            message=response_text,
+            response=response_text,
+            intent="project_definition"
+        )
+        db.add(assistant_message)
+        await db.commit()
+    except Exception as e:
+        logger.warning(f"Failed to save chat history: {e}")
+        await db.rollback()
+
+@router.post("/chat", response_model=ChatResponse)
+async def chat(
+    request: ChatRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Chatbot endpoint for conversational project assistance
+    Uses Groq API (with Grok fallback)
+    Send either the whole conversation as `messages`, or only the new
+    `message` with the `session_id` and `turn` of the previous reply
+    """
+    if not settings.GROQ_API_KEY and not settings.XAI_API_KEY:
+        raise HTTPException(status_code=500, detail="AI API keys not configured")
+    
+    try:
+        turn = await prepare_chat_turn(db, current_user.id, request)
         
-        if not generated_response:
+        try:
+            result = await gateway.complete(chat_candidates(turn.context.messages))
+        except LLMUnavailableError:
             raise HTTPException(status_code=500, detail="Failed to generate response from AI services")
         
+        generated_response = result.content
+        logger.info(f"✅ Chatbot response generated using {result.provider} ({result.latency_ms}ms)")
+        
         # Check if response suggests finalization
-        should_finalize = "[FINALIZE]" in generated_response
-        generated_response = generated_response.replace("[FINALIZE]", "").strip()
+        should_finalize = FINALIZE_MARKER in generated_response
+        generated_response = generated_response.replace(FINALIZE_MARKER, "").strip()
         
-        # Save to database
-        try:
-            # Save user message
-            user_message = ChatbotHistory(
-                user_id=current_user.id,
-                session_id=session_id,
-                message_type="user",
-                message=request.messages[-1].content if request.messages else "",
-                intent="project_definition"
-            )
-            db.add(user_message)
-            
-            # Save assistant response
-            assistant_message = ChatbotHistory(
-                user_id=current_user.id,
-                session_id=session_id,
-                message_type="assistant",
-                message=generated_response,
-                response=generated_response,
-                intent="project_definition"
-            )
-            db.add(assistant_message)
-            db.commit()
-        except Exception as e:
-            logger.warning(f"Failed to save chat history: {e}")
-            # Don't fail the request if history save fails
+        # Save to database (don't fail the request if history save fails)
+        await save_chat_turn(db, current_user.id, turn.session_id, turn.user_text, generated_response, turn.greeting)
         
         return ChatResponse(
             message=generated_response,
-            session_id=session_id,
-            should_finalize=should_finalize
+            session_id=turn.session_id,
+            should_finalize=should_finalize,
+            turn=finish_chat_turn(current_user.id, turn, generated_response)
         )
     
     except HTTPException:
@@ -192,11 +237,67 @@ Be friendly, professional, and guide the conversation efficiently."""
         logger.error(f"Chatbot error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Chatbot error: {str(e)}")
 
+@router.post("/chat/stream")
+async def chat_stream(
+    request: ChatRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Streaming variant of /chat as Server-Sent Events.
+    Emits {"type": "delta", "content"} per token chunk, then one
+    {"type": "done", "session_id", "message", "should_finalize", "turn"} (or
+    {"type": "error", "detail"}). The [FINALIZE] marker is stripped from the
+    stream even when split across chunks; history is saved once the stream ends.
+    """
+    if not settings.GROQ_API_KEY and not settings.XAI_API_KEY:
+        raise HTTPException(status_code=500, detail="AI API keys not configured")
+    
+    user_id = current_user.id
+    turn = await prepare_chat_turn(db, user_id, request)
+    
+    async def events():
+        marker = MarkerFilter(FINALIZE_MARKER)
+        parts = []
+        started = time.perf_counter()
+        try:
+            async for delta in gateway.stream(chat_candidates(turn.context.messages)):
+                text = marker.feed(delta)
+                if not parts and text:
+                    text = text.lstrip()
+                    logger.info(f"Chatbot first token after {int((time.perf_counter() - started) * 1000)}ms")
+                if text:
+                    parts.append(text)
+                    yield sse_event({"type": "delta", "content": text})
+            tail = marker.flush()
+            if tail:
+                parts.append(tail)
+                yield sse_event({"type": "delta", "content": tail})
+        except (LLMUnavailableError, ProviderError) as e:
+            logger.error(f"Chatbot stream error: {str(e)}")
+            yield sse_event({"type": "error", "detail": "Failed to generate response from AI services"})
+            return
+        
+        generated_response = "".join(parts).strip()
+        # Request-scoped session is already closed once streaming starts
+        async with AsyncSessionLocal() as db:
+            await save_chat_turn(db, user_id, turn.session_id, turn.user_text, generated_response, turn.greeting)
+        
+        yield sse_event({
+            "type": "done",
+            "session_id": turn.session_id,
+            "message": generated_response,
+            "should_finalize": marker.found,
+            "turn": finish_chat_turn(user_id, turn, generated_response)
+        })
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
 @router.post("/summarize", response_model=SummarizeResponse)
 async def summarize_conversation(
     request: SummarizeRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Summarize conversation text for project requirements
@@ -207,63 +308,31 @@ async def summarize_conversation(
     try:
         summary_prompt = f"Summarize the following project conversation into concise requirements:\n\n{request.text}\n\nProvide a clear, brief summary of the project requirements."
         
-        generated_summary = None
-        
-        # Try Groq first
-        if settings.GROQ_API_KEY:
-            try:
-                async with httpx.AsyncClient(timeout=30.0) as client:
-                    response = await client.post(
-                        "https://api.groq.com/openai/v1/chat/completions",
-                        headers={
-                            "Authorization": f"Bearer {settings.GROQ_API_KEY}",
-                            "Content-Type": "application/json"
-                        },
-                        json={
-                            "model": request.model or settings.GROQ_MODEL,
-                            "messages": [
-                                {"role": "system", "content": "You are a helpful assistant that summarizes project requirements."},
-                                {"role": "user", "content": summary_prompt}
-                            ],
-                            "temperature": request.temperature,
-                            "max_tokens": request.max_tokens
-                        }
-                    )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    generated_summary = data['choices'][0]['message']['content'].strip()
-                    logger.info("✅ Summary generated using Groq")
-            except Exception as e:
-                logger.warning(f"Groq summarization error: {e}")
+        summary_messages = [
+            {"role": "system", "content": "You are a helpful assistant that summarizes project requirements."},
+            {"role": "user", "content": summary_prompt}
+        ]
         
-        # Fallback to Grok
-        if not generated_summary and settings.XAI_API_KEY:
-            try:
-                async with httpx.AsyncClient(timeout=30.0) as client:
-                    response = await client.post(
-                        "https://api.x.ai/v1/chat/completions",
-                        headers={
-                            "Authorization": f"Bearer {settings.XAI_API_KEY}",
-                            "Content-Type": "application/json"
-                        },
-                        json={
-                            "model": settings.XAI_MODEL,
-                            "messages": [
-                                {"role": "system", "content": "You are a helpful assistant that summarizes project requirements."},
-                                {"role": "user", "content": summary_prompt}
-                            ],
-                            "temperature": request.temperature,
-                            "stream": False
-                        }
-                    )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    generated_summary = data['choices'][0]['message']['content'].strip()
-                    logger.info("✅ Summary generated using Grok")
-            except Exception as e:
-                logger.error(f"Grok summarization error: {e}")
+        generated_summary = None
+        try:
+            result = await gateway.complete([
+                ProviderRequest("groq", {
+                    "model": request.model or settings.GROQ_MODEL,
+                    "messages": summary_messages,
+                    "temperature": request.temperature,
+                    "max_tokens": request.max_tokens
+                }),
+                ProviderRequest("grok", {
+                    "model": settings.XAI_MODEL,
+                    "messages": summary_messages,
+                    "temperature": request.temperature,
+                    "stream": False
+                }),
+            ])
+            generated_summary = result.content
+            logger.info(f"✅ Summary generated using {result.provider}")
+        except LLMUnavailableError as e:
+            logger.warning(f"Summarization failed on all providers: {str(e)}")
         
         if not generated_summary:
             # Fallback to simple summary
@@ -279,15 +348,19 @@ async def summarize_conversation(
 async def get_chat_history(
     session_id: Optional[str] = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get chat history for current user"""
-    query = db.query(ChatbotHistory).filter(ChatbotHistory.user_id == current_user.id)
+    # Running summaries are context for the model, not part of the conversation
+    query = select(ChatbotHistory).where(
+        ChatbotHistory.user_id == current_user.id,
+        ChatbotHistory.message_type != chat_context.SUMMARY_MESSAGE_TYPE
+    )
     
     if session_id:
-        query = query.filter(ChatbotHistory.session_id == session_id)
+        query = query.where(ChatbotHistory.session_id == session_id)
     
-    history = query.order_by(ChatbotHistory.created_at.asc()).all()
+    history = (await db.scalars(query.order_by(ChatbotHistory.created_at.asc()))).all()
     
     return [
         {
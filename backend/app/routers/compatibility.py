@@ -3,9 +3,10 @@ Compatibility endpoints for frontend legacy API calls
 These are aliases/wrappers for existing endpoints
 """
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.security import get_current_user
 from app.models.user import User
 from app.models.project import Project
@@ -13,7 +14,7 @@ from app.models.admin_request import AdminRequest
 from app.schemas.user import UserResponse
 from app.schemas.project import ProjectResponse
 from app.schemas.admin_request import AdminRequestResponse
-from app.services.file_service import save_upload_file
+from app.services.blob_store import save_upload_blob, release_blob
 from typing import Optional
 
 router = APIRouter(prefix="/api", tags=["Compatibility"])
@@ -28,15 +29,15 @@ class UpdateProfileRequest(BaseModel):
 async def update_profile(
     profile_data: UpdateProfileRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Legacy endpoint: Update user profile (alias for PUT /api/users/me)"""
     update_data = profile_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(current_user, field, value)
     
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    await db.refresh(current_user)
     return UserResponse.model_validate(current_user)
 
 @router.get("/user/signup-status")
@@ -62,7 +63,7 @@ class CreateProjectIdeaRequest(BaseModel):
 async def create_project_idea(
     project_data: CreateProjectIdeaRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Legacy endpoint: Create project (alias for POST /api/projects)"""
     new_project = Project(
@@ -76,8 +77,8 @@ async def create_project_idea(
     )
     
     db.add(new_project)
-    db.commit()
-    db.refresh(new_project)
+    await db.commit()
+    await db.refresh(new_project)
     
     return ProjectResponse.model_validate(new_project)
 
@@ -86,20 +87,21 @@ async def upload_synopsis_for_project(
     project_id: str,
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Upload synopsis file for a specific project"""
     # Verify project belongs to user
-    project = db.query(Project).filter(
+    project = await db.scalar(select(Project).where(
         Project.id == project_id,
         Project.user_id == current_user.id
-    ).first()
+    ))
     
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    # Save file
-    file_path = await save_upload_file(file, "synopsis")
+    # Save file (deduplicated by content)
+    file_path = await save_upload_blob(file, db)
+    await release_blob(db, project.synopsis_file_path)
     
     # Update project
     project.synopsis_file_path = file_path
@@ -110,8 +112,8 @@ async def upload_synopsis_for_project(
     # Update user
     current_user.has_synopsis = True
     
-    db.commit()
-    db.refresh(project)
+    await db.commit()
+    await db.refresh(project)
     
     return {
         "message": "Synopsis uploaded successfully",
@@ -130,7 +132,7 @@ class AdminHelpRequest(BaseModel):
 async def request_admin_help(
     request_data: AdminHelpRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Submit a request for admin help"""
     new_request = AdminRequest(
@@ -142,7 +144,7 @@ async def request_admin_help(
     )
     
     db.add(new_request)
-    db.commit()
-    db.refresh(new_request)
+    await db.commit()
+    await db.refresh(new_request)
     
     return AdminRequestResponse.model_validate(new_request)
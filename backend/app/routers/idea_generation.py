@@ -2,18 +2,26 @@
 Idea Generation API using X.AI Grok
 Generates unique project ideas based on user's field of interest
 """
-from fastapi import APIRouter, Depends, HTTPException, Header
-from sqlalchemy.orm import Session
-from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Header, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from pydantic import BaseModel
-from app.core.database import get_db
+from app.core.database import get_async_db, AsyncSessionLocal
 from app.core.config import settings
-from app.core.security import get_current_user, get_current_admin_user
+from app.core.security import get_current_user, get_current_admin_user, decode_access_token
+from app.core.pagination import paginate
+from app.core.rate_limit import rate_limit, rate_limiter, llm_slots, requester_identity, is_authenticated
 from app.models.user import User
+from app.services.llm_gateway import gateway, ProviderRequest, ProviderError, LLMUnavailableError
+from app.services.streaming import sse_event, SSE_HEADERS
+from app.services.idea_cache import idea_cache
+from app.services import idea_quota
 from app.models.project import Project
 from app.models.idea_submission import IdeaSubmission
-import httpx
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/idea-generation", tags=["Idea Generation"])
@@ -34,33 +42,21 @@ class IdeaSubmissionRequest(BaseModel):
     interests: str
     generated_idea: str
 
-@router.post("/generate", response_model=IdeaGenerationResponse)
-async def generate_project_idea(
-    request: IdeaGenerationRequest,
-    db: Session = Depends(get_db),
-    authorization: Optional[str] = Header(None)
-):
-    """
-    Generate a unique project idea using X.AI Grok API with Groq fallback
-    Works for both authenticated and guest users
-    """
-    if not settings.XAI_API_KEY and not settings.GROQ_API_KEY:
-        raise HTTPException(status_code=500, detail="AI API keys not configured")
-    
-    try:
-        # Analyze user input to determine if it's specific or vague
-        user_input = request.field_of_interest.strip()
-        
-        # Check if user provided specific details (tech stack, devices, specific idea)
-        has_specifics = any([
-            len(user_input.split()) > 3,  # More than 3 words = likely specific
-            any(tech in user_input.lower() for tech in ['arduino', 'raspberry', 'python', 'react', 'node', 'ml', 'ai', 'sensor', 'app', 'web', 'mobile', 'iot', 'blockchain', 'flutter', 'django', 'flask']),
-            any(word in user_input.lower() for word in ['monitoring', 'tracking', 'detection', 'prediction', 'automation', 'management', 'analysis', 'control'])
-        ])
-        
-        if has_specifics:
-            # User provided specific input - build on their idea
-            prompt = f"""You are a final year engineering project advisor. The student has this project idea/interest:
+TECH_KEYWORDS = ['arduino', 'raspberry', 'python', 'react', 'node', 'ml', 'ai', 'sensor', 'app', 'web', 'mobile', 'iot', 'blockchain', 'flutter', 'django', 'flask']
+DOMAIN_KEYWORDS = ['monitoring', 'tracking', 'detection', 'prediction', 'automation', 'management', 'analysis', 'control']
+
+def has_specific_details(user_input: str) -> bool:
+    """Check if user provided specific details (tech stack, devices, specific idea)"""
+    return any([
+        len(user_input.split()) > 3,  # More than 3 words = likely specific
+        any(tech in user_input.lower() for tech in TECH_KEYWORDS),
+        any(word in user_input.lower() for word in DOMAIN_KEYWORDS)
+    ])
+
+def build_idea_prompt(user_input: str, has_specifics: bool) -> str:
+    if has_specifics:
+        # User provided specific input - build on their idea
+        return f"""You are a final year engineering project advisor. The student has this project idea/interest:
 
 "{user_input}"
 
@@ -72,9 +68,8 @@ Based on their input, generate ONE complete and enhanced project idea that:
 - Makes it unique and industry-relevant
 
 Format: Just provide the enhanced project idea description, nothing else."""
-        else:
-            # Vague input - generate random innovative idea
-            prompt = f"""You are a final year engineering project advisor. Generate ONE unique, innovative, and practical project idea for a student interested in: {user_input}
+    # Vague input - generate random innovative idea
+    return f"""You are a final year engineering project advisor. Generate ONE unique, innovative, and practical project idea for a student interested in: {user_input}
 
 Requirements:
 - Keep it under 100 words
@@ -85,101 +80,82 @@ Requirements:
 
 Format: Just provide the project idea description, nothing else."""
 
-        generated_idea = None
-        api_used = "unknown"
-        
-        # Try Grok first if API key is available
-        if settings.XAI_API_KEY:
-            try:
-                logger.info("Attempting to generate idea using Grok API...")
-                async with httpx.AsyncClient(timeout=30.0) as client:
-                    response = await client.post(
-                        "https://api.x.ai/v1/chat/completions",
-                        headers={
-                            "Authorization": f"Bearer {settings.XAI_API_KEY}",
-                            "Content-Type": "application/json"
-                        },
-                        json={
-                            "messages": [
-                                {
-                                    "role": "system",
-                                    "content": "You are a helpful engineering project advisor who generates unique and innovative project ideas."
-                                },
-                                {
-                                    "role": "user",
-                                    "content": prompt
-                                }
-                            ],
-                            "model": settings.XAI_MODEL,
-                            "stream": False,
-                            "temperature": 0.8
-                        }
-                    )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    generated_idea = data['choices'][0]['message']['content'].strip()
-                    api_used = "grok"
-                    logger.info("✅ Idea generated successfully using Grok")
-                else:
-                    logger.warning(f"Grok API failed: {response.status_code} - {response.text[:200]}")
-            except Exception as e:
-                logger.warning(f"Grok API error: {str(e)}")
+def idea_candidates(prompt: str) -> List[ProviderRequest]:
+    """Grok first, Groq as (hedged) fallback"""
+    messages = [
+        {
+            "role": "system",
+            "content": "You are a helpful engineering project advisor who generates unique and innovative project ideas."
+        },
+        {"role": "user", "content": prompt}
+    ]
+    return [
+        ProviderRequest("grok", {
+            "messages": messages,
+            "model": settings.XAI_MODEL,
+            "stream": False,
+            "temperature": 0.8
+        }),
+        ProviderRequest("groq", {
+            "messages": messages,
+            "model": settings.GROQ_MODEL,
+            "temperature": 0.8,
+            "max_tokens": 500
+        }),
+    ]
+
+def describe_requester(authorization: Optional[str]) -> str:
+    """User id from an optional bearer token, for logging only"""
+    user_info = "guest user"
+    if authorization:
+        try:
+            from app.core.security import decode_access_token
+            token = authorization.replace("Bearer ", "")
+            payload = decode_access_token(token)
+            user_info = payload.get("sub", "unknown")
+        except:
+            pass
+    return user_info
+
+@router.post("/generate", response_model=IdeaGenerationResponse, dependencies=[Depends(rate_limit("idea_generate"))])
+async def generate_project_idea(
+    request: IdeaGenerationRequest,
+    http_request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    authorization: Optional[str] = Header(None)
+):
+    """
+    Generate a unique project idea using X.AI Grok API with Groq fallback
+    Works for both authenticated and guest users
+    """
+    if not settings.XAI_API_KEY and not settings.GROQ_API_KEY:
+        raise HTTPException(status_code=500, detail="AI API keys not configured")
+    
+    try:
+        # Analyze user input to determine if it's specific or vague
+        user_input = request.field_of_interest.strip()
+        has_specifics = has_specific_details(user_input)
         
-        # Fallback to Groq if Grok failed or not configured
-        if not generated_idea and settings.GROQ_API_KEY:
+        # Hot topics are served from cached variants (see app/services/idea_cache.py)
+        generated_idea = await idea_cache.get(db, user_input, has_specifics)
+        if generated_idea:
+            logger.info(f"✅ Idea served from cache - Field: {request.field_of_interest}")
+        else:
             try:
-                logger.info("Falling back to Groq API...")
-                async with httpx.AsyncClient(timeout=30.0) as client:
-                    response = await client.post(
-                        "https://api.groq.com/openai/v1/chat/completions",
-                        headers={
-                            "Authorization": f"Bearer {settings.GROQ_API_KEY}",
-                            "Content-Type": "application/json"
-                        },
-                        json={
-                            "messages": [
-                                {
-                                    "role": "system",
-                                    "content": "You are a helpful engineering project advisor who generates unique and innovative project ideas."
-                                },
-                                {
-                                    "role": "user",
-                                    "content": prompt
-                                }
-                            ],
-                            "model": settings.GROQ_MODEL,
-                            "temperature": 0.8,
-                            "max_tokens": 500
-                        }
-                    )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    generated_idea = data['choices'][0]['message']['content'].strip()
-                    api_used = "groq"
-                    logger.info("✅ Idea generated successfully using Groq (fallback)")
-                else:
-                    logger.error(f"Groq API failed: {response.status_code} - {response.text}")
-            except Exception as e:
-                logger.error(f"Groq API error: {str(e)}")
-        
-        # If both failed, raise error
-        if not generated_idea:
-            raise HTTPException(status_code=500, detail="Failed to generate idea from AI services")
+                # Guests are shed first when the worker's LLM slots fill up
+                async with llm_slots.slot(is_authenticated(requester_identity(http_request))):
+                    result = await gateway.complete(idea_candidates(build_idea_prompt(user_input, has_specifics)))
+            except LLMUnavailableError as e:
+                if e.timed_out:
+                    raise HTTPException(status_code=504, detail="AI service timeout. Please try again.")
+                raise HTTPException(status_code=500, detail="Failed to generate idea from AI services")
+            
+            generated_idea = result.content
+            logger.info(f"✅ Idea generated successfully using {result.provider} ({result.latency_ms}ms)")
+            await idea_cache.put(db, user_input, has_specifics, generated_idea)
         
         # Log generation (user info optional)
-        user_info = "guest user"
-        if authorization:
-            try:
-                from app.core.security import decode_access_token
-                token = authorization.replace("Bearer ", "")
-                payload = decode_access_token(token)
-                user_info = payload.get("sub", "unknown")
-            except:
-                pass
-        
-        logger.info(f"Generated idea for {user_info} - Field: {request.field_of_interest}")
+        logger.info(f"Generated idea for {describe_requester(authorization)} - Field: {request.field_of_interest}")
         
         return IdeaGenerationResponse(
             idea=generated_idea,
@@ -187,42 +163,122 @@ Format: Just provide the project idea description, nothing else."""
             success=True
         )
         
-    except httpx.TimeoutException:
-        logger.error("X.AI API timeout")
-        raise HTTPException(status_code=504, detail="AI service timeout. Please try again.")
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error generating idea: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to generate idea: {str(e)}")
 
+@router.post("/generate/stream", dependencies=[Depends(rate_limit("idea_generate"))])
+async def generate_project_idea_stream(
+    request: IdeaGenerationRequest,
+    http_request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    authorization: Optional[str] = Header(None)
+):
+    """
+    Streaming variant of /generate as Server-Sent Events.
+    Emits {"type": "delta", "content"} per token chunk, then
+    {"type": "done", "idea", "field", "success"} or {"type": "error", "detail"}.
+    """
+    if not settings.XAI_API_KEY and not settings.GROQ_API_KEY:
+        raise HTTPException(status_code=500, detail="AI API keys not configured")
+    
+    user_input = request.field_of_interest.strip()
+    has_specifics = has_specific_details(user_input)
+    requester = describe_requester(authorization)
+    cached_idea = await idea_cache.get(db, user_input, has_specifics)
+    authenticated = is_authenticated(requester_identity(http_request))
+    if not cached_idea:
+        # Refuse with a 503 before the stream starts; the slot itself is held while streaming
+        llm_slots.check(authenticated)
+    
+    async def events():
+        if cached_idea:
+            logger.info(f"✅ Idea served from cache (stream) - Field: {request.field_of_interest}")
+            yield sse_event({"type": "delta", "content": cached_idea})
+            yield sse_event({"type": "done", "idea": cached_idea, "field": request.field_of_interest, "success": True})
+            return
+        
+        parts = []
+        started = time.perf_counter()
+        try:
+            async with llm_slots.slot(authenticated):
+                async for delta in gateway.stream(idea_candidates(build_idea_prompt(user_input, has_specifics))):
+                    if not parts:
+                        delta = delta.lstrip()
+                        if not delta:
+                            continue
+                        logger.info(f"Idea first token after {int((time.perf_counter() - started) * 1000)}ms")
+                    parts.append(delta)
+                    yield sse_event({"type": "delta", "content": delta})
+        except HTTPException as e:
+            # Slots filled up between the check and the start of the stream
+            yield sse_event({"type": "error", "detail": e.detail})
+            return
+        except LLMUnavailableError as e:
+            detail = "AI service timeout. Please try again." if e.timed_out else "Failed to generate idea from AI services"
+            yield sse_event({"type": "error", "detail": detail})
+            return
+        except ProviderError as e:
+            logger.error(f"Idea stream error: {str(e)}")
+            yield sse_event({"type": "error", "detail": "Failed to generate idea from AI services"})
+            return
+        
+        generated_idea = "".join(parts).strip()
+        logger.info(f"Generated idea (stream) for {requester} - Field: {request.field_of_interest}")
+        # Request-scoped session is already closed once streaming starts
+        async with AsyncSessionLocal() as cache_db:
+            await idea_cache.put(cache_db, user_input, has_specifics, generated_idea)
+        yield sse_event({
+            "type": "done",
+            "idea": generated_idea,
+            "field": request.field_of_interest,
+            "success": True
+        })
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+def bearer_user_id(authorization: Optional[str]) -> Optional[str]:
+    """User id of a valid bearer token, or None for guests"""
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return None
+    try:
+        return decode_access_token(authorization[7:].strip()).get("sub")
+    except HTTPException:
+        return None
+
+def quota_counters(user_id: Optional[str], phone: Optional[str]) -> List[tuple]:
+    """
+    The (kind, subject) counters a submission is charged to: the user's (when
+    logged in) and the phone number's. Users come first so concurrent claims
+    lock the rows in the same order.
+    """
+    counters = []
+    if user_id:
+        counters.append(("user", user_id))
+    if phone:
+        counters.append(("phone", idea_quota.normalize_phone(phone)))
+    return counters
+
 @router.get("/count")
 async def get_generation_count(
     phone: str = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     authorization: Optional[str] = Header(None)
 ):
     """
     Get how many times user has generated ideas
-    Checks by user_id if logged in, or by phone number
+    Checks the user's counter if logged in and the phone number's, and
+    reports whichever is higher (submit-idea charges both)
     Works for both authenticated and guest users
     """
     try:
-        # Try to get user from token if provided
-        user_id = None
-        if authorization:
-            try:
-                from app.core.security import decode_access_token
-                token = authorization.replace("Bearer ", "")
-                payload = decode_access_token(token)
-                user_id = payload.get("sub")
-            except:
-                pass
-        
-        if user_id:
-            count = db.query(IdeaSubmission).filter(IdeaSubmission.user_id == user_id).count()
-        elif phone:
-            count = db.query(IdeaSubmission).filter(IdeaSubmission.phone == phone).count()
-        else:
-            count = 0
+        counts = [
+            await idea_quota.get_count(db, kind, subject)
+            for kind, subject in quota_counters(bearer_user_id(authorization), phone)
+        ]
+        count = max(counts, default=0)
         
         return {
             "count": count,
@@ -234,35 +290,34 @@ async def get_generation_count(
         logger.error(f"Error getting count: {str(e)}")
         return {"count": 0, "max": MAX_GENERATIONS_PER_USER, "remaining": MAX_GENERATIONS_PER_USER, "can_generate": True}
 
-@router.post("/submit-idea")
+@router.post("/submit-idea", dependencies=[Depends(rate_limit("idea_submit"))])
 async def submit_idea(
     request: IdeaSubmissionRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    authorization: Optional[str] = Header(None)
 ):
     """
     Submit idea - works for both logged in and guest users
     Tracks generation count and enforces limit
     """
     try:
-        # Try to get current user (optional - can be guest)
-        token = None
-        user_id = None
-        try:
-            # This will fail if not logged in, which is fine
-            from fastapi import Header
-            pass
-        except:
-            pass
+        # The user is optional - guests are charged by phone number only
+        user_id = bearer_user_id(authorization)
+        phone_key = idea_quota.normalize_phone(request.phone)
+        await rate_limiter.hit("idea_submit", f"phone:{phone_key}")
         
-        # Check generation count by phone number
-        existing_count = db.query(IdeaSubmission).filter(IdeaSubmission.phone == request.phone).count()
+        # Charge every counter; each check and increment is one atomic statement
+        counters = quota_counters(user_id, request.phone)
+        counts = [await idea_quota.claim(db, kind, subject, MAX_GENERATIONS_PER_USER) for kind, subject in counters]
         
-        if existing_count >= MAX_GENERATIONS_PER_USER:
+        if None in counts:
+            await db.rollback()
             return {
                 "success": False,
                 "message": f"You've reached the limit of {MAX_GENERATIONS_PER_USER} idea generations. Please contact us for more discussion.",
                 "limit_reached": True
             }
+        generation_count = max(counts)
         
         # Save submission
         submission = IdeaSubmission(
@@ -271,44 +326,45 @@ async def submit_idea(
             phone=request.phone,
             interests=request.interests,
             generated_idea=request.generated_idea,
-            generation_count=existing_count + 1
+            generation_count=generation_count
         )
         
         db.add(submission)
-        db.commit()
-        db.refresh(submission)
+        await db.commit()
+        await db.refresh(submission)
+        for (kind, subject), count in zip(counters, counts):
+            idea_quota.remember(kind, subject, count)
         
-        logger.info(f"Idea submitted by {request.name} ({request.phone}) - Count: {existing_count + 1}")
+        logger.info(f"Idea submitted by {request.name} ({request.phone}) - Count: {generation_count}")
         
         return {
             "success": True,
             "message": "Your idea has been submitted successfully! We will reach out to you shortly.",
             "submission_id": submission.id,
-            "generation_count": existing_count + 1,
-            "remaining": MAX_GENERATIONS_PER_USER - (existing_count + 1)
+            "generation_count": generation_count,
+            "remaining": MAX_GENERATIONS_PER_USER - generation_count
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error submitting idea: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to submit idea: {str(e)}")
 
 @router.get("/submissions")
 async def get_all_submissions(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     admin_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Admin endpoint to view all idea submissions
     """
     try:
-        submissions = db.query(IdeaSubmission).order_by(
-            IdeaSubmission.created_at.desc()
-        ).offset(skip).limit(limit).all()
-        
-        return [{
+        return await paginate(db, select(IdeaSubmission), IdeaSubmission, lambda s: {
             "id": s.id,
             "user_id": s.user_id,
             "name": s.name,
@@ -317,8 +373,10 @@ async def get_all_submissions(
             "generated_idea": s.generated_idea,
             "generation_count": s.generation_count,
             "created_at": s.created_at.isoformat()
-        } for s in submissions]
+        }, skip, limit, cursor)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching submissions: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch submissions: {str(e)}")
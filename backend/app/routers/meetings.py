@@ -1,11 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from app.core.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from typing import List, Optional, Union
+from app.core.database import get_async_db
 from app.core.security import get_current_user, get_current_admin_user
 from app.models.user import User
 from app.models.meeting import Meeting
 from app.schemas.meeting import MeetingCreate, MeetingResponse, MeetingUpdate
+from app.core.pagination import paginate
+from app.core.query_budget import query_budget
+from app.schemas.pagination import Page
 
 router = APIRouter(prefix="/api/meetings", tags=["Meetings"])
 
@@ -13,32 +18,32 @@ router = APIRouter(prefix="/api/meetings", tags=["Meetings"])
 async def create_meeting_request(
     meeting_data: MeetingCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     new_meeting = Meeting(
         user_id=current_user.id,
         **meeting_data.model_dump()
     )
     db.add(new_meeting)
-    db.commit()
-    db.refresh(new_meeting)
+    await db.commit()
+    await db.refresh(new_meeting)
     return MeetingResponse.model_validate(new_meeting)
 
 @router.get("/", response_model=List[MeetingResponse])
 async def get_my_meetings(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    meetings = db.query(Meeting).filter(Meeting.user_id == current_user.id).all()
+    meetings = (await db.scalars(select(Meeting).where(Meeting.user_id == current_user.id))).all()
     return [MeetingResponse.model_validate(m) for m in meetings]
 
 # Alias for /me
 @router.get("/me", response_model=List[MeetingResponse])
 async def get_my_meetings_me(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    meetings = db.query(Meeting).filter(Meeting.user_id == current_user.id).all()
+    meetings = (await db.scalars(select(Meeting).where(Meeting.user_id == current_user.id))).all()
     return [MeetingResponse.model_validate(m) for m in meetings]
 
 @router.put("/{meeting_id}", response_model=MeetingResponse)
@@ -46,9 +51,9 @@ async def update_meeting(
     meeting_id: str,
     meeting_update: MeetingUpdate,
     admin_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    meeting = db.query(Meeting).filter(Meeting.id == meeting_id).first()
+    meeting = await db.scalar(select(Meeting).where(Meeting.id == meeting_id))
     if not meeting:
         raise HTTPException(status_code=404, detail="Meeting not found")
     
@@ -56,37 +61,40 @@ async def update_meeting(
     for field, value in update_data.items():
         setattr(meeting, field, value)
     
-    db.commit()
-    db.refresh(meeting)
+    await db.commit()
+    await db.refresh(meeting)
     return MeetingResponse.model_validate(meeting)
 
-from sqlalchemy.orm import Session, joinedload
-
-# ... (rest of imports)
-
 @router.delete("/{meeting_id}")
 async def delete_meeting(
     meeting_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    meeting = db.query(Meeting).filter(
+    meeting = await db.scalar(select(Meeting).where(
         Meeting.id == meeting_id,
         Meeting.user_id == current_user.id
-    ).first()
+    ))
     if not meeting:
         raise HTTPException(status_code=404, detail="Meeting not found")
     
-    db.delete(meeting)
-    db.commit()
+    await db.delete(meeting)
+    await db.commit()
     return {"message": "Meeting deleted successfully"}
 
-@router.get("/all", response_model=List[MeetingResponse])
+@router.get("/all", response_model=Union[List[MeetingResponse], Page[MeetingResponse]])
+@query_budget(3)
 async def get_all_meetings(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     admin_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    meetings = db.query(Meeting).options(joinedload(Meeting.user)).order_by(Meeting.meeting_date.desc()).offset(skip).limit(limit).all()
-    return [MeetingResponse.model_validate(m) for m in meetings]
+    query = select(Meeting).options(joinedload(Meeting.user))
+    if cursor is None:
+        # Offset mode keeps its schedule order (meeting_date is nullable, so
+        # it cannot serve as a cursor key; cursor mode pages by creation)
+        meetings = (await db.scalars(query.order_by(Meeting.meeting_date.desc(), Meeting.id.desc()).offset(skip).limit(limit))).all()
+        return [MeetingResponse.model_validate(m) for m in meetings]
+    return await paginate(db, query, Meeting, MeetingResponse.model_validate, skip, limit, cursor)
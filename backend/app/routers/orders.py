@@ -1,11 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from app.core.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
+from app.core.database import get_async_db
 from app.core.security import get_current_user, get_current_admin_user
 from app.models.user import User
 from app.models.order import Order
 from app.schemas.order import OrderCreate, OrderResponse, OrderUpdate
+from app.core.pagination import paginate
+from app.core.query_budget import query_budget
+from app.schemas.pagination import Page
 
 router = APIRouter(prefix="/api/orders", tags=["Orders"])
 
@@ -13,55 +17,56 @@ router = APIRouter(prefix="/api/orders", tags=["Orders"])
 async def create_order(
     order_data: OrderCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     new_order = Order(
         user_id=current_user.id,
         **order_data.model_dump()
     )
     db.add(new_order)
-    db.commit()
-    db.refresh(new_order)
+    await db.commit()
+    await db.refresh(new_order)
     return OrderResponse.model_validate(new_order)
 
 @router.get("/", response_model=List[OrderResponse])
 async def get_my_orders(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    orders = db.query(Order).filter(Order.user_id == current_user.id).all()
+    orders = (await db.scalars(select(Order).where(Order.user_id == current_user.id))).all()
     return [OrderResponse.model_validate(order) for order in orders]
 
 # Alias for /me
 @router.get("/me", response_model=List[OrderResponse])
 async def get_my_orders_me(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    orders = db.query(Order).filter(Order.user_id == current_user.id).all()
+    orders = (await db.scalars(select(Order).where(Order.user_id == current_user.id))).all()
     return [OrderResponse.model_validate(order) for order in orders]
 
 # Admin: get all orders (alias for frontend)
-@router.get("/all", response_model=List[OrderResponse])
+@router.get("/all", response_model=Union[List[OrderResponse], Page[OrderResponse]])
+@query_budget(3)
 async def get_all_orders_alias(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     admin_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    orders = db.query(Order).offset(skip).limit(limit).all()
-    return [OrderResponse.model_validate(order) for order in orders]
+    return await paginate(db, select(Order), Order, OrderResponse.model_validate, skip, limit, cursor)
 
 @router.get("/{order_id}", response_model=OrderResponse)
 async def get_order_by_id(
     order_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    order = db.query(Order).filter(
+    order = await db.scalar(select(Order).where(
         Order.id == order_id,
         Order.user_id == current_user.id
-    ).first()
+    ))
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     return OrderResponse.model_validate(order)
@@ -71,9 +76,9 @@ async def update_order(
     order_id: str,
     order_update: OrderUpdate,
     admin_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = await db.scalar(select(Order).where(Order.id == order_id))
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     
@@ -81,16 +86,17 @@ async def update_order(
     for field, value in update_data.items():
         setattr(order, field, value)
     
-    db.commit()
-    db.refresh(order)
+    await db.commit()
+    await db.refresh(order)
     return OrderResponse.model_validate(order)
 
-@router.get("/all/list", response_model=List[OrderResponse])
+@router.get("/all/list", response_model=Union[List[OrderResponse], Page[OrderResponse]])
+@query_budget(3)
 async def get_all_orders(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     admin_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    orders = db.query(Order).offset(skip).limit(limit).all()
-    return [OrderResponse.model_validate(order) for order in orders]
+    return await paginate(db, select(Order), Order, OrderResponse.model_validate, skip, limit, cursor)
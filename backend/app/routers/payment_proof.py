@@ -4,20 +4,21 @@ Flow:
 - Student uploads a payment screenshot against an Order.
 - Admin reviews and approves -> marks Order.status = 'completed'.
 
-Note: In production, store files in S3/Blob; local disk is fine for dev.
+Files go through the configured storage backend (local disk or S3, see
+app/services/storage.py).
 """
 
 from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timezone
-import os
 
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.security import get_current_user, get_current_admin_user
 from app.models.user import User
 from app.models.order import Order
-from app.services.file_service import save_upload_file
+from app.services.blob_store import save_upload_blob, release_blob
+from app.services.downloads import file_download
 
 router = APIRouter(prefix="/api/payment", tags=["Payment"])
 
@@ -27,9 +28,9 @@ async def upload_payment_proof(
     order_id: str,
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    order = db.query(Order).filter(Order.id == order_id, Order.user_id == current_user.id).first()
+    order = await db.scalar(select(Order).where(Order.id == order_id, Order.user_id == current_user.id))
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
 
@@ -38,15 +39,16 @@ async def upload_payment_proof(
     if not (filename.endswith(".jpg") or filename.endswith(".jpeg") or filename.endswith(".png")):
         raise HTTPException(status_code=400, detail="Only JPG/JPEG/PNG images are allowed")
 
-    proof_path = await save_upload_file(file, "payments")
+    proof_path = await save_upload_blob(file, db)
+    await release_blob(db, order.payment_proof_path)
 
     order.payment_proof_path = proof_path
     order.payment_proof_original_name = file.filename
     order.payment_proof_uploaded_at = datetime.now(timezone.utc)
     order.status = "paid"  # submitted proof (awaiting admin verification)
 
-    db.commit()
-    db.refresh(order)
+    await db.commit()
+    await db.refresh(order)
 
     return {
         "success": True,
@@ -64,44 +66,47 @@ async def upload_payment_proof(
 async def get_my_payment_proof(
     order_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    order = db.query(Order).filter(Order.id == order_id, Order.user_id == current_user.id).first()
+    order = await db.scalar(select(Order).where(Order.id == order_id, Order.user_id == current_user.id))
     if not order or not order.payment_proof_path:
         raise HTTPException(status_code=404, detail="Payment proof not found")
 
-    if not os.path.exists(order.payment_proof_path):
-        raise HTTPException(status_code=404, detail="Payment proof file missing")
-
-    return FileResponse(order.payment_proof_path, media_type="image/*", filename=order.payment_proof_original_name or "payment.png")
+    return await file_download(
+        order.payment_proof_path,
+        order.payment_proof_original_name or "payment.png",
+        "image/*",
+        cache_policy="payment_proof",
+        not_found_detail="Payment proof file missing"
+    )
 
 
 @router.get("/admin/orders/{order_id}/proof")
 async def admin_get_payment_proof(
     order_id: str,
     admin_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = await db.scalar(select(Order).where(Order.id == order_id))
     if not order or not order.payment_proof_path:
         raise HTTPException(status_code=404, detail="Payment proof not found")
 
-    if not os.path.exists(order.payment_proof_path):
-        raise HTTPException(status_code=404, detail="Payment proof file missing")
-
-    # Normalize path for cross-platform compatibility
-    normalized_path = os.path.normpath(order.payment_proof_path)
-    
-    return FileResponse(normalized_path, media_type="image/*", filename=order.payment_proof_original_name or "payment.png")
+    return await file_download(
+        order.payment_proof_path,
+        order.payment_proof_original_name or "payment.png",
+        "image/*",
+        cache_policy="payment_proof",
+        not_found_detail="Payment proof file missing"
+    )
 
 
 @router.post("/admin/orders/{order_id}/approve")
 async def admin_approve_payment(
     order_id: str,
     admin_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = await db.scalar(select(Order).where(Order.id == order_id))
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
 
@@ -112,8 +117,8 @@ async def admin_approve_payment(
     order.payment_verified_at = datetime.now(timezone.utc)
     order.payment_verified_by = admin_user.id
 
-    db.commit()
-    db.refresh(order)
+    await db.commit()
+    await db.refresh(order)
 
     return {
         "success": True,
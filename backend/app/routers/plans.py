@@ -1,20 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.models.plan import Plan
 from app.schemas.plan import PlanResponse
 
 router = APIRouter(prefix="/api/plans", tags=["Plans"])
 
 @router.get("/", response_model=List[PlanResponse])
-async def get_all_plans(db: Session = Depends(get_db)):
-    plans = db.query(Plan).order_by(Plan.price.asc()).all()
+async def get_all_plans(db: AsyncSession = Depends(get_async_db)):
+    plans = (await db.scalars(select(Plan).order_by(Plan.price.asc()))).all()
     return [PlanResponse.model_validate(plan) for plan in plans]
 
 @router.get("/{plan_id}", response_model=PlanResponse)
-async def get_plan_by_id(plan_id: str, db: Session = Depends(get_db)):
-    plan = db.query(Plan).filter(Plan.id == plan_id).first()
+async def get_plan_by_id(plan_id: str, db: AsyncSession = Depends(get_async_db)):
+    plan = await db.scalar(select(Plan).where(Plan.id == plan_id))
     if not plan:
         raise HTTPException(status_code=404, detail="Plan not found")
     return PlanResponse.model_validate(plan)
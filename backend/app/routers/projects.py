@@ -1,13 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
 import os
-from fastapi.responses import FileResponse
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.security import get_current_user, get_current_admin_user
 from app.models.user import User
 from app.models.project import Project
 from app.schemas.project import ProjectCreate, ProjectResponse, ProjectUpdate
+from app.core.pagination import paginate
+from app.core.query_budget import query_budget
+from app.schemas.pagination import Page
+from app.services.downloads import file_download
 
 router = APIRouter(prefix="/api/projects", tags=["Projects"])
 
@@ -15,66 +19,67 @@ router = APIRouter(prefix="/api/projects", tags=["Projects"])
 async def create_project(
     project_data: ProjectCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     new_project = Project(
         user_id=current_user.id,
         **project_data.model_dump()
     )
     db.add(new_project)
-    db.commit()
-    db.refresh(new_project)
+    await db.commit()
+    await db.refresh(new_project)
     return ProjectResponse.model_validate(new_project)
 
 @router.get("/", response_model=List[ProjectResponse])
-def get_projects(
+async def get_projects(
     skip: int = 0,
     limit: int = 50,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Add maximum limit
     if limit > 100:
         limit = 100
     
-    projects = db.query(Project).filter(Project.user_id == current_user.id).order_by(Project.created_at.desc()).offset(skip).limit(limit).all()
+    projects = (await db.scalars(select(Project).where(Project.user_id == current_user.id).order_by(Project.created_at.desc()).offset(skip).limit(limit))).all()
     return [ProjectResponse.model_validate(p) for p in projects]
 
 # Alias for /me
 @router.get("/me", response_model=List[ProjectResponse])
-def get_my_projects_me(
+async def get_my_projects_me(
     skip: int = 0,
     limit: int = 50,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     if limit > 100:
         limit = 100
-    projects = db.query(Project).filter(Project.user_id == current_user.id).order_by(Project.created_at.desc()).offset(skip).limit(limit).all()
+    projects = (await db.scalars(select(Project).where(Project.user_id == current_user.id).order_by(Project.created_at.desc()).offset(skip).limit(limit))).all()
     return [ProjectResponse.model_validate(p) for p in projects]
 
 # Keep old endpoint for backwards compatibility but mark as deprecated
 @router.get("/all", response_model=List[ProjectResponse], deprecated=True)
+@query_budget(3)
 async def get_my_projects(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     if current_user.is_admin:
-        projects = db.query(Project).all()
+        projects = (await db.scalars(select(Project))).all()
     else:
-        projects = db.query(Project).filter(Project.user_id == current_user.id).all()
+        projects = (await db.scalars(select(Project).where(Project.user_id == current_user.id))).all()
     return [ProjectResponse.model_validate(project) for project in projects]
 
 @router.get("/{project_id}", response_model=ProjectResponse)
 async def get_project_by_id(
     project_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    project = db.query(Project).filter(
+    project = await db.scalar(select(Project).where(
         Project.id == project_id,
         Project.user_id == current_user.id
-    ).first()
+    ))
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     return ProjectResponse.model_validate(project)
@@ -84,12 +89,12 @@ async def update_project(
     project_id: str,
     project_update: ProjectUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    project = db.query(Project).filter(
+    project = await db.scalar(select(Project).where(
         Project.id == project_id,
         Project.user_id == current_user.id
-    ).first()
+    ))
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
@@ -97,53 +102,53 @@ async def update_project(
     for field, value in update_data.items():
         setattr(project, field, value)
     
-    db.commit()
-    db.refresh(project)
+    await db.commit()
+    await db.refresh(project)
     return ProjectResponse.model_validate(project)
 
 @router.delete("/{project_id}")
 async def delete_project(
     project_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    project = db.query(Project).filter(
+    project = await db.scalar(select(Project).where(
         Project.id == project_id,
         Project.user_id == current_user.id
-    ).first()
+    ))
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    db.delete(project)
-    db.commit()
+    await db.delete(project)
+    await db.commit()
     return {"message": "Project deleted successfully"}
 
-@router.get("/all/list", response_model=List[ProjectResponse])
+@router.get("/all/list", response_model=Union[List[ProjectResponse], Page[ProjectResponse]])
+@query_budget(3)
 async def get_all_projects(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     admin_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    projects = db.query(Project).offset(skip).limit(limit).all()
-    return [ProjectResponse.model_validate(project) for project in projects]
+    return await paginate(db, select(Project), Project, ProjectResponse.model_validate, skip, limit, cursor)
 
 @router.get("/download/me")
 async def download_my_project(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Download the current user's project file"""
-    project = db.query(Project).filter(Project.user_id == current_user.id).first()
+    project = await db.scalar(select(Project).where(Project.user_id == current_user.id))
     if not project or not project.project_file_path:
         raise HTTPException(status_code=404, detail="Project file not found")
 
     file_path = project.project_file_path
-    if not os.path.exists(file_path):
-        raise HTTPException(status_code=404, detail="File not found on server")
-
-    return FileResponse(
-        path=file_path,
-        filename=os.path.basename(file_path),
-        media_type="application/zip"
+    return await file_download(
+        file_path,
+        os.path.basename(file_path),
+        "application/zip",
+        cache_policy="project",
+        not_found_detail="File not found on server"
     )
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.security import get_current_user
 from app.models.user import User
 
@@ -15,14 +16,14 @@ class SelectPlanRequest(BaseModel):
 async def select_plan(
     request: SelectPlanRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update user's selected plan during signup"""
     from app.models.plan import Plan
     from app.models.order import Order
     
     # Get plan details
-    plan = db.query(Plan).filter(Plan.id == request.plan_id).first()
+    plan = await db.scalar(select(Plan).where(Plan.id == request.plan_id))
     if not plan:
         raise HTTPException(status_code=404, detail="Plan not found")
     
@@ -41,8 +42,8 @@ async def select_plan(
     )
     db.add(new_order)
     
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    await db.refresh(current_user)
     
     return {
         "message": "Plan selected successfully",
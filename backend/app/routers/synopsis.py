@@ -1,15 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Request, Path
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.core.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
+from app.core.database import get_async_db
 from app.core.security import get_current_user, get_current_admin_user
 from app.models.user import User
 from app.models.synopsis import Synopsis
 from app.schemas.synopsis import SynopsisResponse, SynopsisUpdate
-from app.services.file_service import save_upload_file
+from app.core.pagination import paginate
+from app.core.query_budget import query_budget
+from app.schemas.pagination import Page
+from app.services.blob_store import save_upload_blob
+from app.services.downloads import file_download
 from app.services.activity_logger import log_activity, get_client_ip, get_user_agent
-from fastapi.responses import FileResponse
-import os
 import logging
 import uuid
 
@@ -21,11 +24,11 @@ async def upload_synopsis(
     request: Request,
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     try:
         # Save file
-        file_path = await save_upload_file(file, "synopsis")
+        file_path = await save_upload_blob(file, db)
         
         # Create synopsis record
         new_synopsis = Synopsis(
@@ -39,12 +42,11 @@ async def upload_synopsis(
         # Update user
         current_user.has_synopsis = True
         
-        db.commit()
-        db.refresh(new_synopsis)
+        await db.commit()
+        await db.refresh(new_synopsis)
         
         # Log activity
         log_activity(
-            db=db,
             user_id=current_user.id,
             action="upload_synopsis",
             entity_type="synopsis",
@@ -65,7 +67,6 @@ async def upload_synopsis(
     except Exception as e:
         # Log failure
         log_activity(
-            db=db,
             user_id=current_user.id,
             action="upload_synopsis",
             entity_type="synopsis",
@@ -82,46 +83,47 @@ async def upload_synopsis(
 @router.get("/", response_model=List[SynopsisResponse])
 async def get_my_synopsis(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    synopsis_list = db.query(Synopsis).filter(Synopsis.user_id == current_user.id).all()
+    synopsis_list = (await db.scalars(select(Synopsis).where(Synopsis.user_id == current_user.id))).all()
     return [SynopsisResponse.model_validate(s) for s in synopsis_list]
 
 # IMPORTANT: /all routes must come BEFORE /{synopsis_id} to avoid conflicts!
-@router.get("/all/list", response_model=List[SynopsisResponse])
+@router.get("/all/list", response_model=Union[List[SynopsisResponse], Page[SynopsisResponse]])
+@query_budget(3)
 async def get_all_synopsis_list(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     admin_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    synopsis_list = db.query(Synopsis).offset(skip).limit(limit).all()
-    return [SynopsisResponse.model_validate(s) for s in synopsis_list]
+    return await paginate(db, select(Synopsis), Synopsis, SynopsisResponse.model_validate, skip, limit, cursor)
 
 # Add alias endpoint for /all to match frontend expectations
-@router.get("/all", response_model=List[SynopsisResponse])
+@router.get("/all", response_model=Union[List[SynopsisResponse], Page[SynopsisResponse]])
+@query_budget(3)
 async def get_all_synopsis(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     admin_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     logger.info(f"Admin {admin_user.email} fetching all synopsis")
-    synopsis_list = db.query(Synopsis).offset(skip).limit(limit).all()
-    logger.info(f"Found {len(synopsis_list)} synopsis records")
-    return [SynopsisResponse.model_validate(s) for s in synopsis_list]
+    return await paginate(db, select(Synopsis), Synopsis, SynopsisResponse.model_validate, skip, limit, cursor)
 
 @router.get("/{synopsis_id}", response_model=SynopsisResponse)
 async def get_synopsis_by_id(
     synopsis_id: str = Path(..., regex="^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # synopsis_id must be a UUID format, so "all" won't match
-    synopsis = db.query(Synopsis).filter(
+    synopsis = await db.scalar(select(Synopsis).where(
         Synopsis.id == synopsis_id,
         Synopsis.user_id == current_user.id
-    ).first()
+    ))
     if not synopsis:
         raise HTTPException(status_code=404, detail="Synopsis not found")
     return SynopsisResponse.model_validate(synopsis)
@@ -130,33 +132,25 @@ async def get_synopsis_by_id(
 async def download_synopsis(
     synopsis_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    synopsis = db.query(Synopsis).filter(
+    synopsis = await db.scalar(select(Synopsis).where(
         Synopsis.id == synopsis_id,
         Synopsis.user_id == current_user.id
-    ).first()
+    ))
     if not synopsis:
         raise HTTPException(status_code=404, detail="Synopsis not found")
     
-    file_path = synopsis.file_path
-    if not os.path.exists(file_path):
-        raise HTTPException(status_code=404, detail="File not found")
-    
-    return FileResponse(
-        path=file_path,
-        filename=synopsis.original_name,
-        media_type="application/pdf"
-    )
+    return await file_download(synopsis.file_path, synopsis.original_name, "application/pdf", cache_policy="synopsis")
 
 @router.put("/{synopsis_id}", response_model=SynopsisResponse)
 async def update_synopsis_status(
     synopsis_id: str,
     synopsis_update: SynopsisUpdate,
     admin_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    synopsis = db.query(Synopsis).filter(Synopsis.id == synopsis_id).first()
+    synopsis = await db.scalar(select(Synopsis).where(Synopsis.id == synopsis_id))
     if not synopsis:
         raise HTTPException(status_code=404, detail="Synopsis not found")
     
@@ -164,8 +158,8 @@ async def update_synopsis_status(
     for field, value in update_data.items():
         setattr(synopsis, field, value)
     
-    db.commit()
-    db.refresh(synopsis)
+    await db.commit()
+    await db.refresh(synopsis)
     return SynopsisResponse.model_validate(synopsis)
 
 # Admin: Download any synopsis
@@ -173,22 +167,14 @@ async def update_synopsis_status(
 async def admin_download_synopsis(
     synopsis_id: str,
     admin_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Admin endpoint to download any synopsis"""
-    synopsis = db.query(Synopsis).filter(Synopsis.id == synopsis_id).first()
+    synopsis = await db.scalar(select(Synopsis).where(Synopsis.id == synopsis_id))
     if not synopsis:
         raise HTTPException(status_code=404, detail="Synopsis not found")
     
-    file_path = synopsis.file_path
-    if not os.path.exists(file_path):
-        raise HTTPException(status_code=404, detail="File not found")
-    
-    return FileResponse(
-        path=file_path,
-        filename=synopsis.original_name,
-        media_type="application/pdf"
-    )
+    return await file_download(synopsis.file_path, synopsis.original_name, "application/pdf", cache_policy="synopsis")
 
 # Admin: Update synopsis status and notes
 @router.put("/admin/{synopsis_id}", response_model=SynopsisResponse)
@@ -197,10 +183,10 @@ async def admin_update_synopsis(
     status: Optional[str] = Query(None),
     admin_notes: Optional[str] = Query(None),
     admin_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Admin endpoint to update synopsis status and add notes"""
-    synopsis = db.query(Synopsis).filter(Synopsis.id == synopsis_id).first()
+    synopsis = await db.scalar(select(Synopsis).where(Synopsis.id == synopsis_id))
     if not synopsis:
         raise HTTPException(status_code=404, detail="Synopsis not found")
     
@@ -209,6 +195,6 @@ async def admin_update_synopsis(
     if admin_notes is not None:  # Allow empty string to clear notes
         synopsis.admin_notes = admin_notes
     
-    db.commit()
-    db.refresh(synopsis)
+    await db.commit()
+    await db.refresh(synopsis)
     return SynopsisResponse.model_validate(synopsis)
@@ -6,6 +6,8 @@ from app.schemas.meeting import MeetingCreate, MeetingResponse, MeetingUpdate
 from app.schemas.plan import PlanResponse
 from app.schemas.service import ServiceResponse
 from app.schemas.admin_request import AdminRequestCreate, AdminRequestResponse, AdminRequestUpdate
+from app.schemas.pagination import Page
+from app.schemas.student import StudentOverview
 
 __all__ = [
     "UserCreate", "UserLogin", "UserResponse", "UserUpdate",
@@ -15,5 +17,7 @@ __all__ = [
     "MeetingCreate", "MeetingResponse", "MeetingUpdate",
     "PlanResponse",
     "ServiceResponse",
-    "AdminRequestCreate", "AdminRequestResponse", "AdminRequestUpdate"
+    "AdminRequestCreate", "AdminRequestResponse", "AdminRequestUpdate",
+    "Page",
+    "StudentOverview"
 ]
@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from app.schemas.user import UserResponse
+from app.schemas.order import OrderResponse
+from app.schemas.project import ProjectResponse
+from app.schemas.synopsis import SynopsisResponse
+from app.schemas.meeting import MeetingResponse
+
+class StudentOverview(UserResponse):
+    """One row of the admin Students Grid: the user plus everything the grid joins to it"""
+    latest_order: Optional[OrderResponse] = None
+    current_order: Optional[OrderResponse] = None  # newest completed order, else the latest one
+    order_count: int = 0
+    total_paid: int = 0
+    has_paid: bool = False
+    projects: List[ProjectResponse] = []
+    synopsis: List[SynopsisResponse] = []
+    meetings: List[MeetingResponse] = []
@@ -1,17 +1,139 @@
 """
 Activity logging service for tracking user actions.
 Essential for debugging and monitoring in production.
+
+log_activity() only appends the entry to an in-memory buffer; a background
+task bulk-inserts the buffer every ACTIVITY_LOG_BATCH_SIZE entries or
+ACTIVITY_LOG_FLUSH_INTERVAL_MS, whichever comes first, so logging costs a
+request microseconds instead of a transaction. The buffer is bounded: when
+it is full the overflow policy drops an entry and counts it. Whatever is
+buffered is written when the app shuts down.
 """
-from sqlalchemy.orm import Session
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from sqlalchemy import insert
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
 from app.models.activity_log import ActivityLog
 from fastapi import Request
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+import asyncio
 import logging
+import time
+import uuid
 
 logger = logging.getLogger(__name__)
 
+@dataclass
+class WriterStats:
+    enqueued: int = 0
+    written: int = 0
+    batches: int = 0
+    dropped_overflow: int = 0
+    dropped_error: int = 0  # entries lost with a batch that failed to insert
+    write_ms_total: float = 0.0
+
+class ActivityLogWriter:
+    """Bounded buffer drained by one background task per event loop"""
+
+    def __init__(self, batch_size: int, flush_interval_ms: int, max_queue: int, overflow: str):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.stats = WriterStats()
+        self._buffer: deque = deque()
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._closing = False
+
+    def submit(self, entry: Dict[str, Any]):
+        """Buffer one row (never blocks, never raises)"""
+        if len(self._buffer) >= self.max_queue:
+            self.stats.dropped_overflow += 1
+            if self.overflow == "drop_newest":
+                return
+            self._buffer.popleft()
+        self._buffer.append(entry)
+        self.stats.enqueued += 1
+        self._ensure_task()
+        if len(self._buffer) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+
+    def _ensure_task(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # no loop yet; picked up by the next submit or flush
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._closing = False
+            self._wakeup = asyncio.Event()
+            self._task = loop.create_task(self._run(), name="activity-log-writer")
+
+    async def _run(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        count = min(self.batch_size, len(self._buffer))
+        return [self._buffer.popleft() for _ in range(count)]
+
+    async def flush(self):
+        """Write everything buffered so far"""
+        while self._buffer:
+            batch = self._take_batch()
+            started = time.perf_counter()
+            try:
+                async with AsyncSessionLocal() as db:
+                    # One multi-row INSERT per batch (executemany via insertmanyvalues)
+                    await db.execute(insert(ActivityLog), batch)
+                    await db.commit()
+            except Exception as e:
+                self.stats.dropped_error += len(batch)
+                logger.error(f"Failed to write {len(batch)} activity log entries: {str(e)}")
+                continue
+            self.stats.batches += 1
+            self.stats.written += len(batch)
+            self.stats.write_ms_total += (time.perf_counter() - started) * 1000
+
+    async def close(self):
+        """Stop the background task and write the remaining entries (app shutdown)"""
+        self._closing = True
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            if task.get_loop() is asyncio.get_running_loop():
+                self._wakeup.set()
+                await task
+            else:
+                task.cancel()
+        await self.flush()
+
+    def get_metrics(self) -> dict:
+        return {
+            "queued": len(self._buffer),
+            "max_queue": self.max_queue,
+            "batch_size": self.batch_size,
+            "flush_interval_ms": int(self.flush_interval * 1000),
+            "overflow_policy": self.overflow,
+            **self.stats.__dict__,
+            "avg_batch_rows": round(self.stats.written / self.stats.batches, 1) if self.stats.batches else 0.0,
+            "avg_write_ms": round(self.stats.write_ms_total / self.stats.batches, 1) if self.stats.batches else 0.0
+        }
+
+activity_log_writer = ActivityLogWriter(
+    batch_size=settings.ACTIVITY_LOG_BATCH_SIZE,
+    flush_interval_ms=settings.ACTIVITY_LOG_FLUSH_INTERVAL_MS,
+    max_queue=settings.ACTIVITY_LOG_MAX_QUEUE,
+    overflow=settings.ACTIVITY_LOG_OVERFLOW
+)
+
 def log_activity(
-    db: Session,
     user_id: Optional[str],
     action: str,
     entity_type: Optional[str] = None,
@@ -23,10 +145,9 @@ def log_activity(
     error_message: Optional[str] = None
 ):
     """
-    Log an activity to the database.
+    Queue an activity for the database (written in the background).
     
     Args:
-        db: Database session
         user_id: User performing the action
         action: Action being performed (e.g., 'login', 'create_project')
         entity_type: Type of entity (e.g., 'project', 'order')
@@ -37,23 +158,20 @@ def log_activity(
         status: Action status (success, failed, error)
         error_message: Error message if status is failed/error
     """
-    try:
-        activity_log = ActivityLog(
-            user_id=user_id,
-            action=action,
-            entity_type=entity_type,
-            entity_id=entity_id,
-            details=details,
-            ip_address=ip_address,
-            user_agent=user_agent,
-            status=status,
-            error_message=error_message
-        )
-        db.add(activity_log)
-        db.commit()
-    except Exception as e:
-        logger.error(f"Failed to log activity: {str(e)}")
-        db.rollback()
+    activity_log_writer.submit({
+        "id": str(uuid.uuid4()),
+        "user_id": user_id,
+        "action": action,
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "details": details,
+        "ip_address": ip_address,
+        "user_agent": user_agent,
+        "status": status,
+        "error_message": error_message,
+        # Time of the action, not of the batch insert
+        "created_at": datetime.now(timezone.utc)
+    })
 
 def get_client_ip(request: Request) -> Optional[str]:
     """Extract client IP from request (works with Vercel)"""
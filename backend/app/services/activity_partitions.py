@@ -0,0 +1,165 @@
+"""
+Monthly partitions, retention and daily rollups for activity_logs.
+
+activity_logs is range-partitioned by month on created_at, one table per
+month named activity_logs_yYYYYmMM. run_maintenance() (at startup, every
+ACTIVITY_LOG_MAINTENANCE_INTERVAL_HOURS and from maintain_activity_logs.py):
+- creates partitions up to ACTIVITY_LOG_PARTITIONS_AHEAD months ahead, so
+  inserts never hit a missing range;
+- refreshes activity_daily_rollups (count per day, action and status) for
+  the days since the last run;
+- drops whole partitions older than ACTIVITY_LOG_RETENTION_MONTHS after
+  rolling them up, so retention costs a DROP TABLE instead of a DELETE.
+"""
+from datetime import date, datetime, time, timedelta, timezone
+from typing import List, Optional, Tuple
+from sqlalchemy import text, select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.activity_log import ActivityDailyRollup
+import asyncio
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "activity_logs"
+_PARTITION_NAME = re.compile(rf"^{PARENT_TABLE}_y(\d{{4}})m(\d{{2}})$")
+
+# Serializes maintenance across workers (pg_try_advisory_xact_lock key)
+_LOCK_KEY = 0x61637476  # "actv"
+
+def month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+def add_months(day: date, months: int) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_y{month.year:04d}m{month.month:02d}"
+
+def is_partition_table(name: str) -> bool:
+    return bool(_PARTITION_NAME.match(name))
+
+def _partition_month(name: str) -> Optional[date]:
+    match = _PARTITION_NAME.match(name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+async def list_partitions(db: AsyncSession) -> List[Tuple[str, date]]:
+    """(name, first day of month) of every monthly partition, oldest first"""
+    names = (await db.scalars(text("""
+        SELECT child.relname FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        WHERE parent.relname = :parent
+    """), {"parent": PARENT_TABLE})).all()
+    partitions = [(name, _partition_month(name)) for name in names]
+    return sorted((name, month) for name, month in partitions if month is not None)
+
+async def ensure_partitions(db: AsyncSession, months_ahead: int) -> List[str]:
+    """Create missing partitions from the current month to months_ahead; returns the new ones"""
+    existing = {name for name, _ in await list_partitions(db)}
+    created = []
+    current = month_start(_today())
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        name = partition_name(month)
+        if name in existing:
+            continue
+        await db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT_TABLE} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+        ))
+        created.append(name)
+    return created
+
+async def rollup_days(db: AsyncSession, start: date, end: date) -> int:
+    """Recompute rollups for days in [start, end); idempotent"""
+    result = await db.execute(text("""
+        INSERT INTO activity_daily_rollups (day, action, status, count, updated_at)
+        SELECT created_at::date, action, COALESCE(status, 'unknown'), count(*), now() AT TIME ZONE 'utc'
+        FROM activity_logs
+        WHERE created_at >= :start AND created_at < :end
+        GROUP BY 1, 2, 3
+        ON CONFLICT (day, action, status)
+        DO UPDATE SET count = EXCLUDED.count, updated_at = EXCLUDED.updated_at
+    """), {"start": datetime.combine(start, time.min), "end": datetime.combine(end, time.min)})
+    return result.rowcount
+
+async def drop_expired_partitions(db: AsyncSession, retention_months: int) -> List[str]:
+    """Roll up, then drop, partitions that ended before the retention window"""
+    cutoff = add_months(month_start(_today()), -retention_months)
+    dropped = []
+    for name, month in await list_partitions(db):
+        if add_months(month, 1) > cutoff:
+            break
+        await rollup_days(db, month, add_months(month, 1))
+        await db.execute(text(f"DROP TABLE IF EXISTS {name}"))
+        dropped.append(name)
+    return dropped
+
+async def run_maintenance(db: AsyncSession) -> dict:
+    """Partition upkeep, incremental rollups and retention in one transaction"""
+    if not await db.scalar(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": _LOCK_KEY}):
+        return {"skipped": "maintenance already running in another worker"}
+
+    created = await ensure_partitions(db, settings.ACTIVITY_LOG_PARTITIONS_AHEAD)
+
+    # The last rolled-up day may have been partial, so it is recomputed
+    last_day = await db.scalar(select(func.max(ActivityDailyRollup.day)))
+    if last_day is None:
+        first_log = await db.scalar(text("SELECT min(created_at) FROM activity_logs"))
+        last_day = first_log.date() if first_log else _today()
+    tomorrow = _today() + timedelta(days=1)
+    rollup_rows = await rollup_days(db, last_day, tomorrow)
+
+    dropped = await drop_expired_partitions(db, settings.ACTIVITY_LOG_RETENTION_MONTHS)
+    await db.commit()
+
+    stats = {
+        "partitions_created": created,
+        "partitions_dropped": dropped,
+        "rollup_rows": rollup_rows,
+        "rolled_up_from": last_day.isoformat()
+    }
+    logger.info(f"Activity log maintenance: {stats}")
+    return stats
+
+async def _run_logged():
+    try:
+        async with AsyncSessionLocal() as db:
+            await run_maintenance(db)
+    except Exception as e:
+        logger.error(f"Activity log maintenance failed: {str(e)}")
+
+async def _maintenance_loop():
+    while True:
+        await asyncio.sleep(settings.ACTIVITY_LOG_MAINTENANCE_INTERVAL_HOURS * 3600)
+        await _run_logged()
+
+_task: Optional[asyncio.Task] = None
+
+async def start_activity_maintenance():
+    """
+    Run maintenance once before serving (so the current month's partition
+    exists) and then periodically (called from the app lifespan on startup)
+    """
+    global _task
+    await _run_logged()
+    if _task is None or _task.done():
+        _task = asyncio.get_running_loop().create_task(_maintenance_loop(), name="activity-log-maintenance")
+
+async def stop_activity_maintenance():
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
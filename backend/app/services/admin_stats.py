@@ -0,0 +1,177 @@
+"""
+Incrementally maintained counters for the admin dashboard.
+
+Every ORM insert, delete or status change on a counted model records a
+delta row in admin_stat_deltas from a mapper event, on the same connection
+and so in the same transaction as the change itself. Deltas are only ever
+inserted, so concurrent signups and checkouts never wait on a shared
+counter row and cannot deadlock on one. The dashboard reads each counter
+as its admin_stats total plus its pending deltas, in one query over a
+five-row table and a short delta table, however large the underlying
+tables grow. Once ADMIN_STATS_COMPACT_AFTER deltas are pending, the read
+also folds them into the totals.
+
+Writes that bypass the ORM (raw SQL, manual fixes) are not seen;
+recompute_stats() rebuilds every counter from the source tables.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from sqlalchemy import event, inspect, literal, select, union_all, delete, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.admin_request import AdminRequest
+from app.models.admin_stat import AdminStat, AdminStatDelta
+from app.models.order import Order
+from app.models.project import Project
+from app.models.synopsis import Synopsis
+from app.models.user import User
+import logging
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class StatCounter:
+    name: str
+    model: type
+    # Only rows whose status equals this value are counted
+    status: Optional[str] = None
+
+    def matches(self, status_value: Optional[str]) -> bool:
+        return self.status is None or status_value == self.status
+
+    def count_query(self):
+        query = select(func.count()).select_from(self.model)
+        if self.status is not None:
+            query = query.where(self.model.status == self.status)
+        return query
+
+COUNTERS = [
+    StatCounter("total_users", User),
+    StatCounter("total_orders", Order),
+    StatCounter("total_projects", Project),
+    StatCounter("pending_synopsis", Synopsis, status="Pending"),
+    StatCounter("pending_requests", AdminRequest, status="pending"),
+]
+
+def _record(connection, deltas: Dict[str, int]):
+    rows = [{"name": name, "delta": delta} for name, delta in deltas.items() if delta]
+    if rows:
+        connection.execute(insert(AdminStatDelta), rows)
+
+def _bump(connection, name: str, delta: int):
+    _record(connection, {name: delta})
+
+def _register(counter: StatCounter):
+    @event.listens_for(counter.model, "after_insert")
+    def _on_insert(mapper, connection, target):
+        if counter.matches(getattr(target, "status", None)):
+            _bump(connection, counter.name, 1)
+
+    @event.listens_for(counter.model, "after_delete")
+    def _on_delete(mapper, connection, target):
+        status_value = None
+        if counter.status is not None:
+            history = inspect(target).attrs.status.history
+            status_value = history.deleted[0] if history.deleted else target.status
+        if counter.matches(status_value):
+            _bump(connection, counter.name, -1)
+
+    if counter.status is not None:
+        @event.listens_for(counter.model, "after_update")
+        def _on_update(mapper, connection, target):
+            history = inspect(target).attrs.status.history
+            if not history.deleted:
+                return
+            delta = int(counter.matches(target.status)) - int(counter.matches(history.deleted[0]))
+            _bump(connection, counter.name, delta)
+
+for _counter in COUNTERS:
+    _register(_counter)
+
+# Deleting a user removes its orders, projects, synopses and requests through
+# ON DELETE CASCADE, which fires no ORM events; count what is about to go.
+# Children already deleted in this flush were handled by their own events.
+@event.listens_for(User, "before_delete")
+def _on_user_delete(mapper, connection, target):
+    _record(connection, {
+        counter.name: -connection.scalar(counter.count_query().where(counter.model.user_id == target.id))
+        for counter in COUNTERS
+        if counter.model is not User
+    })
+
+def _totals_query():
+    """Per counter: stored total plus pending deltas, and how many deltas are pending"""
+    rows = union_all(
+        select(AdminStat.name, AdminStat.value, literal(0).label("pending")),
+        select(AdminStatDelta.name, AdminStatDelta.delta, literal(1))
+    ).subquery()
+    return select(rows.c.name, func.sum(rows.c.value), func.sum(rows.c.pending)).group_by(rows.c.name)
+
+async def compact(db: AsyncSession):
+    """
+    Fold pending deltas into admin_stats and commit. One statement deletes
+    the deltas it sees and adds them to the totals, so deltas committed
+    meanwhile stay pending. Totals are written in name order, so concurrent
+    compactions cannot deadlock.
+    """
+    moved = delete(AdminStatDelta).returning(AdminStatDelta.name, AdminStatDelta.delta).cte("moved")
+    totals = (
+        select(moved.c.name, func.sum(moved.c.delta), literal(datetime.now(timezone.utc)))
+        .group_by(moved.c.name)
+        .order_by(moved.c.name)
+    )
+    stmt = insert(AdminStat).from_select(["name", "value", "updated_at"], totals)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[AdminStat.name],
+        set_={"value": AdminStat.value + stmt.excluded.value, "updated_at": stmt.excluded.updated_at}
+    ).add_cte(moved)
+    await db.execute(stmt)
+    await db.commit()
+
+async def recompute_stats(db: AsyncSession) -> Dict[str, Dict[str, int]]:
+    """
+    Rebuild every counter from the source tables and commit.
+    One statement reads the previous totals, counts the source rows, deletes
+    the pending deltas and writes the counts, all from the same snapshot:
+    deltas of changes committed meanwhile are neither counted nor deleted,
+    and are applied on top afterwards.
+    """
+    now = datetime.now(timezone.utc)
+    previous = _totals_query().subquery("previous")
+    cleared = delete(AdminStatDelta).returning(AdminStatDelta.id).cte("cleared")
+    counts_query = union_all(*[
+        select(literal(counter.name).label("name"), counter.count_query().scalar_subquery().label("value"), literal(now))
+        for counter in sorted(COUNTERS, key=lambda counter: counter.name)
+    ])
+    written = insert(AdminStat).from_select(["name", "value", "updated_at"], counts_query)
+    written = written.on_conflict_do_update(
+        index_elements=[AdminStat.name],
+        set_={"value": written.excluded.value, "updated_at": written.excluded.updated_at}
+    ).returning(AdminStat.name, AdminStat.value).cte("written")
+    stmt = (
+        select(written.c.name, written.c.value, previous.c[1])
+        .outerjoin(previous, previous.c.name == written.c.name)
+        .add_cte(cleared)
+    )
+    rows = (await db.execute(stmt)).all()
+    await db.commit()
+
+    counts = {name: value for name, value, _ in rows}
+    counts = {counter.name: counts[counter.name] for counter in COUNTERS}
+    before = {name: int(total) for name, _, total in rows if total is not None}
+    drift = {name: value - before.get(name, 0) for name, value in counts.items() if before.get(name) != value}
+    if drift:
+        logger.warning(f"Admin stats drift corrected: {drift}")
+    return {"counts": counts, "drift": drift}
+
+async def get_stats(db: AsyncSession) -> Dict[str, int]:
+    """All dashboard counters in one read (recomputed if the table is not seeded yet)"""
+    rows = (await db.execute(_totals_query())).all()
+    stats = {name: int(total) for name, total, _ in rows}
+    if any(counter.name not in stats for counter in COUNTERS):
+        return (await recompute_stats(db))["counts"]
+    if sum(pending for _, _, pending in rows) >= settings.ADMIN_STATS_COMPACT_AFTER:
+        await compact(db)
+    return {counter.name: stats[counter.name] for counter in COUNTERS}
@@ -0,0 +1,156 @@
+"""
+Content-addressed, deduplicated storage for user uploads.
+
+Files are stored once per distinct content under
+uploads/blobs/<sha[:2]>/<sha[2:4]>/<sha256>.<ext>, so re-uploading the same
+synopsis PDF or payment screenshot adds a reference instead of a new file.
+The file_blobs table keeps a reference count that is bumped in the caller's
+transaction; collect_garbage() recomputes the counts from the columns that
+hold blob paths and deletes blobs nobody references any more.
+"""
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from fastapi import UploadFile
+from sqlalchemy import select, update, delete, union_all
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.file_blob import FileBlob
+from app.models.order import Order
+from app.models.project import Project
+from app.models.synopsis import Synopsis
+from app.services.file_service import receive_upload, commit_upload, remove_quietly
+from app.services.storage import get_storage
+import logging
+
+logger = logging.getLogger(__name__)
+
+BLOB_ROOT = "uploads/blobs"
+
+# Columns whose values may point at blobs
+BLOB_REFERENCES = [
+    Synopsis.file_path,
+    Order.payment_proof_path,
+    Project.synopsis_file_path,
+    Project.project_file_path,
+]
+
+# Unreferenced blobs younger than this are kept, so an upload whose row is
+# not committed yet is never collected
+DEFAULT_GC_GRACE = timedelta(hours=1)
+
+def blob_path(sha256: str, extension: str) -> str:
+    return f"{BLOB_ROOT}/{sha256[:2]}/{sha256[2:4]}/{sha256}.{extension}"
+
+def is_blob_path(path: Optional[str]) -> bool:
+    return bool(path) and path.startswith(f"{BLOB_ROOT}/")
+
+async def save_upload_blob(upload_file: UploadFile, db: AsyncSession) -> str:
+    """
+    Store an upload by content and add a reference to it.
+    Returns the blob path to save on the referencing row; the reference
+    count becomes durable when the caller commits.
+    """
+    received = await receive_upload(upload_file, BLOB_ROOT)
+    path = blob_path(received.sha256, received.extension)
+
+    # Reference first: this row lock makes a concurrent GC skip the blob
+    stmt = insert(FileBlob).values(
+        path=path,
+        sha256=received.sha256,
+        size=received.size,
+        ref_count=1
+    )
+    try:
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[FileBlob.path],
+            set_={"ref_count": FileBlob.ref_count + 1, "updated_at": datetime.now(timezone.utc)}
+        ))
+    except Exception:
+        remove_quietly(received.temp_path)
+        raise
+
+    storage = get_storage()
+    if await storage.exists(path):
+        logger.info(f"Deduplicated upload {upload_file.filename} -> {path}")
+    # Identical content, so replacing an existing blob is harmless and
+    # guarantees the file exists even if GC removed it a moment ago
+    await commit_upload(received, path)
+    return path
+
+async def release_blob(db: AsyncSession, path: Optional[str]):
+    """Drop one reference (call when a row stops pointing at the blob)"""
+    if not is_blob_path(path):
+        return
+    await db.execute(
+        update(FileBlob)
+        .where(FileBlob.path == path, FileBlob.ref_count > 0)
+        .values(ref_count=FileBlob.ref_count - 1)
+    )
+
+async def collect_garbage(db: AsyncSession, grace: timedelta = DEFAULT_GC_GRACE, dry_run: bool = False) -> dict:
+    """
+    Recompute reference counts from BLOB_REFERENCES and delete blobs (files
+    and rows) that are unreferenced and older than the grace period. Files
+    under BLOB_ROOT with no row at all (e.g. upload rolled back) are removed
+    the same way.
+    """
+    referenced = Counter(
+        (await db.scalars(union_all(*[
+            select(column.label("path")).where(column.like(f"{BLOB_ROOT}/%"))
+            for column in BLOB_REFERENCES
+        ]))).all()
+    )
+    cutoff = datetime.now(timezone.utc) - grace
+    naive_cutoff = cutoff.replace(tzinfo=None)
+
+    storage = get_storage()
+    stats = {"blobs": 0, "refcounts_fixed": 0, "removed": 0, "orphan_files_removed": 0, "bytes_freed": 0}
+    known = set()
+    blobs = (await db.execute(select(
+        FileBlob.path, FileBlob.size, FileBlob.ref_count, FileBlob.created_at, FileBlob.updated_at
+    ))).all()
+    for path, size, ref_count, created_at, updated_at in blobs:
+        stats["blobs"] += 1
+        known.add(path)
+        actual = referenced.get(path, 0)
+        # Compare-and-set updates: an upload that re-references the blob
+        # concurrently wins and the blob is left alone
+        if ref_count != actual:
+            stats["refcounts_fixed"] += 1
+            if not dry_run:
+                await db.execute(
+                    update(FileBlob)
+                    .where(FileBlob.path == path, FileBlob.ref_count == ref_count)
+                    .values(ref_count=actual, updated_at=FileBlob.updated_at)  # keep the grace clock
+                )
+        last_touched = updated_at or created_at
+        if actual == 0 and last_touched is not None and last_touched < naive_cutoff:
+            if dry_run:
+                deleted = path
+            else:
+                deleted = await db.scalar(
+                    delete(FileBlob)
+                    .where(FileBlob.path == path, FileBlob.ref_count == 0, FileBlob.updated_at == updated_at)
+                    .returning(FileBlob.path)
+                )
+            if deleted:
+                stats["removed"] += 1
+                stats["bytes_freed"] += size
+                if not dry_run:
+                    await storage.delete(path)
+
+    # Objects with no row at all (e.g. the upload's transaction rolled back)
+    cutoff_ts = cutoff.timestamp()
+    async for item in storage.list(f"{BLOB_ROOT}/"):
+        if item.key in known or item.key in referenced or item.modified >= cutoff_ts:
+            continue
+        stats["orphan_files_removed"] += 1
+        stats["bytes_freed"] += item.size
+        if not dry_run:
+            await storage.delete(item.key)
+
+    if not dry_run:
+        await db.commit()
+    logger.info(f"Blob GC{' (dry run)' if dry_run else ''}: {stats}")
+    return stats
@@ -0,0 +1,304 @@
+"""
+Bounded chatbot context with a rolling summary.
+
+Each chat turn sends the provider the system prompt, the session's running
+summary (if any) and only as many of the newest messages as fit the plan's
+token budget (CHAT_CONTEXT_TOKENS_BY_PLAN), so prompt size, latency and
+cost stay flat however long a conversation gets.
+
+Once the prompt (with every message not yet covered by the summary) fills
+CHAT_SUMMARY_TRIGGER of the budget, a background task folds all but the
+CHAT_KEEP_RECENT_MESSAGES newest into an updated summary. The summary is
+stored as a ChatbotHistory row of the session (message_type "summary").
+Later turns read the newest summary row and skip the messages it covers,
+recognised by a fingerprint of the last covered message. A reply never
+waits for a summarization call.
+
+Clients may send only the new message and the session_id (the delta
+protocol). The transcript is then rebuilt on the server from
+session_transcripts, a per-worker LRU of active sessions, or on a miss from
+the session's ChatbotHistory rows (one read on idx_chatbot_user_session).
+A new delta session starts with the widget's greeting, built from the plan
+on the server and saved as the session's first row, so the model sees the
+question the user's first message answers. Each reply carries the
+session's turn count. A client that echoes it back
+makes a worker reload a transcript that another worker has moved past.
+
+Tokens are estimated at about four characters each, so no tokenizer is
+needed.
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.chatbot_history import ChatbotHistory
+from app.services.principal_cache import TTLCache
+from app.services.llm_gateway import gateway, ProviderRequest
+import asyncio
+import hashlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_MESSAGE_TYPE = "summary"
+SUMMARY_INTENT = "context_summary"
+# Role markers and separators the provider adds around every message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4 + MESSAGE_OVERHEAD_TOKENS
+
+def context_budget(plan_name: str) -> int:
+    """Prompt token budget for a plan (CHAT_CONTEXT_TOKENS when the plan is not listed)"""
+    budgets = {}
+    for entry in settings.CHAT_CONTEXT_TOKENS_BY_PLAN.split(","):
+        name, _, tokens = entry.rpartition(":")
+        if name.strip() and tokens.strip().isdigit():
+            budgets[name.strip().lower()] = int(tokens)
+    return budgets.get(plan_name.strip().lower(), settings.CHAT_CONTEXT_TOKENS)
+
+def fingerprint(message: dict) -> str:
+    return hashlib.sha256(f"{message['role']}\n{message['content']}".encode()).hexdigest()[:16]
+
+@dataclass
+class ChatSummary:
+    text: str
+    covered_messages: int
+    last_fingerprint: str
+
+    def covered_in(self, transcript: List[dict]) -> int:
+        """How many leading messages of the transcript the summary covers (0 if it does not match)"""
+        count = self.covered_messages
+        if 0 < count <= len(transcript) and fingerprint(transcript[count - 1]) == self.last_fingerprint:
+            return count
+        # The client may have added or dropped leading messages (e.g. a greeting)
+        for index in range(len(transcript) - 1, -1, -1):
+            if fingerprint(transcript[index]) == self.last_fingerprint:
+                return index + 1
+        return 0
+
+async def load_summary(db: AsyncSession, user_id: str, session_id: str) -> Optional[ChatSummary]:
+    row = await db.scalar(
+        select(ChatbotHistory)
+        .where(
+            ChatbotHistory.user_id == user_id,
+            ChatbotHistory.session_id == session_id,
+            ChatbotHistory.message_type == SUMMARY_MESSAGE_TYPE
+        )
+        .order_by(ChatbotHistory.created_at.desc())
+        .limit(1)
+    )
+    return _summary_from_row(row) if row is not None else None
+
+def _summary_from_row(row: ChatbotHistory) -> Optional[ChatSummary]:
+    if not row.context:
+        return None
+    return ChatSummary(row.message, int(row.context.get("covered_messages", 0)), row.context.get("last_fingerprint", ""))
+
+@dataclass
+class SessionTranscript:
+    messages: List[dict]  # user/assistant messages as saved, oldest first
+    summary: Optional[ChatSummary]
+    turns: int  # completed user/assistant exchanges
+
+class SessionTranscripts:
+    """Per-worker LRU of active chat sessions, rebuilt from ChatbotHistory on a miss"""
+    def __init__(self, max_entries: int):
+        self.cache = TTLCache(max_entries)
+        self.db_loads = 0
+        self.stale_reloads = 0
+
+    def _key(self, user_id: str, session_id: str) -> str:
+        return f"{user_id}:{session_id}"
+
+    async def get(self, db: AsyncSession, user_id: str, session_id: str, expected_turns: Optional[int] = None) -> SessionTranscript:
+        entry = self.cache.get(self._key(user_id, session_id))
+        if entry is not None:
+            if expected_turns is None or entry.turns == expected_turns:
+                return entry
+            # The client saw turns this worker did not serve
+            self.stale_reloads += 1
+        entry = await self._load(db, user_id, session_id)
+        self.cache.set(self._key(user_id, session_id), entry, settings.CHAT_SESSION_CACHE_TTL)
+        return entry
+
+    async def _load(self, db: AsyncSession, user_id: str, session_id: str) -> SessionTranscript:
+        self.db_loads += 1
+        rows = (await db.scalars(
+            select(ChatbotHistory)
+            .where(ChatbotHistory.user_id == user_id, ChatbotHistory.session_id == session_id)
+            .order_by(ChatbotHistory.created_at)
+        )).all()
+        messages, summary, turns = [], None, 0
+        for row in rows:
+            if row.message_type == SUMMARY_MESSAGE_TYPE:
+                summary = _summary_from_row(row) or summary
+                continue
+            messages.append({"role": "user" if row.message_type == "user" else "assistant", "content": row.message})
+            # The greeting is an assistant row too, so exchanges are counted by their user message
+            if row.message_type == "user":
+                turns += 1
+        return SessionTranscript(messages, summary, turns)
+
+    def append(self, user_id: str, session_id: str, entry: SessionTranscript, user_text: str, reply: str):
+        """Record a completed turn (entry may be a fresh one for a new session)"""
+        entry.messages.extend([{"role": "user", "content": user_text}, {"role": "assistant", "content": reply}])
+        entry.turns += 1
+        self.cache.set(self._key(user_id, session_id), entry, settings.CHAT_SESSION_CACHE_TTL)
+
+    def set_summary(self, user_id: str, session_id: str, summary: ChatSummary):
+        entry = self.cache.get(self._key(user_id, session_id))
+        if entry is not None:
+            entry.summary = summary
+
+    def invalidate(self, user_id: str, session_id: str):
+        self.cache.pop(self._key(user_id, session_id))
+
+    def get_metrics(self) -> dict:
+        return {
+            "entries": len(self.cache),
+            "ttl": settings.CHAT_SESSION_CACHE_TTL,
+            "db_loads": self.db_loads,
+            "stale_reloads": self.stale_reloads,
+            **self.cache.counters.as_dict()
+        }
+
+session_transcripts = SessionTranscripts(settings.CHAT_SESSION_CACHE_MAX)
+
+@dataclass
+class ChatContext:
+    messages: List[dict]  # what is sent to the provider
+    prompt_tokens: int
+    dropped: int  # older messages neither sent nor summarized yet
+    needs_compaction: bool
+
+def build_context(system_prompt: str, transcript: List[dict], summary: Optional[ChatSummary], budget: int) -> ChatContext:
+    covered = summary.covered_in(transcript) if summary else 0
+    if covered:
+        system_prompt += f"\n\nSummary of the earlier conversation:\n{summary.text}"
+    used = estimate_tokens(system_prompt)
+
+    pending = transcript[covered:]
+    kept: List[dict] = []
+    # Newest first; the latest message is always sent, even over budget
+    for message in reversed(pending):
+        tokens = estimate_tokens(message["content"])
+        if kept and used + tokens > budget:
+            break
+        kept.append(message)
+        used += tokens
+    kept.reverse()
+
+    # Size of the full prompt had nothing been left out
+    full_tokens = estimate_tokens(system_prompt) + sum(estimate_tokens(message["content"]) for message in pending)
+    return ChatContext(
+        messages=[{"role": "system", "content": system_prompt}, *kept],
+        prompt_tokens=used,
+        dropped=len(pending) - len(kept),
+        needs_compaction=(
+            full_tokens > budget * settings.CHAT_SUMMARY_TRIGGER
+            and len(pending) > settings.CHAT_KEEP_RECENT_MESSAGES
+        )
+    )
+
+async def summarize(previous: Optional[str], messages: List[dict]) -> str:
+    conversation = "\n".join(f"{message['role']}: {message['content']}" for message in messages)
+    prompt = (
+        (f"Summary so far:\n{previous}\n\n" if previous else "")
+        + f"New messages:\n{conversation}\n\n"
+        "Write an updated summary of this project conversation: the project name, what it does, "
+        "decisions made and open questions. Keep every fact the student gave, in under 150 words."
+    )
+    summary_messages = [
+        {"role": "system", "content": "You condense project assistant conversations into short factual summaries."},
+        {"role": "user", "content": prompt}
+    ]
+    result = await gateway.complete([
+        ProviderRequest("groq", {
+            "model": settings.GROQ_MODEL,
+            "messages": summary_messages,
+            "temperature": 0.2,
+            "max_tokens": settings.CHAT_SUMMARY_MAX_TOKENS
+        }),
+        ProviderRequest("grok", {
+            "model": settings.XAI_MODEL,
+            "messages": summary_messages,
+            "temperature": 0.2,
+            "max_tokens": settings.CHAT_SUMMARY_MAX_TOKENS,
+            "stream": False
+        }),
+    ])
+    return result.content.strip()
+
+class ChatCompactor:
+    """Runs summary updates in the background, at most one per session at a time"""
+    def __init__(self):
+        self._tasks: Set[asyncio.Task] = set()
+        self._sessions: Set[Tuple[str, str]] = set()
+        self.stats: Dict[str, int] = {
+            "turns": 0, "truncated_turns": 0, "prompt_tokens": 0, "compactions": 0, "compaction_failures": 0
+        }
+
+    def record_turn(self, context: ChatContext):
+        self.stats["turns"] += 1
+        self.stats["prompt_tokens"] += context.prompt_tokens
+        if context.dropped:
+            self.stats["truncated_turns"] += 1
+
+    def schedule(self, user_id: str, session_id: str, transcript: List[dict], summary: Optional[ChatSummary]):
+        """Fold older turns of `transcript` (which ends with the reply just sent) into the summary"""
+        key = (user_id, session_id)
+        if key in self._sessions:
+            return
+        self._sessions.add(key)
+        task = asyncio.get_running_loop().create_task(
+            self._compact(key, transcript, summary), name=f"chat-compaction-{session_id}"
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _compact(self, key: Tuple[str, str], transcript: List[dict], summary: Optional[ChatSummary]):
+        user_id, session_id = key
+        try:
+            covered = summary.covered_in(transcript) if summary else 0
+            until = len(transcript) - settings.CHAT_KEEP_RECENT_MESSAGES
+            if until <= covered:
+                return
+            text = await summarize(summary.text if covered else None, transcript[covered:until])
+            updated = ChatSummary(text, until, fingerprint(transcript[until - 1]))
+            async with AsyncSessionLocal() as db:
+                db.add(ChatbotHistory(
+                    user_id=user_id,
+                    session_id=session_id,
+                    message_type=SUMMARY_MESSAGE_TYPE,
+                    message=text,
+                    intent=SUMMARY_INTENT,
+                    context={"covered_messages": updated.covered_messages, "last_fingerprint": updated.last_fingerprint}
+                ))
+                await db.commit()
+            session_transcripts.set_summary(user_id, session_id, updated)
+            self.stats["compactions"] += 1
+            logger.info(f"Chat session {session_id}: summarized {until - covered} messages")
+        except Exception as e:
+            self.stats["compaction_failures"] += 1
+            logger.warning(f"Chat summary update failed for session {session_id}: {str(e)}")
+        finally:
+            self._sessions.discard(key)
+
+    async def close(self):
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def get_metrics(self) -> dict:
+        turns = self.stats["turns"]
+        return {
+            **self.stats,
+            "avg_prompt_tokens": round(self.stats["prompt_tokens"] / turns, 1) if turns else 0.0,
+            "compactions_running": len(self._sessions),
+            "session_cache": session_transcripts.get_metrics()
+        }
+
+chat_compactor = ChatCompactor()
@@ -0,0 +1,302 @@
+"""
+Cacheable, resumable file downloads.
+
+file_download() is the one helper every download route uses. Responses
+carry a strong ETag (the content's sha256) and Last-Modified, answer
+If-None-Match / If-Modified-Since with 304, and honour single and multi-part
+Range requests (with If-Range), so a repeat download costs nothing and an
+interrupted ZIP resumes where it stopped. Cache-Control comes from the
+asset type's entry in CACHE_POLICIES.
+
+With the S3 backend, presigned redirects get the same Cache-Control and S3
+handles ranges and validators itself; proxied downloads forward the
+request's Range and validator headers to the object store.
+"""
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional, Tuple
+from fastapi import HTTPException
+from fastapi.responses import FileResponse, JSONResponse, RedirectResponse, StreamingResponse, Response
+from starlette.datastructures import Headers
+from starlette.types import Receive, Scope, Send
+from app.core.config import settings
+from app.services.storage import get_storage, content_disposition
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import secrets
+
+logger = logging.getLogger(__name__)
+
+# Every download route requires a login, so nothing may land in a shared cache
+CACHE_POLICIES = {
+    "default": "private, no-cache",
+    # Replaced rarely and downloaded by every student: served from the
+    # browser cache for a while, then revalidated with a 304
+    "blackbook": f"private, max-age={settings.DOWNLOAD_BLACKBOOK_MAX_AGE}",
+    # Always revalidated (cheap 304), so a re-uploaded file shows up at once
+    "project": "private, no-cache",
+    "synopsis": "private, no-cache",
+    # Financial documents should not persist on shared lab computers
+    "payment_proof": "private, no-store",
+}
+
+# Request headers passed through to the object store on proxied downloads
+FORWARDED_HEADERS = ("range", "if-range", "if-none-match", "if-modified-since")
+# Object store response headers relayed back to the client
+RELAYED_HEADERS = ("content-length", "content-range", "etag", "last-modified", "accept-ranges")
+
+# Headers a 304 must repeat from the full response (RFC 9110 15.4.5)
+NOT_MODIFIED_HEADERS = ("cache-control", "etag", "last-modified", "content-location", "expires", "vary")
+
+_SHA256_NAME = re.compile(r"^[0-9a-f]{64}$")
+
+_RANGE_SPEC = re.compile(r"^(\d*)-(\d*)$")
+# More ranges than this in one request are answered with the whole file
+MAX_RANGES = 16
+RANGE_CHUNK_SIZE = 64 * 1024
+
+# sha256 of files whose name does not carry it, keyed by path and
+# invalidated when size or mtime change
+_ETAG_CACHE_MAX = 1024
+_etag_cache: "OrderedDict[str, Tuple[int, int, str]]" = OrderedDict()
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as source:
+        while chunk := source.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+async def content_etag(path: str, stat_result: os.stat_result) -> str:
+    """Strong ETag from the file's sha256 (taken from blob names, otherwise hashed once and cached)"""
+    stem = os.path.basename(path).split(".")[0]
+    if _SHA256_NAME.match(stem):
+        return f'"{stem}"'
+
+    version = (stat_result.st_mtime_ns, stat_result.st_size)
+    cached = _etag_cache.get(path)
+    if cached is not None and cached[:2] == version:
+        _etag_cache.move_to_end(path)
+        return cached[2]
+
+    etag = f'"{await asyncio.to_thread(_hash_file, path)}"'
+    _etag_cache[path] = (*version, etag)
+    _etag_cache.move_to_end(path)
+    while len(_etag_cache) > _ETAG_CACHE_MAX:
+        _etag_cache.popitem(last=False)
+    return etag
+
+def is_not_modified(request_headers: Headers, etag: str, modified: float) -> bool:
+    """Evaluate If-None-Match, or If-Modified-Since when there is none (RFC 9110 13.2.2)"""
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Weak comparison, as If-None-Match requires
+        candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return etag in candidates
+
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(modified) <= since
+    return False
+
+def parse_range(header: str, size: int) -> Optional[List[Tuple[int, int]]]:
+    """
+    Inclusive byte ranges of a Range header, sorted and with overlapping or
+    adjacent ranges merged. None when the header should be ignored (not a
+    valid bytes range, or too many ranges); an empty list when no range can
+    be satisfied (RFC 9110 14.2).
+    """
+    unit, _, specs = header.partition("=")
+    if unit.strip().lower() != "bytes" or not specs.strip():
+        return None
+    ranges = []
+    for spec in specs.split(","):
+        match = _RANGE_SPEC.match(spec.strip())
+        if match is None or not (match.group(1) or match.group(2)):
+            return None
+        first, last = match.group(1), match.group(2)
+        if not first:
+            # Suffix range: the last N bytes
+            if int(last) > 0 and size > 0:
+                ranges.append((max(0, size - int(last)), size - 1))
+            continue
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if last and int(last) < start:
+            return None
+        if start < size:
+            ranges.append((start, end))
+    if len(ranges) > MAX_RANGES:
+        return None
+
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+def if_range_matches(if_range: Optional[str], etag: str, last_modified: Optional[str]) -> bool:
+    """If-Range holds when absent or naming the current strong ETag or exact Last-Modified date"""
+    if if_range is None:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith(("W/", '"')):
+        return if_range == etag
+    return last_modified is not None and if_range == last_modified
+
+class CachedFileResponse(FileResponse):
+    """
+    FileResponse that answers matching validators with 304 Not Modified
+    and serves Range requests (single ranges, multipart/byteranges, If-Range)
+    itself, so resuming does not depend on the Starlette version.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"].upper() not in ("GET", "HEAD") or self.stat_result is None:
+            await super().__call__(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        if is_not_modified(request_headers, self.headers["etag"], self.stat_result.st_mtime):
+            headers = {name: self.headers[name] for name in NOT_MODIFIED_HEADERS if name in self.headers}
+            await Response(status_code=304, headers=headers)(scope, receive, send)
+            return
+
+        range_header = request_headers.get("range")
+        if range_header and if_range_matches(
+            request_headers.get("if-range"), self.headers["etag"], self.headers.get("last-modified")
+        ):
+            ranges = parse_range(range_header, self.stat_result.st_size)
+            if ranges is not None:
+                await self._send_ranges(ranges, scope["method"].upper() == "HEAD", send)
+                return
+        await super().__call__(scope, receive, send)
+
+    async def _send_ranges(self, ranges: List[Tuple[int, int]], head: bool, send: Send) -> None:
+        size = self.stat_result.st_size
+        headers = [(name, value) for name, value in self.raw_headers if name not in (b"content-length", b"content-type")]
+        if not ranges:
+            headers += [(b"content-range", f"bytes */{size}".encode()), (b"content-length", b"0")]
+            await send({"type": "http.response.start", "status": 416, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        content_type = self.headers.get("content-type", self.media_type)
+        if len(ranges) == 1:
+            start, end = ranges[0]
+            parts = [(b"", start, end)]
+            headers += [
+                (b"content-type", content_type.encode("latin-1")),
+                (b"content-range", f"bytes {start}-{end}/{size}".encode()),
+            ]
+            closing = b""
+        else:
+            boundary = secrets.token_hex(16)
+            parts = [
+                (
+                    f"--{boundary}\r\ncontent-type: {content_type}\r\n"
+                    f"content-range: bytes {start}-{end}/{size}\r\n\r\n".encode("latin-1"),
+                    start,
+                    end
+                )
+                for start, end in ranges
+            ]
+            # Each part after the first starts on a new line
+            parts = [(part if index == 0 else b"\r\n" + part, start, end) for index, (part, start, end) in enumerate(parts)]
+            closing = f"\r\n--{boundary}--\r\n".encode("latin-1")
+            headers.append((b"content-type", f"multipart/byteranges; boundary={boundary}".encode("latin-1")))
+        length = sum(len(part) + end - start + 1 for part, start, end in parts) + len(closing)
+        headers.append((b"content-length", str(length).encode()))
+
+        await send({"type": "http.response.start", "status": 206, "headers": headers})
+        if head:
+            await send({"type": "http.response.body", "body": b""})
+            return
+        with open(self.path, "rb") as source:
+            for part, start, end in parts:
+                if part:
+                    await send({"type": "http.response.body", "body": part, "more_body": True})
+                await asyncio.to_thread(source.seek, start)
+                remaining = end - start + 1
+                while remaining > 0:
+                    chunk = await asyncio.to_thread(source.read, min(RANGE_CHUNK_SIZE, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": closing})
+
+class ProxiedObjectResponse(Response):
+    """Streams an object from the storage backend, forwarding the client's Range and validator headers"""
+
+    def __init__(self, key: str, filename: str, media_type: str, cache_control: str, not_found_detail: str):
+        super().__init__(media_type=media_type)
+        self.key = key
+        self.filename = filename
+        self.cache_control = cache_control
+        self.not_found_detail = not_found_detail
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        request_headers = Headers(scope=scope)
+        forwarded: Dict[str, str] = {
+            name: request_headers[name] for name in FORWARDED_HEADERS if name in request_headers
+        }
+        try:
+            stream = await get_storage().open(self.key, forwarded)
+        except FileNotFoundError:
+            response = JSONResponse({"detail": self.not_found_detail}, status_code=404)
+        else:
+            headers = {name: stream.headers[name] for name in RELAYED_HEADERS if name in stream.headers}
+            headers["content-disposition"] = content_disposition(self.filename)
+            headers["cache-control"] = self.cache_control
+            response = StreamingResponse(
+                stream.chunks, status_code=stream.status, media_type=self.media_type, headers=headers
+            )
+        await response(scope, receive, send)
+
+async def file_download(
+    key: str,
+    filename: str,
+    media_type: str,
+    cache_policy: str = "default",
+    not_found_detail: str = "File not found"
+) -> Response:
+    """
+    Download response for a stored file: served from local disk with
+    ETag/304/Range support, otherwise a redirect to a presigned URL (or a
+    proxied stream when STORAGE_PRESIGNED_DOWNLOADS is off).
+    """
+    cache_control = CACHE_POLICIES[cache_policy]
+    storage = get_storage()
+    local_path = storage.local_path(key)
+    if local_path is not None:
+        try:
+            stat_result = await asyncio.to_thread(os.stat, local_path)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail=not_found_detail)
+        etag = await content_etag(local_path, stat_result)
+        return CachedFileResponse(
+            path=local_path,
+            filename=filename,
+            media_type=media_type,
+            stat_result=stat_result,
+            headers={"ETag": etag, "Cache-Control": cache_control, "Accept-Ranges": "bytes"}
+        )
+
+    if settings.STORAGE_PRESIGNED_DOWNLOADS:
+        url = storage.presigned_url(key, filename, media_type, cache_control)
+        if url:
+            # The URL expires, so the redirect itself must not be cached
+            return RedirectResponse(url, status_code=307, headers={"Cache-Control": "no-store"})
+
+    return ProxiedObjectResponse(key, filename, media_type, cache_control, not_found_detail)
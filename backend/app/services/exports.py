@@ -0,0 +1,154 @@
+"""
+Streaming CSV / NDJSON exports of admin data.
+
+Rows are read through a server-side cursor in EXPORT_BATCH_SIZE batches
+(yield_per) and encoded batch by batch, so an export of any size holds one
+batch in memory and the first bytes reach the client immediately.
+"""
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, AsyncIterator, List, Optional
+from sqlalchemy import select
+from app.core.database import AsyncSessionLocal
+from app.models.activity_log import ActivityLog
+from app.models.idea_submission import IdeaSubmission
+from app.models.order import Order
+from app.models.synopsis import Synopsis
+from app.models.user import User
+import csv
+import io
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+@dataclass
+class ExportSpec:
+    model: Any
+    columns: List[Any]
+    # (target, onclause) pairs for columns taken from related tables
+    joins: List[Any] = field(default_factory=list)
+    # Column the ?status= filter applies to (None: the entity has no status)
+    status_column: Optional[Any] = None
+
+    @property
+    def field_names(self) -> List[str]:
+        return [column.key for column in self.columns]
+
+EXPORTS = {
+    "orders": ExportSpec(
+        model=Order,
+        columns=[
+            Order.id, Order.user_id, User.email.label("user_email"), User.name.label("user_name"),
+            Order.plan_id, Order.plan_name, Order.amount, Order.status, Order.service_type,
+            Order.payment_method, Order.transaction_id, Order.notes,
+            Order.payment_proof_original_name, Order.payment_proof_uploaded_at,
+            Order.payment_verified_at, Order.payment_verified_by,
+            Order.created_at, Order.updated_at,
+        ],
+        joins=[(User, User.id == Order.user_id)],
+        status_column=Order.status,
+    ),
+    "idea_submissions": ExportSpec(
+        model=IdeaSubmission,
+        columns=[
+            IdeaSubmission.id, IdeaSubmission.user_id, IdeaSubmission.name, IdeaSubmission.phone,
+            IdeaSubmission.interests, IdeaSubmission.generated_idea, IdeaSubmission.generation_count,
+            IdeaSubmission.created_at,
+        ],
+    ),
+    "synopsis": ExportSpec(
+        model=Synopsis,
+        columns=[
+            Synopsis.id, Synopsis.user_id, User.email.label("user_email"), User.name.label("user_name"),
+            Synopsis.project_id, Synopsis.original_name, Synopsis.file_size, Synopsis.status,
+            Synopsis.admin_notes, Synopsis.created_at, Synopsis.updated_at,
+        ],
+        joins=[(User, User.id == Synopsis.user_id)],
+        status_column=Synopsis.status,
+    ),
+    "activity_logs": ExportSpec(
+        model=ActivityLog,
+        columns=[
+            ActivityLog.id, ActivityLog.user_id, ActivityLog.action, ActivityLog.entity_type,
+            ActivityLog.entity_id, ActivityLog.details, ActivityLog.ip_address, ActivityLog.user_agent,
+            ActivityLog.status, ActivityLog.error_message, ActivityLog.created_at,
+        ],
+        status_column=ActivityLog.status,
+    ),
+}
+
+def build_export_query(
+    spec: ExportSpec,
+    status: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None
+):
+    """
+    Rows oldest first; the date range is half-open [date_from, date_to) on
+    created_at. Raises ValueError for a filter the entity does not support.
+    """
+    if status is not None and spec.status_column is None:
+        raise ValueError("This export has no status to filter on")
+    query = select(*spec.columns).select_from(spec.model)
+    for target, onclause in spec.joins:
+        query = query.outerjoin(target, onclause)
+    if status is not None:
+        query = query.where(spec.status_column == status)
+    if date_from is not None:
+        query = query.where(spec.model.created_at >= date_from)
+    if date_to is not None:
+        query = query.where(spec.model.created_at < date_to)
+    return query.order_by(spec.model.created_at, spec.model.id)
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def _csv_cell(value: Any) -> Any:
+    value = _plain(value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    # Keep spreadsheet apps from evaluating user-supplied text as a formula
+    if isinstance(value, str) and value[:1] in ("=", "+", "-", "@", "\t", "\r"):
+        return "'" + value
+    return value
+
+async def stream_export(entity: str, fmt: str, query) -> AsyncIterator[str]:
+    """
+    Encoded export chunks of a build_export_query() query, one per batch.
+    Opens its own session: the request's session is closed by the time a
+    StreamingResponse body runs.
+    """
+    names = EXPORTS[entity].field_names
+    query = query.execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if fmt == "csv":
+        writer.writerow(names)
+        yield buffer.getvalue()
+
+    rows = 0
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query)
+        async for batch in result.partitions():
+            buffer.seek(0)
+            buffer.truncate()
+            if fmt == "csv":
+                writer.writerows([_csv_cell(value) for value in row] for row in batch)
+            else:
+                for row in batch:
+                    buffer.write(json.dumps(dict(zip(names, map(_plain, row)))))
+                    buffer.write("\n")
+            rows += len(batch)
+            yield buffer.getvalue()
+    logger.info(f"Exported {rows} {entity} rows as {fmt}")
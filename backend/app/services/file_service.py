@@ -1,13 +1,65 @@
+import asyncio
+import hashlib
 import os
 import uuid
+from dataclasses import dataclass
+from typing import BinaryIO, Optional, Tuple
 from fastapi import UploadFile, HTTPException
 from app.core.config import settings
+from app.core.metrics import UPLOAD_BYTES, UPLOADS
 from app.core.validation import validate_file_extension, validate_file_size
+from app.services.storage import get_storage, StorageError
+import httpx
 
-async def save_upload_file(upload_file: UploadFile, folder: str = "projects") -> str:
+# Uploads are copied in fixed-size chunks so memory use per upload stays constant
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+@dataclass
+class SavedFile:
+    path: str
+    size: int
+    sha256: str
+
+def _copy_to_temp(source: BinaryIO, temp_path: str, max_size: int) -> Tuple[int, str]:
     """
-    Save uploaded file to the specified folder with security validation
-    Returns the file path
+    Copy the upload into temp_path chunk by chunk (runs in a worker thread).
+    Stops as soon as more than max_size bytes have been read; the returned
+    size is then > max_size and the caller discards the temp file.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    with open(temp_path, "wb") as buffer:
+        while True:
+            chunk = source.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_size:
+                return size, ""
+            digest.update(chunk)
+            buffer.write(chunk)
+        buffer.flush()
+        os.fsync(buffer.fileno())
+    return size, digest.hexdigest()
+
+def remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+@dataclass
+class ReceivedUpload:
+    temp_path: str
+    size: int
+    sha256: str
+    extension: str
+    content_type: Optional[str] = None
+
+async def receive_upload(upload_file: UploadFile, upload_dir: str) -> ReceivedUpload:
+    """
+    Validate an upload and stream it into a hidden temp file in upload_dir.
+    The caller moves temp_path into place (or removes it).
     """
     # Validate filename exists
     if not upload_file.filename:
@@ -15,32 +67,75 @@ async def save_upload_file(upload_file: UploadFile, folder: str = "projects") ->
             status_code=400,
             detail="No filename provided"
         )
-    
+
     # Validate file extension
     allowed_extensions = settings.ALLOWED_EXTENSIONS.split(",")
     validate_file_extension(upload_file.filename, allowed_extensions)
     file_ext = upload_file.filename.split(".")[-1].lower()
-    
-    # Read content and validate size
-    content = await upload_file.read()
-    validate_file_size(len(content), settings.MAX_FILE_SIZE)
-    
+
+    # Reject early when the multipart parser already knows the size
+    if upload_file.size is not None:
+        validate_file_size(upload_file.size, settings.MAX_FILE_SIZE)
+
     # Create folder if it doesn't exist
-    upload_dir = f"uploads/{folder}"
     os.makedirs(upload_dir, exist_ok=True)
-    
-    # Generate unique filename to prevent overwriting
-    unique_filename = f"{uuid.uuid4()}.{file_ext}"
-    file_path = os.path.join(upload_dir, unique_filename)
-    
-    # Convert to forward slashes for web compatibility
-    file_path = file_path.replace('\\', '/')
-    
-    # Save file
+    temp_path = os.path.join(upload_dir, f".{uuid.uuid4()}.part")
+
     try:
-        with open(file_path, "wb") as buffer:
-            buffer.write(content)
+        await upload_file.seek(0)
+        size, sha256 = await asyncio.to_thread(
+            _copy_to_temp, upload_file.file, temp_path, settings.MAX_FILE_SIZE
+        )
     except Exception as e:
+        remove_quietly(temp_path)
+        raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
+
+    if size > settings.MAX_FILE_SIZE:
+        remove_quietly(temp_path)
+        validate_file_size(size, settings.MAX_FILE_SIZE)
+
+    # Labelled by extension, which ALLOWED_EXTENSIONS keeps to a handful of values
+    UPLOADS.inc(kind=file_ext)
+    UPLOAD_BYTES.inc(size, kind=file_ext)
+
+    return ReceivedUpload(
+        temp_path=temp_path,
+        size=size,
+        sha256=sha256,
+        extension=file_ext,
+        content_type=upload_file.content_type
+    )
+
+async def commit_upload(received: ReceivedUpload, file_path: str):
+    """Move the temp file to its final key on the storage backend (atomic rename on local disk)"""
+    try:
+        await get_storage().save(received.temp_path, file_path, received.content_type, received.sha256)
+    except (OSError, StorageError, httpx.HTTPError) as e:
+        remove_quietly(received.temp_path)
         raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
-    
-    return file_path
+
+async def store_upload(upload_file: UploadFile, folder: str = "projects") -> SavedFile:
+    """
+    Stream an uploaded file into the specified folder with security validation.
+    Written to a temp file and renamed into place, so a partially written
+    upload is never visible under its final name.
+    """
+    upload_dir = f"uploads/{folder}"
+    received = await receive_upload(upload_file, upload_dir)
+
+    # Generate unique filename to prevent overwriting
+    file_path = os.path.join(upload_dir, f"{uuid.uuid4()}.{received.extension}")
+
+    # Convert to forward slashes for web compatibility
+    file_path = file_path.replace('\\', '/')
+
+    await commit_upload(received, file_path)
+    return SavedFile(path=file_path, size=received.size, sha256=received.sha256)
+
+async def save_upload_file(upload_file: UploadFile, folder: str = "projects") -> str:
+    """
+    Save uploaded file to the specified folder with security validation
+    Returns the file path
+    """
+    saved = await store_upload(upload_file, folder)
+    return saved.path
@@ -0,0 +1,191 @@
+"""
+Response cache for idea generation.
+
+Near-identical topics ("iot", "IoT ", "machine  learning!") share one entry,
+keyed on the normalized input plus the prompt branch (has_specifics).
+
+- Per-worker LRU tier with TTL and a max entry count.
+- Optional shared tier (idea_cache table) so workers reuse each other's ideas.
+- Variant policy: each topic collects up to IDEA_CACHE_VARIANTS distinct
+  ideas; once full, those are served in turn and then one fresh idea is
+  generated (replacing the oldest), so results still feel unique.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.idea_cache import IdeaCacheEntry
+import hashlib
+import logging
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+# How often expired rows are swept from the shared tier
+SHARED_PURGE_INTERVAL = 3600
+
+def normalize_topic(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    return " ".join(re.sub(r"[^\w\s+#]", " ", text.lower()).split())
+
+def cache_key(user_input: str, has_specifics: bool) -> str:
+    topic = normalize_topic(user_input)
+    return hashlib.sha256(f"{int(has_specifics)}:{topic}".encode()).hexdigest()
+
+@dataclass
+class _Entry:
+    variants: List[str]
+    expires_at: float  # time.monotonic() deadline
+    served: int = 0  # cached serves since the last fresh idea
+
+    def is_expired(self, now: float) -> bool:
+        return now >= self.expires_at
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    shared_hits: int = 0
+    stores: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    shared_errors: int = 0
+
+class IdeaCache:
+    def __init__(self):
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self.stats = CacheStats()
+        self._last_purge = 0.0
+
+    def _get_local(self, key: str) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.is_expired(time.monotonic()):
+            del self._entries[key]
+            self.stats.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _set_local(self, key: str, entry: _Entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > settings.IDEA_CACHE_MAX_ENTRIES:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    async def _load_shared(self, db: AsyncSession, key: str) -> Optional[_Entry]:
+        try:
+            row = await db.scalar(select(IdeaCacheEntry).where(
+                IdeaCacheEntry.key == key,
+                IdeaCacheEntry.expires_at > datetime.now(timezone.utc)
+            ))
+        except Exception as e:
+            self.stats.shared_errors += 1
+            logger.warning(f"Idea cache shared lookup failed: {str(e)}")
+            await db.rollback()
+            return None
+        if row is None or not row.variants:
+            return None
+        # expires_at comes back as naive UTC
+        remaining = (row.expires_at - datetime.now(timezone.utc).replace(tzinfo=None)).total_seconds()
+        return _Entry(variants=list(row.variants), expires_at=time.monotonic() + remaining)
+
+    async def _save_shared(self, db: AsyncSession, key: str, user_input: str, has_specifics: bool, variants: List[str]):
+        now = datetime.now(timezone.utc)
+        values = {
+            "key": key,
+            "topic": normalize_topic(user_input),
+            "has_specifics": has_specifics,
+            "variants": variants,
+            "expires_at": now + timedelta(seconds=settings.IDEA_CACHE_TTL),
+            "updated_at": now
+        }
+        stmt = insert(IdeaCacheEntry).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[IdeaCacheEntry.key],
+            set_={k: stmt.excluded[k] for k in ("variants", "expires_at", "updated_at")}
+        )
+        try:
+            await db.execute(stmt)
+            if time.monotonic() - self._last_purge > SHARED_PURGE_INTERVAL:
+                self._last_purge = time.monotonic()
+                await db.execute(delete(IdeaCacheEntry).where(IdeaCacheEntry.expires_at <= now))
+            await db.commit()
+        except Exception as e:
+            self.stats.shared_errors += 1
+            logger.warning(f"Idea cache shared store failed: {str(e)}")
+            await db.rollback()
+
+    async def get(self, db: Optional[AsyncSession], user_input: str, has_specifics: bool) -> Optional[str]:
+        """
+        Cached idea for this topic, or None when a fresh one should be generated
+        (topic unknown, fewer than IDEA_CACHE_VARIANTS variants yet, or all
+        variants already served since the last fresh idea).
+        """
+        if not settings.IDEA_CACHE_ENABLED:
+            return None
+
+        key = cache_key(user_input, has_specifics)
+        entry = self._get_local(key)
+        from_shared = False
+        if entry is None and settings.IDEA_CACHE_SHARED and db is not None:
+            entry = await self._load_shared(db, key)
+            if entry is not None:
+                self._set_local(key, entry)
+                from_shared = True
+
+        wanted = max(settings.IDEA_CACHE_VARIANTS, 1)
+        if entry is None or len(entry.variants) < wanted or entry.served >= wanted:
+            self.stats.misses += 1
+            return None
+
+        idea = entry.variants[entry.served % len(entry.variants)]
+        entry.served += 1
+        self.stats.hits += 1
+        if from_shared:
+            self.stats.shared_hits += 1
+        return idea
+
+    async def put(self, db: Optional[AsyncSession], user_input: str, has_specifics: bool, idea: str):
+        """Record a freshly generated idea as a variant for this topic"""
+        if not settings.IDEA_CACHE_ENABLED or not idea:
+            return
+
+        key = cache_key(user_input, has_specifics)
+        entry = self._get_local(key)
+        if entry is None:
+            entry = _Entry(variants=[], expires_at=0.0)
+        if idea not in entry.variants:
+            entry.variants.append(idea)
+            del entry.variants[:-max(settings.IDEA_CACHE_VARIANTS, 1)]
+        entry.served = 0
+        entry.expires_at = time.monotonic() + settings.IDEA_CACHE_TTL
+        self._set_local(key, entry)
+        self.stats.stores += 1
+
+        if settings.IDEA_CACHE_SHARED and db is not None:
+            await self._save_shared(db, key, user_input, has_specifics, list(entry.variants))
+
+    def clear(self):
+        self._entries.clear()
+
+    def get_metrics(self) -> dict:
+        lookups = self.stats.hits + self.stats.misses
+        return {
+            "enabled": settings.IDEA_CACHE_ENABLED,
+            "shared": settings.IDEA_CACHE_SHARED,
+            "entries": len(self._entries),
+            "max_entries": settings.IDEA_CACHE_MAX_ENTRIES,
+            "variants_per_topic": settings.IDEA_CACHE_VARIANTS,
+            "hit_rate": round(self.stats.hits / lookups, 3) if lookups else 0.0,
+            **self.stats.__dict__
+        }
+
+idea_cache = IdeaCache()
@@ -0,0 +1,72 @@
+"""
+Idea generation quotas: one counter row per phone number and per user.
+A submission is charged to its phone number and, when logged in, to the
+user as well.
+
+claim() charges a generation with a single
+INSERT ... ON CONFLICT DO UPDATE ... WHERE count < limit RETURNING count,
+so the limit check and the increment are one statement: concurrent submits
+serialize on the row lock and cannot take a counter past the limit. The
+caller commits the claim together with the submission it pays for.
+
+get_count() is one primary-key read behind a per-worker read-through cache
+(IDEA_QUOTA_CACHE_TTL). A worker's own committed claims refresh its cache;
+other workers see them within the TTL. Only /count reads the cache, and
+claim() always checks the row itself.
+"""
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.idea_quota import IdeaQuota
+from app.services.principal_cache import TTLCache
+import re
+
+_NON_DIGITS = re.compile(r"\D")
+
+count_cache = TTLCache(settings.IDEA_QUOTA_CACHE_MAX)
+
+def normalize_phone(phone: str) -> str:
+    """Digits only, so '+91 12345-67890' and '+911234567890' share a quota"""
+    return _NON_DIGITS.sub("", phone) or phone.strip()
+
+def _cache_key(kind: str, subject: str) -> str:
+    return f"{kind}:{subject}"
+
+def remember(kind: str, subject: str, count: int):
+    """Record a committed count in this worker's cache"""
+    count_cache.set(_cache_key(kind, subject), count, settings.IDEA_QUOTA_CACHE_TTL)
+
+async def get_count(db: AsyncSession, kind: str, subject: str) -> int:
+    cached = count_cache.get(_cache_key(kind, subject))
+    if cached is not None:
+        return cached
+    count = await db.scalar(select(IdeaQuota.count).where(
+        IdeaQuota.kind == kind,
+        IdeaQuota.subject == subject
+    )) or 0
+    remember(kind, subject, count)
+    return count
+
+async def claim(db: AsyncSession, kind: str, subject: str, limit: int) -> Optional[int]:
+    """
+    Charge one generation and return the new count, or None when the
+    quota is used up. Not committed: the claim is rolled back with the
+    caller's transaction if the submission fails.
+    """
+    now = datetime.now(timezone.utc)
+    statement = insert(IdeaQuota).values(kind=kind, subject=subject, count=1, updated_at=now)
+    statement = statement.on_conflict_do_update(
+        index_elements=[IdeaQuota.kind, IdeaQuota.subject],
+        set_={"count": IdeaQuota.count + 1, "updated_at": now},
+        where=IdeaQuota.count < limit
+    ).returning(IdeaQuota.count)
+    count = (await db.execute(statement)).scalar_one_or_none()
+    if count is None:
+        remember(kind, subject, limit)
+    return count
+
+def get_metrics() -> dict:
+    return {"entries": len(count_cache), "ttl": settings.IDEA_QUOTA_CACHE_TTL, **count_cache.counters.as_dict()}
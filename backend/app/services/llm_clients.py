@@ -0,0 +1,57 @@
+"""
+Shared HTTP clients for the LLM providers (X.AI Grok and Groq).
+One pooled client per provider for the lifetime of the app, so AI requests
+reuse warm keep-alive/HTTP/2 connections instead of a fresh TCP+TLS handshake.
+"""
+from typing import Dict, Optional
+from app.core.config import settings
+import httpx
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Provider name -> (base URL setting, API key setting, timeout setting)
+PROVIDERS = {
+    "grok": ("XAI_BASE_URL", "XAI_API_KEY", "XAI_TIMEOUT"),
+    "groq": ("GROQ_BASE_URL", "GROQ_API_KEY", "GROQ_TIMEOUT"),
+}
+
+_clients: Dict[str, httpx.AsyncClient] = {}
+
+def _build_client(provider: str) -> httpx.AsyncClient:
+    base_url_setting, key_setting, timeout_setting = PROVIDERS[provider]
+    timeout = getattr(settings, timeout_setting)
+    return httpx.AsyncClient(
+        base_url=getattr(settings, base_url_setting),
+        headers={
+            "Authorization": f"Bearer {getattr(settings, key_setting)}",
+            "Content-Type": "application/json"
+        },
+        http2=True,
+        timeout=httpx.Timeout(timeout, connect=settings.LLM_CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=settings.LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY
+        )
+    )
+
+def get_llm_client(provider: str) -> httpx.AsyncClient:
+    """
+    Get the shared client for a provider ("grok" or "groq").
+    Created on first use; closed by close_llm_clients() on shutdown.
+    """
+    client: Optional[httpx.AsyncClient] = _clients.get(provider)
+    if client is None or client.is_closed:
+        client = _build_client(provider)
+        _clients[provider] = client
+    return client
+
+async def close_llm_clients():
+    """Close all provider clients (called from the app lifespan on shutdown)"""
+    for provider, client in list(_clients.items()):
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning(f"Failed to close {provider} client: {str(e)}")
+    _clients.clear()
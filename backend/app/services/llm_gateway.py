@@ -0,0 +1,423 @@
+"""
+LLM provider gateway shared by idea generation and the chatbot.
+
+- Per-provider circuit breakers: a provider that keeps failing is skipped
+  for a cool-down window instead of making every request wait on it.
+- Hedged requests: if the primary provider has not answered within its
+  recent p95 latency, the backup provider is fired too; the first good
+  answer wins and the other call is cancelled.
+- Streaming (stream()) gets the same failover/hedging up to the first token.
+- Per-provider latency/error metrics (see get_metrics()), also exported
+  to /metrics as llm_request_duration_seconds.
+"""
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional
+from app.core.config import settings
+from app.core.metrics import LLM_LATENCY
+from app.services.llm_clients import get_llm_client
+import asyncio
+import httpx
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+API_KEY_SETTINGS = {
+    "grok": "XAI_API_KEY",
+    "groq": "GROQ_API_KEY",
+}
+
+class LLMUnavailableError(Exception):
+    """Raised when no provider produced a completion"""
+    def __init__(self, message: str = "All AI providers failed", timed_out: bool = False):
+        self.timed_out = timed_out
+        super().__init__(message)
+
+class ProviderError(Exception):
+    """A single provider call failed (bad status, bad payload or transport error)"""
+    def __init__(self, provider: str, message: str, timed_out: bool = False):
+        self.provider = provider
+        self.timed_out = timed_out
+        super().__init__(f"{provider}: {message}")
+
+@dataclass
+class ProviderRequest:
+    """One candidate provider call: provider name plus its /chat/completions body"""
+    provider: str
+    payload: Dict[str, Any]
+
+@dataclass
+class LLMResult:
+    content: str
+    provider: str
+    latency_ms: int
+    hedged: bool = False
+
+@dataclass
+class ProviderStats:
+    latencies: deque = field(default_factory=lambda: deque(maxlen=settings.LLM_LATENCY_WINDOW))
+    first_token_latencies: deque = field(default_factory=lambda: deque(maxlen=settings.LLM_LATENCY_WINDOW))
+    requests: int = 0
+    successes: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    cancelled: int = 0
+    skipped_open: int = 0
+
+    def percentile(self, pct: float, streaming: bool = False) -> Optional[float]:
+        samples = self.first_token_latencies if streaming else self.latencies
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures.
+    Open -> half-open once `cooldown` seconds have passed (one trial call).
+    Half-open -> closed on success, back to open on failure.
+    """
+    def __init__(self, failure_threshold: int, cooldown: float):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        self.trial_in_flight = False
+        if self.opened_at is not None or self.consecutive_failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        """Trial call was cancelled without an outcome"""
+        self.trial_in_flight = False
+
+@dataclass
+class _OpenStream:
+    candidate: ProviderRequest
+    response: httpx.Response
+    deltas: AsyncIterator[str]
+    first: str
+    started: float
+
+async def _iter_deltas(provider: str, response: httpx.Response) -> AsyncIterator[str]:
+    """Yield non-empty content deltas from an OpenAI-compatible SSE stream"""
+    async for line in response.aiter_lines():
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            return
+        try:
+            choice = json.loads(data)['choices'][0]
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            raise ProviderError(provider, f"malformed stream chunk: {str(e)}")
+        content = (choice.get('delta') or {}).get('content')
+        if content:
+            yield content
+
+def _observe(provider: str, mode: str, outcome: str, start: float):
+    LLM_LATENCY.observe(time.perf_counter() - start, provider=provider, mode=mode, outcome=outcome)
+
+async def _discard(task: asyncio.Task):
+    """Wait out a losing call and release anything it left open"""
+    try:
+        result = await task
+    except (asyncio.CancelledError, Exception):
+        return
+    if isinstance(result, _OpenStream):
+        await result.response.aclose()
+
+class LLMGateway:
+    def __init__(self):
+        self.stats: Dict[str, ProviderStats] = {}
+        self.breakers: Dict[str, CircuitBreaker] = {}
+
+    def _stats(self, provider: str) -> ProviderStats:
+        if provider not in self.stats:
+            self.stats[provider] = ProviderStats()
+        return self.stats[provider]
+
+    def _breaker(self, provider: str) -> CircuitBreaker:
+        if provider not in self.breakers:
+            self.breakers[provider] = CircuitBreaker(
+                settings.LLM_BREAKER_FAILURE_THRESHOLD,
+                settings.LLM_BREAKER_COOLDOWN
+            )
+        return self.breakers[provider]
+
+    def is_configured(self, provider: str) -> bool:
+        return bool(getattr(settings, API_KEY_SETTINGS[provider], ""))
+
+    def hedge_delay(self, provider: str, streaming: bool = False) -> float:
+        """
+        Seconds to wait on `provider` before firing the backup: its recent p95
+        latency (time to first token when streaming)
+        """
+        stats = self._stats(provider)
+        samples = stats.first_token_latencies if streaming else stats.latencies
+        if len(samples) < settings.LLM_HEDGE_MIN_SAMPLES:
+            delay = settings.LLM_HEDGE_DEFAULT_DELAY
+        else:
+            delay = stats.percentile(95, streaming)
+        return min(max(delay, settings.LLM_HEDGE_MIN_DELAY), settings.LLM_HEDGE_MAX_DELAY)
+
+    async def _call(self, candidate: ProviderRequest) -> LLMResult:
+        provider = candidate.provider
+        stats = self._stats(provider)
+        breaker = self._breaker(provider)
+        stats.requests += 1
+        start = time.perf_counter()
+        try:
+            response = await get_llm_client(provider).post("/chat/completions", json=candidate.payload)
+            if response.status_code != 200:
+                raise ProviderError(provider, f"HTTP {response.status_code} - {response.text[:200]}")
+            try:
+                content = response.json()['choices'][0]['message']['content'].strip()
+            except (ValueError, KeyError, IndexError, TypeError) as e:
+                raise ProviderError(provider, f"malformed response: {str(e)}")
+        except asyncio.CancelledError:
+            stats.cancelled += 1
+            breaker.release()
+            _observe(provider, "complete", "cancelled", start)
+            raise
+        except httpx.TimeoutException as e:
+            stats.failures += 1
+            stats.timeouts += 1
+            breaker.record_failure()
+            _observe(provider, "complete", "timeout", start)
+            raise ProviderError(provider, f"timeout: {str(e)}", timed_out=True)
+        except ProviderError:
+            stats.failures += 1
+            breaker.record_failure()
+            _observe(provider, "complete", "error", start)
+            raise
+        except Exception as e:
+            stats.failures += 1
+            breaker.record_failure()
+            _observe(provider, "complete", "error", start)
+            raise ProviderError(provider, str(e))
+
+        elapsed = time.perf_counter() - start
+        stats.successes += 1
+        stats.latencies.append(elapsed)
+        breaker.record_success()
+        _observe(provider, "complete", "success", start)
+        return LLMResult(content=content, provider=provider, latency_ms=int(elapsed * 1000))
+
+    def _available(self, candidates: List[ProviderRequest]) -> List[ProviderRequest]:
+        available = []
+        for candidate in candidates:
+            if not self.is_configured(candidate.provider):
+                continue
+            if not self._breaker(candidate.provider).allow():
+                self._stats(candidate.provider).skipped_open += 1
+                logger.warning(f"Skipping {candidate.provider}: circuit open")
+                continue
+            available.append(candidate)
+        return available
+
+    async def _open_stream(self, candidate: ProviderRequest) -> "_OpenStream":
+        """Start a streaming completion and wait for its first content delta"""
+        provider = candidate.provider
+        stats = self._stats(provider)
+        breaker = self._breaker(provider)
+        stats.requests += 1
+        start = time.perf_counter()
+        client = get_llm_client(provider)
+        response = None
+        try:
+            request = client.build_request("POST", "/chat/completions", json={**candidate.payload, "stream": True})
+            response = await client.send(request, stream=True)
+            if response.status_code != 200:
+                body = (await response.aread()).decode(errors="replace")
+                raise ProviderError(provider, f"HTTP {response.status_code} - {body[:200]}")
+            deltas = _iter_deltas(provider, response)
+            first = await deltas.__anext__()
+        except asyncio.CancelledError:
+            stats.cancelled += 1
+            breaker.release()
+            _observe(provider, "stream", "cancelled", start)
+            if response is not None:
+                await response.aclose()
+            raise
+        except Exception as e:
+            if response is not None:
+                await response.aclose()
+            stats.failures += 1
+            timed_out = isinstance(e, httpx.TimeoutException)
+            if timed_out:
+                stats.timeouts += 1
+            breaker.record_failure()
+            _observe(provider, "stream", "timeout" if timed_out else "error", start)
+            if isinstance(e, ProviderError):
+                raise
+            if isinstance(e, StopAsyncIteration):
+                raise ProviderError(provider, "empty stream")
+            raise ProviderError(provider, str(e), timed_out=timed_out)
+
+        stats.first_token_latencies.append(time.perf_counter() - start)
+        return _OpenStream(candidate, response, deltas, first, start)
+
+    async def _race(self, candidates: List[ProviderRequest], start_call, hedge: Optional[bool], streaming: bool = False):
+        """
+        Run `start_call` against the candidates in priority order and return the
+        first success plus whether a backup was started.
+        The next candidate is started when the current one fails, or, if hedging
+        is enabled, when it has been running longer than its p95 latency.
+        """
+        if hedge is None:
+            hedge = settings.LLM_HEDGE_ENABLED
+        queue = self._available(candidates)
+        if not queue:
+            raise LLMUnavailableError("No AI provider available")
+
+        pending: Dict[asyncio.Task, ProviderRequest] = {}
+        errors: List[ProviderError] = []
+        started_count = 0
+        winner = None
+
+        def start_next():
+            nonlocal started_count
+            candidate = queue.pop(0)
+            started_count += 1
+            pending[asyncio.create_task(start_call(candidate))] = candidate
+
+        start_next()
+        try:
+            while pending:
+                timeout = None
+                if hedge and queue:
+                    newest = list(pending.values())[-1]
+                    timeout = self.hedge_delay(newest.provider, streaming)
+                done, _ = await asyncio.wait(pending.keys(), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    logger.info(f"Hedging: {list(pending.values())[-1].provider} slower than p95, firing {queue[0].provider}")
+                    start_next()
+                    continue
+
+                for task in done:
+                    pending.pop(task)
+                    if winner is not None:
+                        await _discard(task)
+                        continue
+                    try:
+                        winner = task.result()
+                    except ProviderError as e:
+                        logger.warning(f"LLM provider failed: {str(e)}")
+                        errors.append(e)
+                if winner is not None:
+                    return winner, started_count > 1
+
+                if not pending and queue:
+                    start_next()
+        finally:
+            for task in pending:
+                task.cancel()
+            for task in pending:
+                await _discard(task)
+            # Candidates never started must give back any half-open trial slot
+            for candidate in queue:
+                self._breaker(candidate.provider).release()
+
+        raise LLMUnavailableError(
+            "All AI providers failed",
+            timed_out=bool(errors) and all(e.timed_out for e in errors)
+        )
+
+    async def complete(self, candidates: List[ProviderRequest], hedge: Optional[bool] = None) -> LLMResult:
+        """
+        Run a chat completion against the candidates in priority order
+        (with hedging and circuit breaking, see module docstring).
+        Raises LLMUnavailableError when every candidate failed or was skipped.
+        """
+        result, hedged = await self._race(candidates, self._call, hedge)
+        result.hedged = hedged
+        return result
+
+    async def stream(self, candidates: List[ProviderRequest], hedge: Optional[bool] = None) -> AsyncIterator[str]:
+        """
+        Stream a chat completion as content deltas.
+        Failover and hedging apply until a provider produces its first token
+        (hedge delay is based on time to first token); after that the stream is
+        committed to that provider and a mid-stream failure raises ProviderError.
+        """
+        opened, _ = await self._race(candidates, self._open_stream, hedge, streaming=True)
+        provider = opened.candidate.provider
+        stats = self._stats(provider)
+        breaker = self._breaker(provider)
+        try:
+            yield opened.first
+            async for delta in opened.deltas:
+                yield delta
+        except ProviderError:
+            stats.failures += 1
+            breaker.record_failure()
+            _observe(provider, "stream", "error", opened.started)
+            raise
+        except httpx.HTTPError as e:
+            stats.failures += 1
+            breaker.record_failure()
+            timed_out = isinstance(e, httpx.TimeoutException)
+            _observe(provider, "stream", "timeout" if timed_out else "error", opened.started)
+            raise ProviderError(provider, str(e), timed_out=timed_out)
+        finally:
+            await opened.response.aclose()
+        stats.successes += 1
+        stats.latencies.append(time.perf_counter() - opened.started)
+        breaker.record_success()
+        _observe(provider, "stream", "success", opened.started)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        metrics = {}
+        for provider in API_KEY_SETTINGS:
+            stats = self._stats(provider)
+            p50 = stats.percentile(50)
+            p95 = stats.percentile(95)
+            ttft_p95 = stats.percentile(95, streaming=True)
+            metrics[provider] = {
+                "configured": self.is_configured(provider),
+                "circuit": self._breaker(provider).state,
+                "requests": stats.requests,
+                "successes": stats.successes,
+                "failures": stats.failures,
+                "timeouts": stats.timeouts,
+                "cancelled": stats.cancelled,
+                "skipped_open": stats.skipped_open,
+                "error_rate": round(stats.failures / stats.requests, 4) if stats.requests else 0.0,
+                "latency_p50_ms": int(p50 * 1000) if p50 is not None else None,
+                "latency_p95_ms": int(p95 * 1000) if p95 is not None else None,
+                "first_token_p95_ms": int(ttft_p95 * 1000) if ttft_p95 is not None else None,
+                "hedge_delay_ms": int(self.hedge_delay(provider) * 1000),
+            }
+        return metrics
+
+gateway = LLMGateway()
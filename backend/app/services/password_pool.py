@@ -0,0 +1,105 @@
+"""
+Dedicated, bounded thread pool for bcrypt work.
+
+bcrypt costs ~250ms of CPU per hash/verify. Running it inline in an
+`async def` handler freezes the event loop for every other request on the
+worker; here it runs on a few threads (bcrypt releases the GIL) and, when
+more than PASSWORD_HASH_MAX_QUEUE jobs are waiting, new ones are shed with
+a 503 instead of piling up.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+from fastapi import HTTPException, status
+from app.core.config import settings
+import asyncio
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class PoolStats:
+    queued: int = 0  # submitted, waiting for a thread
+    running: int = 0
+    completed: int = 0
+    rejected: int = 0
+    wait_ms_total: float = 0.0
+    run_ms_total: float = 0.0
+
+_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+stats = PoolStats()
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            thread_name_prefix="bcrypt"
+        )
+    return _executor
+
+async def run_password_job(fn: Callable[..., Any], *args) -> Any:
+    """Run a blocking bcrypt call on the password pool and await its result"""
+    with _lock:
+        if stats.queued >= settings.PASSWORD_HASH_MAX_QUEUE:
+            stats.rejected += 1
+            saturated = True
+        else:
+            stats.queued += 1
+            saturated = False
+    if saturated:
+        logger.warning(f"Password pool saturated ({stats.queued} queued), rejecting request")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please try again in a moment",
+            headers={"Retry-After": "1"}
+        )
+
+    submitted = time.perf_counter()
+
+    def job():
+        started = time.perf_counter()
+        with _lock:
+            stats.queued -= 1
+            stats.running += 1
+            stats.wait_ms_total += (started - submitted) * 1000
+        try:
+            return fn(*args)
+        finally:
+            with _lock:
+                stats.running -= 1
+                stats.completed += 1
+                stats.run_ms_total += (time.perf_counter() - started) * 1000
+
+    future = _get_executor().submit(job)
+    try:
+        return await asyncio.wrap_future(future)
+    except asyncio.CancelledError:
+        # Client went away while the job was still queued: it will never run
+        if future.cancel():
+            with _lock:
+                stats.queued -= 1
+        raise
+
+def shutdown_password_pool():
+    """Stop the pool threads (called from the app lifespan on shutdown)"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+def get_metrics() -> dict:
+    return {
+        "workers": settings.PASSWORD_HASH_WORKERS,
+        "max_queue": settings.PASSWORD_HASH_MAX_QUEUE,
+        "bcrypt_rounds": settings.BCRYPT_ROUNDS,
+        "queue_depth": stats.queued,
+        "running": stats.running,
+        "completed": stats.completed,
+        "rejected": stats.rejected,
+        "avg_wait_ms": round(stats.wait_ms_total / stats.completed, 1) if stats.completed else 0.0,
+        "avg_run_ms": round(stats.run_ms_total / stats.completed, 1) if stats.completed else 0.0
+    }
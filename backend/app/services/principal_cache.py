@@ -0,0 +1,151 @@
+"""
+Per-worker caches for authentication (used by get_current_user).
+
+- Principals: column snapshot of the User keyed by the token's `sub`, so an
+  authenticated request needs no SELECT on users. Entries are dropped
+  whenever a User row is updated or deleted through the ORM in this worker
+  (profile updates, plan selection, admin delete, ...): once at flush, and
+  again when the transaction commits, so a request that re-cached the old
+  row between the two cannot serve it for the rest of the TTL. Other
+  workers see the change within AUTH_USER_CACHE_TTL. Core bulk update() and
+  delete() statements on users skip the ORM events and so bypass this;
+  call invalidate_user() after one.
+- Tokens: decoded JWT payloads of recently seen tokens, honouring `exp`.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+from sqlalchemy.orm.attributes import set_committed_value
+from app.core.config import settings
+from app.models.user import User
+import hashlib
+import time
+
+@dataclass
+class CacheCounters:
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0
+    evictions: int = 0
+
+    def as_dict(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            **self.__dict__,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+class TTLCache:
+    """Small LRU with per-entry expiry (single event loop, no locking needed)"""
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.counters = CacheCounters()
+
+    def get(self, key: str) -> Optional[Any]:
+        item = self._entries.get(key)
+        if item is None or item[1] <= time.monotonic():
+            if item is not None:
+                del self._entries[key]
+            self.counters.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.counters.hits += 1
+        return item[0]
+
+    def set(self, key: str, value: Any, ttl: float):
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.counters.evictions += 1
+
+    def pop(self, key: str):
+        if self._entries.pop(key, None) is not None:
+            self.counters.invalidations += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+_USER_COLUMNS = [attr.key for attr in inspect(User).column_attrs]
+# session.info key: ids of users flushed in the open transaction
+_CHANGED_USERS = "principal_cache_changed_users"
+
+user_cache = TTLCache(settings.AUTH_USER_CACHE_MAX)
+token_cache = TTLCache(settings.AUTH_TOKEN_CACHE_MAX)
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def get_cached_payload(token: str) -> Optional[dict]:
+    if not settings.AUTH_CACHE_ENABLED:
+        return None
+    payload = token_cache.get(_token_key(token))
+    if payload is not None and payload.get("exp", 0) <= time.time():
+        return None
+    return payload
+
+def cache_payload(token: str, payload: dict):
+    if not settings.AUTH_CACHE_ENABLED:
+        return
+    ttl = settings.AUTH_TOKEN_CACHE_TTL
+    if "exp" in payload:
+        ttl = min(ttl, payload["exp"] - time.time())
+    if ttl > 0:
+        token_cache.set(_token_key(token), payload, ttl)
+
+def get_cached_user(user_id: str) -> Optional[User]:
+    """
+    A detached, unmodified User rebuilt from the cached snapshot.
+    Callers merge it into their session (load=False) so handler changes
+    still flush as normal UPDATEs.
+    """
+    if not settings.AUTH_CACHE_ENABLED:
+        return None
+    snapshot: Optional[Dict[str, Any]] = user_cache.get(user_id)
+    if snapshot is None:
+        return None
+    user = User.__mapper__.class_manager.new_instance()
+    for key, value in snapshot.items():
+        set_committed_value(user, key, value)
+    make_transient_to_detached(user)
+    return user
+
+def cache_user(user: User):
+    if not settings.AUTH_CACHE_ENABLED:
+        return
+    snapshot = {key: user.__dict__[key] for key in _USER_COLUMNS if key in user.__dict__}
+    if len(snapshot) == len(_USER_COLUMNS):
+        user_cache.set(user.id, snapshot, settings.AUTH_USER_CACHE_TTL)
+
+def invalidate_user(user_id: str):
+    user_cache.pop(user_id)
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_change(mapper, connection, target):
+    invalidate_user(target.id)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_CHANGED_USERS, set()).add(target.id)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    for user_id in session.info.pop(_CHANGED_USERS, ()):
+        invalidate_user(user_id)
+
+@event.listens_for(Session, "after_rollback")
+def _forget_on_rollback(session):
+    session.info.pop(_CHANGED_USERS, None)
+
+def get_metrics() -> dict:
+    return {
+        "enabled": settings.AUTH_CACHE_ENABLED,
+        "users": {"entries": len(user_cache), "ttl": settings.AUTH_USER_CACHE_TTL, **user_cache.counters.as_dict()},
+        "tokens": {"entries": len(token_cache), "ttl": settings.AUTH_TOKEN_CACHE_TTL, **token_cache.counters.as_dict()}
+    }
@@ -0,0 +1,342 @@
+"""
+Pluggable file storage for uploads and downloads.
+
+STORAGE_BACKEND selects the driver:
+- "local": files live on the worker's disk (default, previous behaviour).
+- "s3": any S3-compatible object store (AWS S3, MinIO, R2, ...), spoken
+  to directly over the shared httpx stack with SigV4 signing. Downloads are
+  answered with a redirect to a short-lived presigned URL, so large ZIPs
+  never pass through the app workers and no shared disk is needed.
+
+Keys are the same relative paths already stored in the database
+(e.g. "uploads/blobs/ab/cd/<sha256>.zip").
+"""
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import quote, urlsplit
+from xml.etree import ElementTree
+from app.core.config import settings
+import asyncio
+import hashlib
+import hmac
+import httpx
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024  # 1MB
+
+class StorageError(Exception):
+    """The storage backend rejected or failed an operation"""
+
+@dataclass
+class StoredObject:
+    key: str
+    size: int
+    modified: float  # unix timestamp
+
+@dataclass
+class ObjectStream:
+    chunks: AsyncIterator[bytes]
+    size: Optional[int]
+    status: int = 200  # 206/304/416 when conditional or range headers were forwarded
+    headers: Dict[str, str] = field(default_factory=dict)
+
+def content_disposition(filename: str) -> str:
+    """attachment header value, RFC 5987-encoded for non-ASCII names (as FileResponse does)"""
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+class StorageBackend(ABC):
+    name: str
+
+    @abstractmethod
+    async def save(self, source_path: str, key: str, content_type: Optional[str] = None, sha256: Optional[str] = None):
+        """Move a finished local file (e.g. an upload temp file) to key"""
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool: ...
+
+    @abstractmethod
+    async def delete(self, key: str): ...
+
+    @abstractmethod
+    def list(self, prefix: str) -> AsyncIterator[StoredObject]: ...
+
+    @abstractmethod
+    async def open(self, key: str, headers: Optional[Dict[str, str]] = None) -> ObjectStream:
+        """
+        Byte stream of an object; raises FileNotFoundError. Backends that
+        support it honour Range/conditional request headers.
+        """
+
+    def local_path(self, key: str) -> Optional[str]:
+        """Filesystem path when the object is on this worker's disk"""
+        return None
+
+    def presigned_url(self, key: str, filename: Optional[str] = None, media_type: Optional[str] = None,
+                      cache_control: Optional[str] = None) -> Optional[str]:
+        """Time-limited direct download URL, if the backend supports it"""
+        return None
+
+    async def close(self):
+        pass
+
+class LocalStorage(StorageBackend):
+    name = "local"
+
+    async def save(self, source_path: str, key: str, content_type: Optional[str] = None, sha256: Optional[str] = None):
+        os.makedirs(os.path.dirname(key) or ".", exist_ok=True)
+        os.replace(source_path, key)
+
+    async def exists(self, key: str) -> bool:
+        return os.path.exists(key)
+
+    async def delete(self, key: str):
+        try:
+            os.remove(key)
+        except FileNotFoundError:
+            pass
+
+    async def list(self, prefix: str) -> AsyncIterator[StoredObject]:
+        def walk() -> List[StoredObject]:
+            found = []
+            for root, _, files in os.walk(prefix.rstrip("/")):
+                for name in files:
+                    path = f"{root}/{name}".replace("\\", "/")
+                    stat = os.stat(path)
+                    found.append(StoredObject(key=path, size=stat.st_size, modified=stat.st_mtime))
+            return found
+
+        for item in await asyncio.to_thread(walk):
+            yield item
+
+    async def open(self, key: str, headers: Optional[Dict[str, str]] = None) -> ObjectStream:
+        if not os.path.exists(key):
+            raise FileNotFoundError(key)
+        size = os.path.getsize(key)
+
+        async def chunks():
+            with open(key, "rb") as source:
+                while chunk := await asyncio.to_thread(source.read, CHUNK_SIZE):
+                    yield chunk
+
+        return ObjectStream(chunks=chunks(), size=size)
+
+    def local_path(self, key: str) -> Optional[str]:
+        return key
+
+def _hmac(key: bytes, message: str) -> bytes:
+    return hmac.new(key, message.encode(), hashlib.sha256).digest()
+
+def _canonical_query(params: Dict[str, str]) -> str:
+    return "&".join(
+        f"{quote(k, safe='-_.~')}={quote(v, safe='-_.~')}"
+        for k, v in sorted(params.items())
+    )
+
+def sigv4_signature(
+    secret_key: str, region: str, amz_date: str, method: str, path: str,
+    params: Dict[str, str], headers: Dict[str, str], payload_hash: str
+) -> Tuple[str, str]:
+    """AWS Signature Version 4 for S3; returns (signature, signed_headers)"""
+    names = sorted(h.lower() for h in headers)
+    lowered = {k.lower(): v.strip() for k, v in headers.items()}
+    signed_headers = ";".join(names)
+    canonical_request = "\n".join([
+        method,
+        quote(path, safe="/-_.~"),
+        _canonical_query(params),
+        "".join(f"{name}:{lowered[name]}\n" for name in names),
+        signed_headers,
+        payload_hash
+    ])
+    date = amz_date[:8]
+    scope = f"{date}/{region}/s3/aws4_request"
+    string_to_sign = "\n".join([
+        "AWS4-HMAC-SHA256", amz_date, scope,
+        hashlib.sha256(canonical_request.encode()).hexdigest()
+    ])
+    signing_key = _hmac(_hmac(_hmac(_hmac(f"AWS4{secret_key}".encode(), date), region), "s3"), "aws4_request")
+    return hmac.new(signing_key, string_to_sign.encode(), hashlib.sha256).hexdigest(), signed_headers
+
+class S3Storage(StorageBackend):
+    """Path-style S3 client (works with AWS and MinIO-style stand-ins)"""
+    name = "s3"
+
+    def __init__(self, endpoint_url: str, bucket: str, region: str, access_key: str, secret_key: str,
+                 public_endpoint_url: str = "", presign_expiry: int = 300,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self.public_endpoint_url = (public_endpoint_url or endpoint_url).rstrip("/")
+        self.bucket = bucket
+        self.region = region
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.presign_expiry = presign_expiry
+        self.transport = transport  # e.g. an in-process stand-in for tests
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=httpx.Timeout(60.0, connect=5.0), transport=self.transport)
+        return self._client
+
+    def _path(self, key: str = "") -> str:
+        return f"/{self.bucket}/{key}" if key else f"/{self.bucket}"
+
+    def _signed_request(self, method: str, key: str = "", params: Optional[Dict[str, str]] = None,
+                        headers: Optional[Dict[str, str]] = None, payload_hash: str = "UNSIGNED-PAYLOAD",
+                        content=None) -> httpx.Request:
+        params = params or {}
+        amz_date = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        headers = {
+            **(headers or {}),
+            "host": urlsplit(self.endpoint_url).netloc,
+            "x-amz-date": amz_date,
+            "x-amz-content-sha256": payload_hash,
+        }
+        path = self._path(key)
+        signature, signed_headers = sigv4_signature(
+            self.secret_key, self.region, amz_date, method, path, params, headers, payload_hash
+        )
+        headers["Authorization"] = (
+            f"AWS4-HMAC-SHA256 Credential={self.access_key}/{amz_date[:8]}/{self.region}/s3/aws4_request, "
+            f"SignedHeaders={signed_headers}, Signature={signature}"
+        )
+        query = _canonical_query(params)
+        url = f"{self.endpoint_url}{quote(path, safe='/-_.~')}" + (f"?{query}" if query else "")
+        return self._get_client().build_request(method, url, headers=headers, content=content)
+
+    async def _send(self, request: httpx.Request, ok=(200,)) -> httpx.Response:
+        response = await self._get_client().send(request)
+        if response.status_code not in ok:
+            raise StorageError(f"S3 {request.method} {request.url.path} failed: HTTP {response.status_code} {response.text[:200]}")
+        return response
+
+    async def save(self, source_path: str, key: str, content_type: Optional[str] = None, sha256: Optional[str] = None):
+        size = os.path.getsize(source_path)
+
+        async def chunks():
+            with open(source_path, "rb") as source:
+                while chunk := await asyncio.to_thread(source.read, CHUNK_SIZE):
+                    yield chunk
+
+        headers = {"content-length": str(size)}
+        if content_type:
+            headers["content-type"] = content_type
+        request = self._signed_request("PUT", key, headers=headers, payload_hash=sha256 or "UNSIGNED-PAYLOAD", content=chunks())
+        await self._send(request)
+        os.remove(source_path)
+
+    async def exists(self, key: str) -> bool:
+        response = await self._send(self._signed_request("HEAD", key), ok=(200, 404))
+        return response.status_code == 200
+
+    async def delete(self, key: str):
+        await self._send(self._signed_request("DELETE", key), ok=(200, 204, 404))
+
+    async def list(self, prefix: str) -> AsyncIterator[StoredObject]:
+        ns = {"s3": "http://s3.amazonaws.com/doc/2006-03-01/"}
+        token = None
+        while True:
+            params = {"list-type": "2", "prefix": prefix}
+            if token:
+                params["continuation-token"] = token
+            root = ElementTree.fromstring((await self._send(self._signed_request("GET", params=params))).content)
+            for item in root.findall("s3:Contents", ns):
+                modified = datetime.fromisoformat(item.findtext("s3:LastModified", "", ns).replace("Z", "+00:00"))
+                yield StoredObject(
+                    key=item.findtext("s3:Key", "", ns),
+                    size=int(item.findtext("s3:Size", "0", ns)),
+                    modified=modified.timestamp()
+                )
+            token = root.findtext("s3:NextContinuationToken", None, ns)
+            if root.findtext("s3:IsTruncated", "false", ns) != "true" or not token:
+                break
+
+    async def open(self, key: str, headers: Optional[Dict[str, str]] = None) -> ObjectStream:
+        request = self._signed_request("GET", key, headers=headers)
+        response = await self._get_client().send(request, stream=True)
+        if response.status_code not in (200, 206, 304, 416):
+            await response.aclose()
+            if response.status_code == 404:
+                raise FileNotFoundError(key)
+            raise StorageError(f"S3 GET {key} failed: HTTP {response.status_code}")
+
+        async def chunks():
+            try:
+                async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                    yield chunk
+            finally:
+                await response.aclose()
+
+        length = response.headers.get("content-length")
+        return ObjectStream(
+            chunks=chunks(),
+            size=int(length) if length else None,
+            status=response.status_code,
+            headers=dict(response.headers)
+        )
+
+    def presigned_url(self, key: str, filename: Optional[str] = None, media_type: Optional[str] = None,
+                      cache_control: Optional[str] = None) -> Optional[str]:
+        amz_date = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        params = {
+            "X-Amz-Algorithm": "AWS4-HMAC-SHA256",
+            "X-Amz-Credential": f"{self.access_key}/{amz_date[:8]}/{self.region}/s3/aws4_request",
+            "X-Amz-Date": amz_date,
+            "X-Amz-Expires": str(self.presign_expiry),
+            "X-Amz-SignedHeaders": "host",
+        }
+        if filename:
+            params["response-content-disposition"] = content_disposition(filename)
+        if media_type:
+            params["response-content-type"] = media_type
+        if cache_control:
+            params["response-cache-control"] = cache_control
+        path = self._path(key)
+        signature, _ = sigv4_signature(
+            self.secret_key, self.region, amz_date, "GET", path, params,
+            {"host": urlsplit(self.public_endpoint_url).netloc}, "UNSIGNED-PAYLOAD"
+        )
+        params["X-Amz-Signature"] = signature
+        return f"{self.public_endpoint_url}{quote(path, safe='/-_.~')}?{_canonical_query(params)}"
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+_storage: Optional[StorageBackend] = None
+
+def get_storage() -> StorageBackend:
+    """The configured storage backend (created on first use)"""
+    global _storage
+    if _storage is None:
+        if settings.STORAGE_BACKEND == "s3":
+            _storage = S3Storage(
+                endpoint_url=settings.S3_ENDPOINT_URL,
+                public_endpoint_url=settings.S3_PUBLIC_ENDPOINT_URL,
+                bucket=settings.S3_BUCKET,
+                region=settings.S3_REGION,
+                access_key=settings.S3_ACCESS_KEY_ID,
+                secret_key=settings.S3_SECRET_ACCESS_KEY,
+                presign_expiry=settings.S3_PRESIGN_EXPIRY
+            )
+        else:
+            _storage = LocalStorage()
+        logger.info(f"✅ File storage backend: {_storage.name}")
+    return _storage
+
+async def close_storage():
+    """Close backend connections (called from the app lifespan on shutdown)"""
+    global _storage
+    if _storage is not None:
+        await _storage.close()
+        _storage = None
@@ -0,0 +1,44 @@
+"""
+Server-Sent Events helpers for the streaming AI endpoints.
+"""
+from typing import Any, Dict
+import json
+
+# Keep proxies (nginx, Render) from buffering the stream
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
+
+def sse_event(data: Dict[str, Any]) -> str:
+    """Format one SSE message; every payload carries a `type` (delta, done, error)"""
+    return f"data: {json.dumps(data)}\n\n"
+
+class MarkerFilter:
+    """
+    Strip a control marker (e.g. "[FINALIZE]") from streamed text.
+    A marker can be split across chunks, so any trailing text that could be
+    the start of the marker is held back until the next chunk decides it.
+    """
+    def __init__(self, marker: str):
+        self.marker = marker
+        self.found = False
+        self._pending = ""
+
+    def feed(self, chunk: str) -> str:
+        text = self._pending + chunk
+        if self.marker in text:
+            self.found = True
+            text = text.replace(self.marker, "")
+        # Hold back the longest suffix that is a prefix of the marker
+        hold = 0
+        for size in range(min(len(self.marker) - 1, len(text)), 0, -1):
+            if self.marker.startswith(text[-size:]):
+                hold = size
+                break
+        self._pending = text[len(text) - hold:] if hold else ""
+        return text[:len(text) - hold]
+
+    def flush(self) -> str:
+        text, self._pending = self._pending, ""
+        return text
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Event-loop blocking benchmark: sync Session vs AsyncSession inside `async def` routes.
+
+Each request runs one query that takes QUERY_DELAY seconds on the server
+(`SELECT pg_sleep(...)`), the way a slow Neon query would. With the sync
+Session the query blocks the event loop, so concurrent requests queue behind
+each other; with AsyncSession they overlap.
+
+Usage (needs DATABASE_URL pointing at a reachable Postgres):
+    python -m benchmarks.async_db --requests 200 --concurrency 20 --delay 0.05
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db, get_async_db, async_engine
+
+QUERY = text("SELECT pg_sleep(:delay)")
+
+def build_app(delay: float) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/sync")
+    async def sync_route(db: Session = Depends(get_db)):
+        db.execute(QUERY, {"delay": delay})
+        return {"ok": True}
+
+    @app.get("/async")
+    async def async_route(db: AsyncSession = Depends(get_async_db)):
+        await db.execute(QUERY, {"delay": delay})
+        return {"ok": True}
+
+    return app
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+async def run_mode(app: FastAPI, path: str, total: int, concurrency: int) -> dict:
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up the pool so connection setup is not measured
+        await asyncio.gather(*(client.get(path) for _ in range(concurrency)))
+
+        async def one():
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(path)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "rps": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+async def main(total: int, concurrency: int, delay: float):
+    app = build_app(delay)
+    results = {}
+    for label, path in (("before (sync Session)", "/sync"), ("after (AsyncSession)", "/async")):
+        results[label] = await run_mode(app, path, total, concurrency)
+    await async_engine.dispose()
+
+    print("=" * 60)
+    print(f"{total} requests, concurrency {concurrency}, query time {delay * 1000:.0f}ms")
+    print("=" * 60)
+    for label, r in results.items():
+        print(f"{label:<24} {r['rps']:>8.1f} req/s   p50 {r['p50_ms']:>8.1f}ms   p99 {r['p99_ms']:>8.1f}ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--delay", type=float, default=0.05, help="seconds each query sleeps on the server")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.delay))
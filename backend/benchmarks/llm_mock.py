@@ -0,0 +1,40 @@
+"""
+In-process stand-in for the LLM providers.
+
+install_mock_llm() swaps the shared provider clients (app/services/llm_clients.py)
+for httpx clients on a MockTransport that answers chat completions after a
+simulated latency, so idea generation can be benchmarked in-process without
+API keys, cost or provider rate limits. Only applies when the app runs in the
+benchmark process; a server under test can be pointed at benchmarks/llm_stub.py,
+which also injects failures and streams.
+"""
+import asyncio
+import json
+import random
+
+import httpx
+
+from app.core.config import settings
+from app.services import llm_clients
+from benchmarks.llm_stub import DEFAULT_CONTENT
+
+def _handler(latency: float, jitter: float):
+    async def handle(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(max(0.0, random.gauss(latency, jitter)))
+        body = {
+            "id": "bench-completion",
+            "object": "chat.completion",
+            "model": json.loads(request.content or b"{}").get("model", "bench"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": DEFAULT_CONTENT}, "finish_reason": "stop"}],
+        }
+        return httpx.Response(200, json=body)
+    return handle
+
+def install_mock_llm(latency: float = 0.8, jitter: float = 0.2):
+    """Route every provider to the mock (closed again by close_llm_clients())"""
+    transport = httpx.MockTransport(_handler(latency, jitter))
+    for provider, (base_url_setting, key_setting, _) in llm_clients.PROVIDERS.items():
+        # The gateway skips providers without a key
+        if not getattr(settings, key_setting):
+            setattr(settings, key_setting, "bench")
+        llm_clients._clients[provider] = httpx.AsyncClient(base_url=getattr(settings, base_url_setting), transport=transport)
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Local OpenAI-compatible stub for the LLM providers.
+
+Serves POST .../chat/completions (plain and "stream": true) with a
+configurable latency distribution and injected failures, so fallback,
+hedging, timeouts and concurrency can be exercised offline and in CI
+without API credits. Point the app at it with XAI_BASE_URL / GROQ_BASE_URL
+(any API key works); run two stubs with different behaviour to test
+failover between providers.
+
+Each request draws one outcome: 429 with Retry-After (--rate-limit-rate),
+500 (--error-rate), a hang longer than any client timeout (--hang-rate), or
+success after a sampled latency. Successful streams send the first token
+after that latency, then a token every --token-interval seconds, and drop
+the connection midway with probability --stream-abort-rate.
+
+Latency specs: fixed:S, uniform:MIN,MAX, normal:MEAN,SD, lognormal:MEDIAN,SIGMA, exp:MEAN
+
+Runtime control (e.g. to flip a provider into failure mid-test):
+    GET  /_stub/config        current behaviour
+    POST /_stub/config        JSON with any of the fields below to change
+    GET  /_stub/stats         requests per outcome
+    DELETE /_stub/stats       reset the counters
+
+Usage:
+    python -m benchmarks.llm_stub --port 9100 --latency lognormal:0.8,0.4
+    python -m benchmarks.llm_stub --port 9101 --error-rate 0.3 --rate-limit-rate 0.1 --seed 7
+    XAI_BASE_URL=http://127.0.0.1:9100/v1 GROQ_BASE_URL=http://127.0.0.1:9101/v1 uvicorn app.main:app
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+from collections import Counter
+from dataclasses import asdict, dataclass, fields
+from typing import AsyncIterator, Callable
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+DEFAULT_CONTENT = (
+    "A low-cost IoT soil monitoring network: ESP32 nodes with capacitive moisture "
+    "and NPK sensors report over LoRa to a Raspberry Pi gateway; a React dashboard "
+    "and a small ML model recommend irrigation schedules per field."
+)
+
+@dataclass
+class StubBehavior:
+    latency: str = "normal:0.8,0.2"
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after: int = 2
+    hang_rate: float = 0.0
+    hang_seconds: float = 120.0
+    stream_abort_rate: float = 0.0
+    token_interval: float = 0.02
+    content: str = DEFAULT_CONTENT
+
+def latency_sampler(spec: str, rng: random.Random) -> Callable[[], float]:
+    """Parse a latency spec into a function returning seconds (never negative)"""
+    kind, _, raw = spec.partition(":")
+    try:
+        args = [float(value) for value in raw.split(",")] if raw else []
+        if kind == "fixed":
+            (seconds,) = args
+            sample = lambda: seconds
+        elif kind == "uniform":
+            low, high = args
+            sample = lambda: rng.uniform(low, high)
+        elif kind == "normal":
+            mean, sd = args
+            sample = lambda: rng.gauss(mean, sd)
+        elif kind == "lognormal":
+            median, sigma = args
+            sample = lambda: rng.lognormvariate(math.log(median), sigma)
+        elif kind == "exp":
+            (mean,) = args
+            sample = lambda: rng.expovariate(1 / mean)
+        else:
+            raise ValueError(f"unknown distribution {kind!r}")
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid latency spec {spec!r}: {e}")
+    return lambda: max(0.0, sample())
+
+class LLMStub:
+    def __init__(self, behavior: StubBehavior, seed: int = None):
+        self.rng = random.Random(seed)
+        self.stats: Counter = Counter()
+        self.configure(behavior)
+
+    def configure(self, behavior: StubBehavior):
+        self.sample_latency = latency_sampler(behavior.latency, self.rng)
+        self.behavior = behavior
+
+    def outcome(self) -> str:
+        roll = self.rng.random()
+        for name, rate in (("rate_limited", self.behavior.rate_limit_rate),
+                           ("error", self.behavior.error_rate),
+                           ("hang", self.behavior.hang_rate)):
+            if roll < rate:
+                return name
+            roll -= rate
+        return "ok"
+
+    def _completion_id(self) -> str:
+        return f"chatcmpl-stub-{uuid.uuid4().hex[:12]}"
+
+    async def _stream(self, model: str, latency: float, abort: bool) -> AsyncIterator[bytes]:
+        completion_id = self._completion_id()
+        tokens = self.behavior.content.split(" ")
+        await asyncio.sleep(latency)
+        for index, token in enumerate(tokens):
+            if abort and index == len(tokens) // 2:
+                # Dropping the connection mid-body is what a provider failure looks like to the client
+                raise ConnectionAbortedError("stub aborted the stream")
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": token if index == 0 else " " + token}, "finish_reason": None}],
+            }
+            yield f"data: {json.dumps(chunk)}\n\n".encode()
+            await asyncio.sleep(self.behavior.token_interval)
+        done = {"id": completion_id, "object": "chat.completion.chunk", "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+        yield f"data: {json.dumps(done)}\n\n".encode()
+        yield b"data: [DONE]\n\n"
+
+    async def chat_completions(self, request: Request) -> Response:
+        try:
+            payload = await request.json()
+        except ValueError:
+            return JSONResponse({"error": {"message": "Invalid JSON body", "type": "invalid_request_error"}}, 400)
+        model = payload.get("model", "stub")
+        outcome = self.outcome()
+        self.stats[outcome] += 1
+
+        if outcome == "rate_limited":
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached (stub)", "type": "rate_limit_exceeded"}},
+                status_code=429,
+                headers={"Retry-After": str(self.behavior.retry_after)}
+            )
+        if outcome == "hang":
+            await asyncio.sleep(self.behavior.hang_seconds)
+            return JSONResponse({"error": {"message": "Upstream timeout (stub)", "type": "timeout"}}, 504)
+
+        latency = self.sample_latency()
+        if outcome == "error":
+            await asyncio.sleep(latency)
+            return JSONResponse({"error": {"message": "Internal error (stub)", "type": "server_error"}}, 500)
+
+        if payload.get("stream"):
+            abort = self.rng.random() < self.behavior.stream_abort_rate
+            if abort:
+                self.stats["stream_aborted"] += 1
+            return StreamingResponse(self._stream(model, latency, abort), media_type="text/event-stream")
+
+        await asyncio.sleep(latency)
+        content = self.behavior.content
+        return JSONResponse({
+            "id": self._completion_id(),
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": len(content.split()), "total_tokens": len(content.split())},
+        })
+
+    async def get_config(self, request: Request) -> Response:
+        return JSONResponse(asdict(self.behavior))
+
+    async def update_config(self, request: Request) -> Response:
+        changes = await request.json()
+        known = {field.name for field in fields(StubBehavior)}
+        unknown = set(changes) - known
+        if unknown:
+            return JSONResponse({"error": f"Unknown field(s): {', '.join(sorted(unknown))}"}, 400)
+        try:
+            self.configure(StubBehavior(**{**asdict(self.behavior), **changes}))
+        except ValueError as e:
+            return JSONResponse({"error": str(e)}, 400)
+        return JSONResponse(asdict(self.behavior))
+
+    async def get_stats(self, request: Request) -> Response:
+        return JSONResponse(dict(self.stats))
+
+    async def reset_stats(self, request: Request) -> Response:
+        self.stats.clear()
+        return JSONResponse({})
+
+def create_app(behavior: StubBehavior = None, seed: int = None) -> Starlette:
+    stub = LLMStub(behavior or StubBehavior(), seed)
+    app = Starlette(routes=[
+        # Matches both /v1/chat/completions (X.AI) and /openai/v1/chat/completions (Groq)
+        Route("/{prefix:path}/chat/completions", stub.chat_completions, methods=["POST"]),
+        Route("/chat/completions", stub.chat_completions, methods=["POST"]),
+        Route("/_stub/config", stub.get_config, methods=["GET"]),
+        Route("/_stub/config", stub.update_config, methods=["POST"]),
+        Route("/_stub/stats", stub.get_stats, methods=["GET"]),
+        Route("/_stub/stats", stub.reset_stats, methods=["DELETE"]),
+    ])
+    app.state.stub = stub
+    return app
+
+if __name__ == "__main__":
+    import uvicorn
+
+    defaults = StubBehavior()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--seed", type=int, help="random seed, for reproducible outcome sequences")
+    parser.add_argument("--latency", default=defaults.latency, help="latency distribution (see above)")
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate, help="fraction answered with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=defaults.rate_limit_rate, help="fraction answered with 429")
+    parser.add_argument("--retry-after", type=int, default=defaults.retry_after, help="Retry-After seconds on 429s")
+    parser.add_argument("--hang-rate", type=float, default=defaults.hang_rate, help="fraction that hang for --hang-seconds")
+    parser.add_argument("--hang-seconds", type=float, default=defaults.hang_seconds)
+    parser.add_argument("--stream-abort-rate", type=float, default=defaults.stream_abort_rate,
+                        help="fraction of streams dropped halfway")
+    parser.add_argument("--token-interval", type=float, default=defaults.token_interval, help="seconds between streamed tokens")
+    args = parser.parse_args()
+
+    behavior = StubBehavior(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        hang_rate=args.hang_rate,
+        hang_seconds=args.hang_seconds,
+        stream_abort_rate=args.stream_abort_rate,
+        token_interval=args.token_interval,
+    )
+    uvicorn.run(create_app(behavior, args.seed), host=args.host, port=args.port, log_level="warning")
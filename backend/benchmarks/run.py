@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Load-test runner: RPS and p50/p95/p99 latency per route for each scenario.
+
+Scenarios (benchmarks/scenarios.py) run ITERATIONS times with CONCURRENCY
+virtual users against seeded data (python -m benchmarks.seed --scale ...).
+By default the app runs in this process (full lifespan, real Postgres, the
+LLM providers replaced by benchmarks/llm_mock.py, or with --llm configured
+whatever XAI_BASE_URL / GROQ_BASE_URL point at, e.g. benchmarks/llm_stub.py);
+with --base-url the requests go to a running server instead, e.g. gunicorn
+with several workers.
+
+Every run is written as JSON (run metadata plus per-route stats) to
+benchmarks/results/, and --compare prints the change against an earlier run.
+
+Usage:
+    python -m benchmarks.run --scenarios all --iterations 200 --concurrency 20
+    python -m benchmarks.run --scenarios dashboard_browse,admin_paging --compare benchmarks/results/<previous>.json
+    python -m benchmarks.run --base-url http://localhost:8000 --scenarios login_storm
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import httpx
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal, async_engine
+from app.models.user import User
+from benchmarks.llm_mock import install_mock_llm
+from benchmarks.scenarios import SCENARIOS, BenchContext, Samples
+from benchmarks.seed import count_bench_users
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def summarize(samples: Samples, elapsed: float) -> Dict[str, dict]:
+    routes = {}
+    for label, entries in sorted(samples.items()):
+        latencies = [latency for latency, _ in entries]
+        routes[label] = {
+            "requests": len(entries),
+            "errors": sum(1 for _, ok in entries if not ok),
+            "rps": round(len(entries) / elapsed, 2),
+            "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+            "max_ms": round(max(latencies) * 1000, 2),
+        }
+    return routes
+
+async def run_scenario(name: str, client: httpx.AsyncClient, ctx: BenchContext, iterations: int, concurrency: int) -> dict:
+    step = SCENARIOS[name].step
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await step(ctx, client)
+
+    # Warm-up round (pool connections, caches) is not measured
+    await asyncio.gather(*(one() for _ in range(min(concurrency, iterations))))
+    ctx.samples = {}
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(iterations)))
+    elapsed = time.perf_counter() - started
+
+    routes = summarize(ctx.samples, elapsed)
+    return {
+        "description": SCENARIOS[name].description,
+        "iterations": iterations,
+        "elapsed_s": round(elapsed, 3),
+        "iterations_per_s": round(iterations / elapsed, 2),
+        "requests": sum(route["requests"] for route in routes.values()),
+        "errors": sum(route["errors"] for route in routes.values()),
+        "routes": routes,
+    }
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _change(old: float, new: float) -> str:
+    if not old:
+        return "   n/a"
+    return f"{(new - old) / old * 100:+6.1f}%"
+
+def print_report(report: dict, baseline: Optional[dict] = None):
+    for name, scenario in report["scenarios"].items():
+        print(f"\n{name}: {scenario['iterations_per_s']} iterations/s, {scenario['errors']} errors")
+        old_routes = (baseline or {}).get("scenarios", {}).get(name, {}).get("routes", {})
+        for label, route in scenario["routes"].items():
+            line = (f"   {label:<48} {route['rps']:>8.1f} req/s  p50 {route['p50_ms']:>8.1f}ms"
+                    f"  p99 {route['p99_ms']:>8.1f}ms  errors {route['errors']}")
+            old = old_routes.get(label)
+            if old:
+                line += (f"   vs baseline: rps {_change(old['rps'], route['rps'])}"
+                         f"  p50 {_change(old['p50_ms'], route['p50_ms'])}  p99 {_change(old['p99_ms'], route['p99_ms'])}")
+            print(line)
+
+async def load_context(pages: int) -> BenchContext:
+    async with AsyncSessionLocal() as db:
+        seeded = await count_bench_users(db)
+        admin_id = await db.scalar(select(User.id).where(User.is_admin.is_(True)).limit(1))
+    return BenchContext(seeded_users=seeded, admin_id=admin_id, pages=pages)
+
+async def run(args) -> dict:
+    ctx = await load_context(args.pages)
+    if not ctx.seeded_users or not ctx.admin_id:
+        raise RuntimeError("No benchmark users or no admin: run python -m benchmarks.seed and create_admin.py first")
+
+    names = list(SCENARIOS) if args.scenarios == "all" else [name.strip() for name in args.scenarios.split(",")]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        raise RuntimeError(f"Unknown scenario(s): {', '.join(unknown)} (choose from {', '.join(SCENARIOS)})")
+
+    report = {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "target": args.base_url or "in-process",
+            "seeded_users": ctx.seeded_users,
+            "iterations": args.iterations,
+            "concurrency": args.concurrency,
+            "llm": "server" if args.base_url else args.llm,
+            "llm_latency_s": args.llm_latency if not args.base_url and args.llm == "mock" else None,
+            "random_seed": args.seed,
+            "python": platform.python_version(),
+        },
+        "scenarios": {},
+    }
+
+    timeout = httpx.Timeout(120.0)
+    if args.base_url:
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=timeout) as client:
+            try:
+                (await client.get("/health")).raise_for_status()
+            except httpx.HTTPError as e:
+                raise RuntimeError(f"{args.base_url} is not reachable: {e}")
+            for name in names:
+                report["scenarios"][name] = await run_scenario(name, client, ctx, args.iterations, args.concurrency)
+        return report
+
+    from app.main import app
+    async with app.router.lifespan_context(app):
+        if args.llm == "mock":
+            install_mock_llm(args.llm_latency)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=timeout) as client:
+            for name in names:
+                report["scenarios"][name] = await run_scenario(name, client, ctx, args.iterations, args.concurrency)
+    return report
+
+async def main(args) -> int:
+    random.seed(args.seed)
+    print("=" * 60)
+    print("BENCHMARK RUN")
+    print("=" * 60)
+    try:
+        report = await run(args)
+    except Exception as e:
+        print(f"❌ Benchmark failed: {e}")
+        return 1
+    finally:
+        await async_engine.dispose()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as source:
+            baseline = json.load(source)
+    meta = report["meta"]
+    print(f"{meta['target']}, {meta['seeded_users']:,} seeded users, "
+          f"{meta['iterations']} iterations x concurrency {meta['concurrency']}")
+    print_report(report, baseline)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{meta['git_commit'] or 'local'}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as target:
+        json.dump(report, target, indent=2)
+    failed = sum(scenario["errors"] for scenario in report["scenarios"].values())
+    print(f"\n{'❌' if failed else '✅'} Results written to {output}" + (f" ({failed} failed requests)" if failed else ""))
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default="all", help=f"comma-separated: {', '.join(SCENARIOS)} (or all)")
+    parser.add_argument("--iterations", type=int, default=200, help="scenario iterations per scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=5, help="cursor pages walked per admin_paging iteration")
+    parser.add_argument("--base-url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--llm", choices=["mock", "configured"], default="mock",
+                        help="in-process LLM: the mock, or the providers in settings (e.g. llm_stub.py)")
+    parser.add_argument("--llm-latency", type=float, default=0.8, help="seconds the mocked LLM takes (--llm mock)")
+    parser.add_argument("--seed", type=int, default=1234, help="random seed for user/topic choice")
+    parser.add_argument("--output", help="JSON report path (default benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--compare", help="earlier JSON report to compare against")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,114 @@
+"""
+Benchmark scenarios: what one virtual user does in one iteration.
+
+Each scenario's step() issues its requests through timed(), which records
+the latency and outcome under a route label, so reports show every route
+a scenario touches. Students are picked at random from the seeded users
+(benchmarks/seed.py); tokens are minted locally, so only the login storm
+pays for bcrypt.
+"""
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.core.security import create_access_token
+from benchmarks.seed import BENCH_PASSWORD, bench_user_email, bench_user_id
+
+# label -> [(latency seconds, ok)]
+Samples = Dict[str, List[Tuple[float, bool]]]
+
+TOKEN_LIFETIME = timedelta(hours=6)
+
+# A repeated topic set gives the idea cache a realistic hit rate
+IDEA_TOPICS = [
+    "iot agriculture", "machine learning healthcare", "blockchain supply chain", "smart parking",
+    "computer vision traffic", "web app for college events", "home automation arduino",
+    "nlp chatbot for students", "drone delivery", "energy monitoring raspberry pi",
+]
+
+# A small but valid PDF, padded to a typical synopsis size
+SYNOPSIS_PDF = b"%PDF-1.4\n" + b"0" * 200_000 + b"\n%%EOF\n"
+
+ADMIN_LISTS = ["/api/users/", "/api/orders/all/list", "/api/projects/all/list"]
+
+@dataclass
+class BenchContext:
+    seeded_users: int
+    admin_id: str
+    pages: int = 5
+    page_size: int = 50
+    samples: Samples = field(default_factory=dict)
+
+    def record(self, label: str, latency: float, ok: bool):
+        self.samples.setdefault(label, []).append((latency, ok))
+
+    def random_user(self) -> int:
+        return random.randint(1, self.seeded_users)
+
+    def student_headers(self, n: Optional[int] = None) -> dict:
+        user_id = bench_user_id(n or self.random_user())
+        return {"Authorization": f"Bearer {create_access_token({'sub': user_id}, TOKEN_LIFETIME)}"}
+
+    def admin_headers(self) -> dict:
+        return {"Authorization": f"Bearer {create_access_token({'sub': self.admin_id}, TOKEN_LIFETIME)}"}
+
+async def timed(ctx: BenchContext, client: httpx.AsyncClient, label: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+    start = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+    except httpx.HTTPError:
+        ctx.record(label, time.perf_counter() - start, False)
+        return None
+    ctx.record(label, time.perf_counter() - start, response.status_code < 400)
+    return response
+
+async def login_storm(ctx: BenchContext, client: httpx.AsyncClient):
+    await timed(ctx, client, "POST /api/auth/login", "POST", "/api/auth/login",
+                json={"email": bench_user_email(ctx.random_user()), "password": BENCH_PASSWORD})
+
+async def dashboard_browse(ctx: BenchContext, client: httpx.AsyncClient):
+    """The requests the student dashboard makes on load"""
+    headers = ctx.student_headers()
+    for path in ("/api/auth/me", "/api/orders/me", "/api/projects/me", "/api/synopsis/",
+                 "/api/meetings/me", "/api/plans/", "/api/idea-generation/count"):
+        await timed(ctx, client, f"GET {path}", "GET", path, headers=headers)
+
+async def synopsis_upload(ctx: BenchContext, client: httpx.AsyncClient):
+    await timed(ctx, client, "POST /api/synopsis/upload", "POST", "/api/synopsis/upload",
+                headers=ctx.student_headers(),
+                files={"file": ("synopsis.pdf", SYNOPSIS_PDF, "application/pdf")})
+
+async def admin_paging(ctx: BenchContext, client: httpx.AsyncClient):
+    """Walk the first ctx.pages cursor pages of one admin list"""
+    path = random.choice(ADMIN_LISTS)
+    headers = ctx.admin_headers()
+    cursor = ""
+    for _ in range(ctx.pages):
+        response = await timed(ctx, client, f"GET {path} (cursor)", "GET", path, headers=headers,
+                               params={"cursor": cursor, "limit": ctx.page_size})
+        if response is None or response.status_code != 200:
+            return
+        cursor = response.json().get("next_cursor")
+        if not cursor:
+            return
+
+async def idea_generation(ctx: BenchContext, client: httpx.AsyncClient):
+    await timed(ctx, client, "POST /api/idea-generation/generate", "POST", "/api/idea-generation/generate",
+                headers=ctx.student_headers(), json={"field_of_interest": random.choice(IDEA_TOPICS)})
+
+@dataclass(frozen=True)
+class Scenario:
+    description: str
+    step: Callable[[BenchContext, httpx.AsyncClient], Awaitable[None]]
+
+SCENARIOS: Dict[str, Scenario] = {
+    "login_storm": Scenario("Concurrent logins (bcrypt on the password pool)", login_storm),
+    "dashboard_browse": Scenario("Student dashboard page load", dashboard_browse),
+    "synopsis_upload": Scenario("200KB synopsis PDF uploads", synopsis_upload),
+    "admin_paging": Scenario("Admin walks cursor pages of users/orders/projects", admin_paging),
+    "idea_generation": Scenario("Idea generation against the mocked LLM", idea_generation),
+}
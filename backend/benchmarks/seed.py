@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Seed synthetic benchmark data: N users, each with one order and one project.
+
+Rows are generated server-side with generate_series in chunks, so even the
+1m scale takes minutes rather than hours. Everything is derived from the row
+number (ids are md5("bench-user-<n>") as a uuid, emails bench<n>@bench.example.com),
+so reseeding is idempotent and a larger scale only adds the missing rows.
+All users share the password BENCH_PASSWORD, hashed once with BCRYPT_ROUNDS,
+so login benchmarks pay the real bcrypt cost.
+
+The inserts bypass the ORM, so the admin dashboard counters are rebuilt
+afterwards (see app/services/admin_stats.py).
+
+Usage (needs DATABASE_URL pointing at a local Postgres, never production):
+    python -m benchmarks.seed --scale 10k
+    python -m benchmarks.seed --scale 1m
+    python -m benchmarks.seed --reset      # delete all benchmark users and their rows
+"""
+import argparse
+import asyncio
+import hashlib
+import time
+import uuid
+
+from sqlalchemy import text
+
+from app.core.database import AsyncSessionLocal, async_engine
+from app.core.security import get_password_hash
+from app.services.admin_stats import recompute_stats
+
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+EMAIL_DOMAIN = "bench.example.com"
+BENCH_PASSWORD = "benchpass"
+CHUNK_SIZE = 50_000
+
+# created_at is spread over the past year so date filters and cursor pages
+# see a realistic distribution
+USERS_SQL = text(f"""
+    INSERT INTO users (id, email, password, name, phone, is_admin, signup_step, selected_plan_id,
+                       has_synopsis, needs_idea_generation, onboarding_completed, created_at, updated_at)
+    SELECT md5('bench-user-' || n)::uuid::text, 'bench' || n || '@{EMAIL_DOMAIN}', :password,
+           'Bench User ' || n, '+91' || lpad(n::text, 10, '0'), false, 'completed', 'plan-basic',
+           n % 3 = 0, n % 5 = 0, true, now() AT TIME ZONE 'utc' - (n % 525600) * interval '1 minute',
+           now() AT TIME ZONE 'utc'
+    FROM generate_series(CAST(:start AS integer), CAST(:stop AS integer)) AS n
+    ON CONFLICT DO NOTHING
+""")
+
+ORDERS_SQL = text("""
+    INSERT INTO orders (id, user_id, plan_id, plan_name, amount, status, service_type, payment_method, created_at, updated_at)
+    SELECT md5('bench-order-' || n)::uuid::text, md5('bench-user-' || n)::uuid::text, 'plan-basic', 'Basic Plan',
+           2999 + (n % 4) * 1000, (ARRAY['pending', 'paid', 'completed', 'cancelled'])[n % 4 + 1],
+           (ARRAY['web-app', 'iot'])[n % 2 + 1], 'upi',
+           now() AT TIME ZONE 'utc' - (n % 525600) * interval '1 minute', now() AT TIME ZONE 'utc'
+    FROM generate_series(CAST(:start AS integer), CAST(:stop AS integer)) AS n
+    ON CONFLICT DO NOTHING
+""")
+
+PROJECTS_SQL = text("""
+    INSERT INTO projects (id, user_id, title, description, category, tech_stack, status,
+                          idea_generated, synopsis_submitted, url_approved, created_at, updated_at)
+    SELECT md5('bench-project-' || n)::uuid::text, md5('bench-user-' || n)::uuid::text,
+           'Bench Project ' || n, 'Synthetic project used by the benchmark suite',
+           (ARRAY['software', 'hardware', 'iot', 'ml'])[n % 4 + 1], 'python, react',
+           (ARRAY['idea_pending', 'synopsis_pending', 'in_progress', 'completed'])[n % 4 + 1],
+           n % 2 = 0, n % 3 = 0, false,
+           now() AT TIME ZONE 'utc' - (n % 525600) * interval '1 minute', now() AT TIME ZONE 'utc'
+    FROM generate_series(CAST(:start AS integer), CAST(:stop AS integer)) AS n
+    ON CONFLICT DO NOTHING
+""")
+
+def bench_user_id(n: int) -> str:
+    """Id of the n-th seeded user (matches md5(...)::uuid in USERS_SQL)"""
+    return str(uuid.UUID(hashlib.md5(f"bench-user-{n}".encode()).hexdigest()))
+
+def bench_user_email(n: int) -> str:
+    return f"bench{n}@{EMAIL_DOMAIN}"
+
+async def count_bench_users(db) -> int:
+    return await db.scalar(text(f"SELECT count(*) FROM users WHERE email LIKE '%@{EMAIL_DOMAIN}'"))
+
+def parse_scale(value: str) -> int:
+    if value.lower() in SCALES:
+        return SCALES[value.lower()]
+    return int(value)
+
+async def seed(total: int):
+    password = get_password_hash(BENCH_PASSWORD)
+    async with AsyncSessionLocal() as db:
+        started = time.perf_counter()
+        for start in range(1, total + 1, CHUNK_SIZE):
+            stop = min(start + CHUNK_SIZE - 1, total)
+            params = {"start": start, "stop": stop}
+            await db.execute(USERS_SQL, {**params, "password": password})
+            await db.execute(ORDERS_SQL, params)
+            await db.execute(PROJECTS_SQL, params)
+            await db.commit()
+            print(f"   rows {start:,}-{stop:,} ({time.perf_counter() - started:.1f}s)")
+
+        # Fresh planner statistics, or the first runs measure bad plans
+        for table in ("users", "orders", "projects"):
+            await db.execute(text(f"ANALYZE {table}"))
+        await db.commit()
+        await recompute_stats(db)
+        return await count_bench_users(db)
+
+async def reset():
+    async with AsyncSessionLocal() as db:
+        # Deleting a user checks orders.payment_verified_by, which has no index,
+        # so every deleted user would scan all of orders; index it for the
+        # duration of this transaction only
+        await db.execute(text("CREATE INDEX bench_reset_payment_verified_by ON orders (payment_verified_by)"))
+        # Orders, projects and everything else owned by the users go with ON DELETE CASCADE
+        result = await db.execute(text(f"DELETE FROM users WHERE email LIKE '%@{EMAIL_DOMAIN}'"))
+        await db.execute(text("DROP INDEX bench_reset_payment_verified_by"))
+        await db.commit()
+        await recompute_stats(db)
+        return result.rowcount
+
+async def main(scale: str, do_reset: bool):
+    print("=" * 60)
+    print("BENCHMARK DATA")
+    print("=" * 60)
+    try:
+        if do_reset:
+            removed = await reset()
+            print(f"\n✅ Removed {removed:,} benchmark users and their rows")
+        else:
+            total = parse_scale(scale)
+            print(f"Seeding {total:,} users, orders and projects")
+            seeded = await seed(total)
+            print(f"\n✅ {seeded:,} benchmark users in the database")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+    finally:
+        await async_engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", default="10k", help="10k, 100k, 1m or a number of users")
+    parser.add_argument("--reset", action="store_true", help="delete the benchmark data instead")
+    args = parser.parse_args()
+    asyncio.run(main(args.scale, args.reset))
@@ -0,0 +1,62 @@
+"""
+Script to check every parameterless GET route against its query budget
+Runs the app in-process with QUERY_BUDGET_MODE=raise, calls each route as the
+admin and fails on routes that exceed their @query_budget (or
+QUERY_BUDGET_DEFAULT) or repeat a statement (likely N+1), including routes
+that catch the error and answer normally. Most useful against
+a database with realistic data, where an N+1 shows up as many queries.
+Usage: python check_query_budgets.py   (exits with status 1 on a violation, for CI)
+"""
+import os
+import sys
+
+os.environ["QUERY_BUDGET_MODE"] = "raise"
+# Per-route query counts are read from the metrics middleware
+os.environ["METRICS_ENABLED"] = "true"
+
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from app.core.metrics import QUERY_BUDGET_VIOLATIONS, REQUEST_DB_QUERIES
+from app.main import app
+
+# Routes that stream large bodies or only proxy files
+SKIPPED_PATHS = {"/metrics", "/api/admin/blackbook/download", "/api/blackbook/download", "/api/projects/download/me"}
+
+def main() -> int:
+    print("=" * 60)
+    print("QUERY BUDGET CHECK")
+    print("=" * 60)
+    paths = [
+        path for path, operations in app.openapi()["paths"].items()
+        if "get" in operations and "{" not in path and path not in SKIPPED_PATHS
+    ]
+    failures = []
+    with TestClient(app, raise_server_exceptions=False) as client:
+        # Logging in is not one of the checked routes
+        settings.QUERY_BUDGET_MODE = "log"
+        login = client.post("/api/auth/login", json={"email": settings.ADMIN_EMAIL, "password": settings.ADMIN_PASSWORD})
+        if login.status_code != 200:
+            print(f"❌ Admin login failed: {login.status_code} {login.text[:200]}")
+            return 1
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        settings.QUERY_BUDGET_MODE = "raise"
+
+        for path in paths:
+            before = REQUEST_DB_QUERIES.snapshot(method="GET", route=path)[1]
+            violations = QUERY_BUDGET_VIOLATIONS.value(route=path)
+            response = client.get(path, headers=headers)
+            queries = int(REQUEST_DB_QUERIES.snapshot(method="GET", route=path)[1] - before)
+            if QUERY_BUDGET_VIOLATIONS.value(route=path) > violations:
+                failures.append(path)
+                print(f"   ❌ {path}: {queries} queries, over budget or repeating a statement (HTTP {response.status_code})")
+            else:
+                print(f"   {path}: {queries} queries (HTTP {response.status_code})")
+
+    if failures:
+        print(f"\n❌ {len(failures)} of {len(paths)} route(s) over budget")
+        return 1
+    print(f"\n✅ {len(paths)} route(s) within budget")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
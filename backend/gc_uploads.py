@@ -0,0 +1,32 @@
+"""
+Script to garbage-collect deduplicated upload blobs
+Removes files under uploads/blobs that no synopsis, order or project references
+Usage: python gc_uploads.py [--dry-run] [--grace-hours N]
+"""
+import argparse
+import asyncio
+from datetime import timedelta
+from app.core.database import AsyncSessionLocal, async_engine
+from app.services.blob_store import collect_garbage
+
+async def main(dry_run: bool, grace_hours: float):
+    print("=" * 60)
+    print(f"UPLOAD BLOB GC{' (DRY RUN)' if dry_run else ''}")
+    print("=" * 60)
+    try:
+        async with AsyncSessionLocal() as db:
+            stats = await collect_garbage(db, grace=timedelta(hours=grace_hours), dry_run=dry_run)
+        for key, value in stats.items():
+            print(f"   {key}: {value}")
+        print(f"\n✅ Freed {stats['bytes_freed'] / (1024 * 1024):.1f}MB")
+    except Exception as e:
+        print(f"❌ Error during blob GC: {e}")
+    finally:
+        await async_engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Garbage-collect unreferenced upload blobs")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be removed")
+    parser.add_argument("--grace-hours", type=float, default=1.0, help="Keep unreferenced blobs newer than this")
+    args = parser.parse_args()
+    asyncio.run(main(args.dry_run, args.grace_hours))
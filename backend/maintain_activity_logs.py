@@ -0,0 +1,28 @@
+"""
+Script to maintain the partitioned activity_logs table
+Creates upcoming monthly partitions, refreshes daily rollups and drops
+partitions older than ACTIVITY_LOG_RETENTION_MONTHS (the app also does this
+on startup and every ACTIVITY_LOG_MAINTENANCE_INTERVAL_HOURS)
+Usage: python maintain_activity_logs.py
+"""
+import asyncio
+from app.core.database import AsyncSessionLocal, async_engine
+from app.services.activity_partitions import run_maintenance
+
+async def main():
+    print("=" * 60)
+    print("ACTIVITY LOG MAINTENANCE")
+    print("=" * 60)
+    try:
+        async with AsyncSessionLocal() as db:
+            stats = await run_maintenance(db)
+        for key, value in stats.items():
+            print(f"   {key}: {value}")
+        print("\n✅ Activity log maintenance complete")
+    except Exception as e:
+        print(f"❌ Error during activity log maintenance: {e}")
+    finally:
+        await async_engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,27 @@
+"""
+Script to rebuild the admin dashboard counters from scratch
+Fixes drift in admin_stats after raw SQL changes or a restore
+Usage: python recompute_stats.py
+"""
+import asyncio
+from app.core.database import AsyncSessionLocal, async_engine
+from app.services.admin_stats import recompute_stats
+
+async def main():
+    print("=" * 60)
+    print("RECOMPUTE ADMIN STATS")
+    print("=" * 60)
+    try:
+        async with AsyncSessionLocal() as db:
+            result = await recompute_stats(db)
+        for name, value in result["counts"].items():
+            drift = result["drift"].get(name)
+            print(f"   {name}: {value}" + (f" (corrected by {drift:+d})" if drift else ""))
+        print(f"\n✅ {len(result['drift'])} counter(s) corrected")
+    except Exception as e:
+        print(f"❌ Error recomputing stats: {e}")
+    finally:
+        await async_engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
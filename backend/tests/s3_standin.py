@@ -0,0 +1,120 @@
+"""
+In-process MinIO-style stand-in for S3Storage tests.
+
+Pass an S3StandIn as the httpx transport of an S3Storage. It keeps objects
+in memory, rejects requests whose SigV4 signature does not match, and
+implements the calls the driver makes: PUT, GET (with a single Range),
+HEAD, DELETE and paginated ListObjectsV2.
+"""
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, unquote, urlsplit
+from xml.sax.saxutils import escape
+from app.services.storage import sigv4_signature
+import hashlib
+import re
+import httpx
+
+_AUTHORIZATION = re.compile(r"Credential=([^/]+)/[^,]+, SignedHeaders=([^,]+), Signature=(\w+)")
+
+class S3StandIn(httpx.AsyncBaseTransport):
+    def __init__(self, bucket: str, access_key: str, secret_key: str, region: str = "us-east-1", page_size: int = 1000):
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.page_size = page_size
+        self.objects: Dict[str, bytes] = {}
+        self.requests = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        body = await request.aread()
+        path = unquote(request.url.path)
+        params = dict(parse_qsl(request.url.query.decode(), keep_blank_values=True))
+        if not self._authorized(request, path, params, body):
+            return httpx.Response(403, text="<Error><Code>SignatureDoesNotMatch</Code></Error>")
+        bucket, _, key = path.lstrip("/").partition("/")
+        if bucket != self.bucket:
+            return httpx.Response(404, text="<Error><Code>NoSuchBucket</Code></Error>")
+
+        if request.method == "PUT":
+            self.objects[key] = body
+            return httpx.Response(200, headers={"etag": self._etag(body)})
+        if request.method == "DELETE":
+            self.objects.pop(key, None)
+            return httpx.Response(204)
+        if request.method == "GET" and not key:
+            return self._list(params)
+        if request.method in ("GET", "HEAD"):
+            return self._get(request, key)
+        return httpx.Response(405)
+
+    def verify_presigned(self, url: str) -> bool:
+        parts = urlsplit(url)
+        params = dict(parse_qsl(parts.query, keep_blank_values=True))
+        signature = params.pop("X-Amz-Signature", "")
+        expected, _ = sigv4_signature(
+            self.secret_key, self.region, params.get("X-Amz-Date", ""), "GET", unquote(parts.path),
+            params, {"host": parts.netloc}, "UNSIGNED-PAYLOAD"
+        )
+        return signature == expected
+
+    def _authorized(self, request: httpx.Request, path: str, params: Dict[str, str], body: bytes) -> bool:
+        match = _AUTHORIZATION.search(request.headers.get("authorization", ""))
+        if match is None or match.group(1) != self.access_key:
+            return False
+        payload_hash = request.headers.get("x-amz-content-sha256", "")
+        if payload_hash != "UNSIGNED-PAYLOAD" and request.method == "PUT" and payload_hash != hashlib.sha256(body).hexdigest():
+            return False
+        headers = {name: request.headers.get(name, "") for name in match.group(2).split(";")}
+        expected, _ = sigv4_signature(
+            self.secret_key, self.region, request.headers.get("x-amz-date", ""), request.method, path,
+            params, headers, payload_hash
+        )
+        return expected == match.group(3)
+
+    def _etag(self, body: bytes) -> str:
+        return f'"{hashlib.md5(body).hexdigest()}"'
+
+    def _get(self, request: httpx.Request, key: str) -> httpx.Response:
+        body = self.objects.get(key)
+        if body is None:
+            return httpx.Response(404, text="<Error><Code>NoSuchKey</Code></Error>")
+        headers = {"etag": self._etag(body), "accept-ranges": "bytes"}
+        if request.headers.get("if-none-match") == headers["etag"]:
+            return httpx.Response(304, headers=headers)
+        status, content = 200, body
+        byte_range = self._range(request.headers.get("range"), len(body))
+        if byte_range is not None:
+            start, end = byte_range
+            status, content = 206, body[start:end + 1]
+            headers["content-range"] = f"bytes {start}-{end}/{len(body)}"
+        headers["content-length"] = str(len(content))
+        return httpx.Response(status, headers=headers, content=b"" if request.method == "HEAD" else content)
+
+    def _range(self, header: Optional[str], size: int):
+        match = re.fullmatch(r"bytes=(\d*)-(\d*)", header or "")
+        if match is None or not (match.group(1) or match.group(2)):
+            return None
+        if not match.group(1):
+            return max(0, size - int(match.group(2))), size - 1
+        end = int(match.group(2)) if match.group(2) else size - 1
+        return int(match.group(1)), min(end, size - 1)
+
+    def _list(self, params: Dict[str, str]) -> httpx.Response:
+        keys = sorted(key for key in self.objects if key.startswith(params.get("prefix", "")))
+        start = int(params.get("continuation-token") or 0)
+        page = keys[start:start + self.page_size]
+        truncated = start + self.page_size < len(keys)
+        modified = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+        contents = "".join(
+            f"<Contents><Key>{escape(key)}</Key><Size>{len(self.objects[key])}</Size>"
+            f"<LastModified>{modified}</LastModified></Contents>"
+            for key in page
+        )
+        token = f"<NextContinuationToken>{start + self.page_size}</NextContinuationToken>" if truncated else ""
+        return httpx.Response(200, text=(
+            '<ListBucketResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+            f"<IsTruncated>{'true' if truncated else 'false'}</IsTruncated>{token}{contents}</ListBucketResult>"
+        ))
@@ -0,0 +1,39 @@
+import pytest
+from app.core.config import settings
+from app.routers import chatbot
+from app.services.chat_context import session_transcripts
+from app.services.llm_gateway import LLMResult
+
+PLAN = {"plan_name": "Basic", "plan_features": ["Project guidance", "Synopsis review"]}
+
+@pytest.fixture
+def provider(monkeypatch):
+    """Replaces the LLM gateway; records the messages of every call"""
+    calls = []
+
+    async def complete(candidates, hedge=None):
+        calls.append(candidates[0].payload["messages"])
+        return LLMResult(content=f"Reply {len(calls)}", provider="groq", latency_ms=1)
+
+    monkeypatch.setattr(settings, "GROQ_API_KEY", "test-key")
+    monkeypatch.setattr(chatbot.gateway, "complete", complete)
+    return calls
+
+def conversation(messages):
+    return [(message["role"], message["content"]) for message in messages if message["role"] != "system"]
+
+def test_delta_session_starts_with_the_greeting(client, admin_headers, provider):
+    first = client.post("/api/chatbot/chat", headers=admin_headers, json={**PLAN, "message": "Asha"}).json()
+    greeting = chatbot.chat_greeting("Basic", PLAN["plan_features"])
+    assert conversation(provider[0]) == [("assistant", greeting), ("user", "Asha")]
+    assert first["turn"] == 1
+
+    # Another worker (or an expired cache entry) rebuilds the session from ChatbotHistory
+    session_transcripts.cache.clear()
+    second = client.post("/api/chatbot/chat", headers=admin_headers, json={
+        **PLAN, "message": "A smart irrigation system", "session_id": first["session_id"], "turn": first["turn"]
+    }).json()
+    assert conversation(provider[1]) == [
+        ("assistant", greeting), ("user", "Asha"), ("assistant", "Reply 1"), ("user", "A smart irrigation system")
+    ]
+    assert second["turn"] == 2
@@ -0,0 +1,94 @@
+import os
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.services.downloads import CachedFileResponse, parse_range
+
+CONTENT = bytes(range(256)) * 40  # 10240 bytes
+ETAG = '"0123abcd"'
+
+@pytest.fixture
+def client(tmp_path):
+    path = tmp_path / "project.zip"
+    path.write_bytes(CONTENT)
+    app = FastAPI()
+
+    @app.api_route("/file", methods=["GET", "HEAD"])
+    async def download():
+        return CachedFileResponse(
+            path=str(path),
+            filename="project.zip",
+            media_type="application/zip",
+            stat_result=os.stat(path),
+            headers={"ETag": ETAG, "Cache-Control": "private, no-cache", "Accept-Ranges": "bytes"}
+        )
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+def test_parse_range():
+    assert parse_range("bytes=0-99", 1000) == [(0, 99)]
+    assert parse_range("bytes=900-", 1000) == [(900, 999)]
+    assert parse_range("bytes=-100", 1000) == [(900, 999)]
+    assert parse_range("bytes=0-5000", 1000) == [(0, 999)]
+    assert parse_range("bytes=500-599, 0-99, 90-199", 1000) == [(0, 199), (500, 599)]
+    assert parse_range("bytes=1000-", 1000) == []
+    assert parse_range("bytes=5-1", 1000) is None
+    assert parse_range("items=0-1", 1000) is None
+    assert parse_range("bytes=" + ",".join(f"{n * 10}-{n * 10}" for n in range(20)), 1000) is None
+
+def test_full_download(client):
+    response = client.get("/file")
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["etag"] == ETAG
+
+def test_single_range(client):
+    response = client.get("/file", headers={"Range": "bytes=100-199"})
+    assert response.status_code == 206
+    assert response.content == CONTENT[100:200]
+    assert response.headers["content-range"] == f"bytes 100-199/{len(CONTENT)}"
+    assert response.headers["content-length"] == "100"
+    assert response.headers["content-type"] == "application/zip"
+    assert response.headers["etag"] == ETAG
+
+def test_resume_from_offset(client):
+    response = client.get("/file", headers={"Range": "bytes=10000-", "If-Range": ETAG})
+    assert response.status_code == 206
+    assert response.content == CONTENT[10000:]
+
+def test_multiple_ranges(client):
+    response = client.get("/file", headers={"Range": "bytes=0-9, 5000-5009"})
+    assert response.status_code == 206
+    content_type = response.headers["content-type"]
+    assert content_type.startswith("multipart/byteranges; boundary=")
+    boundary = content_type.split("boundary=")[1]
+    assert int(response.headers["content-length"]) == len(response.content)
+    parts = response.content.split(f"--{boundary}".encode())
+    assert parts[0] == b"" and parts[-1] == b"--\r\n"
+    bodies = [part.split(b"\r\n\r\n", 1)[1].removesuffix(b"\r\n") for part in parts[1:-1]]
+    assert bodies == [CONTENT[0:10], CONTENT[5000:5010]]
+    assert f"content-range: bytes 5000-5009/{len(CONTENT)}".encode() in parts[2]
+
+def test_unsatisfiable_range(client):
+    response = client.get("/file", headers={"Range": f"bytes={len(CONTENT)}-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(CONTENT)}"
+
+def test_stale_if_range_sends_whole_file(client):
+    response = client.get("/file", headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+    assert response.status_code == 200
+    assert response.content == CONTENT
+
+def test_head_range(client):
+    response = client.head("/file", headers={"Range": "bytes=0-9"})
+    assert response.status_code == 206
+    assert response.headers["content-length"] == "10"
+    assert response.content == b""
+
+def test_matching_etag_is_not_modified(client):
+    response = client.get("/file", headers={"If-None-Match": ETAG, "Range": "bytes=0-9"})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == ETAG
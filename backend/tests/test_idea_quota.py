@@ -0,0 +1,59 @@
+import uuid
+import pytest
+from sqlalchemy import delete, or_
+from app.core.database import SessionLocal
+from app.core.security import create_access_token
+from app.models import IdeaQuota, IdeaSubmission
+from app.routers.idea_generation import MAX_GENERATIONS_PER_USER
+from app.services import idea_quota
+
+@pytest.fixture
+def quota_subjects(migrated_db):
+    """A fresh user id and two phone numbers; their counters and submissions are deleted afterwards"""
+    user_id = str(uuid.uuid4())
+    phones = ["+91 " + str(uuid.uuid4().int)[:10] for _ in range(2)]
+    yield user_id, phones
+    idea_quota.count_cache.clear()
+    with SessionLocal() as db:
+        db.execute(delete(IdeaSubmission).where(or_(IdeaSubmission.user_id == user_id, IdeaSubmission.phone.in_(phones))))
+        db.execute(delete(IdeaQuota).where(IdeaQuota.subject.in_([user_id, *map(idea_quota.normalize_phone, phones)])))
+        db.commit()
+
+def submit(client, phone, headers=None):
+    return client.post("/api/idea-generation/submit-idea", headers=headers or {}, json={
+        "name": "Asha", "phone": phone, "interests": "IoT", "generated_idea": "Smart irrigation"
+    }).json()
+
+def test_logged_in_submission_charges_user_and_phone(client, quota_subjects):
+    user_id, (phone, other_phone) = quota_subjects
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': user_id})}"}
+
+    assert submit(client, phone, headers)["generation_count"] == 1
+    # The same person as a guest, then logged in with another phone: each counter moves separately
+    assert submit(client, phone)["generation_count"] == 2
+    assert submit(client, other_phone, headers)["generation_count"] == 2
+
+    with SessionLocal() as db:
+        counts = {(quota.kind, quota.subject): quota.count for quota in db.query(IdeaQuota).filter(
+            IdeaQuota.subject.in_([user_id, idea_quota.normalize_phone(phone), idea_quota.normalize_phone(other_phone)])
+        )}
+    assert counts == {
+        ("user", user_id): 2,
+        ("phone", idea_quota.normalize_phone(phone)): 2,
+        ("phone", idea_quota.normalize_phone(other_phone)): 1,
+    }
+
+    count = client.get("/api/idea-generation/count", headers=headers).json()
+    assert count["count"] == 2 and count["remaining"] == MAX_GENERATIONS_PER_USER - 2
+
+def test_exhausted_user_quota_blocks_a_new_phone(client, quota_subjects):
+    user_id, (phone, _) = quota_subjects
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': user_id})}"}
+    with SessionLocal() as db:
+        db.add(IdeaQuota(kind="user", subject=user_id, count=MAX_GENERATIONS_PER_USER))
+        db.commit()
+
+    assert submit(client, phone, headers)["limit_reached"]
+    assert not client.get("/api/idea-generation/count", headers=headers, params={"phone": phone}).json()["can_generate"]
+    # The phone's claim was rolled back with the refused submission
+    assert client.get("/api/idea-generation/count", params={"phone": phone}).json()["count"] == 0
@@ -0,0 +1,67 @@
+"""
+Query budgets of the admin list routes, checked against seeded data so an
+N+1 (a lazy load or a per-row query) fails CI instead of reaching
+production. Each list is read in offset mode, as a first cursor page and
+as the page after it.
+"""
+import pytest
+from sqlalchemy import text
+from app.core.database import SessionLocal
+from app.core.query_budget import QueryBudgetExceeded
+from tests.conftest import SEEDED_STUDENTS
+
+def check_list_route(within_budget, admin_headers, path: str):
+    rows = within_budget(path, admin_headers).json()
+    assert len(rows) >= SEEDED_STUDENTS
+
+    first = within_budget(path, admin_headers, {"cursor": "", "limit": 5}).json()
+    assert len(first["items"]) == 5 and first["next_cursor"]
+    second = within_budget(path, admin_headers, {"cursor": first["next_cursor"], "limit": 5}).json()
+    assert not {item["id"] for item in first["items"]} & {item["id"] for item in second["items"]}
+
+def test_users_get_all_users(within_budget, admin_headers):
+    check_list_route(within_budget, admin_headers, "/api/users/")
+
+def test_meetings_get_all_meetings(within_budget, admin_headers):
+    check_list_route(within_budget, admin_headers, "/api/meetings/all")
+
+@pytest.mark.parametrize("path", ["/api/orders/all", "/api/orders/all/list"])
+def test_orders_admin_lists(within_budget, admin_headers, path):
+    check_list_route(within_budget, admin_headers, path)
+
+def test_projects_get_all_projects(within_budget, admin_headers):
+    rows = within_budget("/api/projects/all", admin_headers).json()
+    assert len(rows) >= SEEDED_STUDENTS
+
+def test_projects_list_projects(within_budget, admin_headers):
+    check_list_route(within_budget, admin_headers, "/api/projects/all/list")
+
+@pytest.mark.parametrize("path", ["/api/synopsis/all", "/api/synopsis/all/list"])
+def test_synopsis_admin_lists(within_budget, admin_headers, path):
+    check_list_route(within_budget, admin_headers, path)
+
+def test_admin_get_all_requests(within_budget, admin_headers):
+    check_list_route(within_budget, admin_headers, "/api/admin/requests")
+
+def test_admin_list_students(within_budget, admin_headers):
+    check_list_route(within_budget, admin_headers, "/api/admin/students")
+    students = within_budget("/api/admin/students", admin_headers, {"search": "tests.example.com"}).json()
+    assert len(students) == SEEDED_STUDENTS
+    assert all(student["projects"] and student["meetings"] and student["latest_order"] for student in students)
+    for student in students:
+        if student["has_paid"]:
+            assert student["latest_order"]["status"] == "pending"
+            assert student["current_order"]["status"] == "completed" and student["total_paid"] == 4999
+        else:
+            assert student["current_order"] == student["latest_order"] and student["total_paid"] == 0
+
+def test_admin_get_stats(within_budget, admin_headers):
+    stats = within_budget("/api/admin/stats", admin_headers).json()
+    assert stats["total_users"] >= SEEDED_STUDENTS + 1
+
+def test_query_budget_fixture_flags_repeated_statements(query_budget, migrated_db):
+    with pytest.raises(QueryBudgetExceeded, match="likely N\\+1"):
+        with query_budget(50, "per-row loop"):
+            with SessionLocal() as db:
+                for _ in range(SEEDED_STUDENTS):
+                    db.execute(text("SELECT 1"))
@@ -0,0 +1,38 @@
+import pytest
+from starlette.requests import Request
+from app.core.config import settings
+from app.core.rate_limit import requester_identity
+from app.core.security import create_access_token
+
+def make_request(*forwarded_for: str, authorization: str = None) -> Request:
+    headers = [(b"x-forwarded-for", value.encode()) for value in forwarded_for]
+    if authorization:
+        headers.append((b"authorization", authorization.encode()))
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers, "client": ("10.0.0.2", 5000)})
+
+@pytest.fixture
+def proxy_hops(monkeypatch):
+    def set_hops(hops: int):
+        monkeypatch.setattr(settings, "TRUSTED_PROXY_HOPS", hops)
+    set_hops(0)
+    return set_hops
+
+def test_guest_is_keyed_on_peer_without_trusted_proxies(proxy_hops):
+    assert requester_identity(make_request()) == "ip:10.0.0.2"
+    assert requester_identity(make_request("203.0.113.9")) == "ip:10.0.0.2"
+
+def test_spoofed_forwarded_for_entries_are_ignored(proxy_hops):
+    proxy_hops(1)
+    # The client sent "1.1.1.1"; the load balancer appended the address it saw
+    assert requester_identity(make_request("1.1.1.1, 198.51.100.7")) == "ip:198.51.100.7"
+    assert requester_identity(make_request("1.1.1.1", "198.51.100.7")) == "ip:198.51.100.7"
+    proxy_hops(2)
+    assert requester_identity(make_request("1.1.1.1, 198.51.100.7, 10.0.0.1")) == "ip:198.51.100.7"
+
+def test_too_few_forwarded_entries_fall_back_to_peer(proxy_hops):
+    proxy_hops(2)
+    assert requester_identity(make_request("198.51.100.7")) == "ip:10.0.0.2"
+
+def test_bearer_token_is_keyed_on_user(proxy_hops):
+    token = create_access_token({"sub": "user-1"})
+    assert requester_identity(make_request("1.1.1.1", authorization=f"Bearer {token}")) == "user:user-1"
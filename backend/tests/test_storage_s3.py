@@ -0,0 +1,119 @@
+import asyncio
+import hashlib
+import pytest
+from app.services.storage import S3Storage, StorageError
+from tests.s3_standin import S3StandIn
+
+BUCKET = "uploads-test"
+
+def make_storage(standin: S3StandIn, secret_key: str = "test-secret") -> S3Storage:
+    return S3Storage(
+        endpoint_url="http://minio.test:9000",
+        public_endpoint_url="https://files.example.com",
+        bucket=BUCKET,
+        region="us-east-1",
+        access_key="test-access",
+        secret_key=secret_key,
+        transport=standin
+    )
+
+@pytest.fixture
+def standin() -> S3StandIn:
+    return S3StandIn(BUCKET, "test-access", "test-secret")
+
+def write_file(tmp_path, content: bytes) -> str:
+    path = tmp_path / "upload.part"
+    path.write_bytes(content)
+    return str(path)
+
+def test_save_open_delete_roundtrip(standin, tmp_path):
+    content = b"%PDF-1.4 " + bytes(range(256)) * 64
+    source = write_file(tmp_path, content)
+    key = "uploads/blobs/ab/cd/report.pdf"
+
+    async def run():
+        storage = make_storage(standin)
+        try:
+            await storage.save(source, key, "application/pdf", hashlib.sha256(content).hexdigest())
+            assert await storage.exists(key)
+            stream = await storage.open(key)
+            body = b"".join([chunk async for chunk in stream.chunks])
+            await storage.delete(key)
+            return body, await storage.exists(key)
+        finally:
+            await storage.close()
+
+    body, exists_after_delete = asyncio.run(run())
+    assert body == content
+    assert standin.objects == {}
+    assert not exists_after_delete
+    assert not (tmp_path / "upload.part").exists()
+
+def test_open_missing_object_raises_file_not_found(standin):
+    async def run():
+        storage = make_storage(standin)
+        try:
+            await storage.open("uploads/blobs/missing.zip")
+        finally:
+            await storage.close()
+
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(run())
+
+def test_open_forwards_range_and_validators(standin):
+    standin.objects["uploads/project.zip"] = bytes(range(100))
+
+    async def run():
+        storage = make_storage(standin)
+        try:
+            partial = await storage.open("uploads/project.zip", {"range": "bytes=10-19"})
+            body = b"".join([chunk async for chunk in partial.chunks])
+            etag = partial.headers["etag"]
+            unchanged = await storage.open("uploads/project.zip", {"if-none-match": etag})
+            return partial, body, unchanged
+        finally:
+            await storage.close()
+
+    partial, body, unchanged = asyncio.run(run())
+    assert partial.status == 206
+    assert body == bytes(range(10, 20))
+    assert partial.headers["content-range"] == "bytes 10-19/100"
+    assert unchanged.status == 304
+
+def test_list_follows_continuation_tokens(standin):
+    standin.page_size = 2
+    for index in range(5):
+        standin.objects[f"uploads/blobs/{index}.bin"] = b"x" * index
+    standin.objects["uploads/other/skip.bin"] = b"y"
+
+    async def run():
+        storage = make_storage(standin)
+        try:
+            return [item async for item in storage.list("uploads/blobs/")]
+        finally:
+            await storage.close()
+
+    listed = asyncio.run(run())
+    assert [item.key for item in listed] == [f"uploads/blobs/{index}.bin" for index in range(5)]
+    assert [item.size for item in listed] == list(range(5))
+
+def test_wrong_secret_is_rejected(standin, tmp_path):
+    source = write_file(tmp_path, b"data")
+
+    async def run():
+        storage = make_storage(standin, secret_key="wrong-secret")
+        try:
+            await storage.save(source, "uploads/blobs/data.bin")
+        finally:
+            await storage.close()
+
+    with pytest.raises(StorageError):
+        asyncio.run(run())
+    assert standin.objects == {}
+
+def test_presigned_url_uses_public_endpoint_and_verifies(standin):
+    storage = make_storage(standin)
+    url = storage.presigned_url("uploads/blobs/a b.zip", filename="My Project.zip", cache_control="private, no-cache")
+    assert url.startswith(f"https://files.example.com/{BUCKET}/uploads/blobs/a%20b.zip?")
+    assert standin.verify_presigned(url)
+    assert not standin.verify_presigned(url.replace("no-cache", "max-age%3D60"))
@@ -43,6 +43,10 @@ const Chatbot = ({ plan, onClose, onFinalize }: ChatbotProps) => {
   // No need for frontend API keys
   const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000';
   const [sessionId, setSessionId] = useState<string | null>(null);
+  // Exchanges the server has recorded for this session; it keeps the transcript, so only the new message is sent
+  const [turn, setTurn] = useState(0);
+  // Once a reply came from the local fallback the server's transcript lacks that turn, so the whole conversation is sent instead
+  const [sendFullTranscript, setSendFullTranscript] = useState(false);
 
   const scrollToBottom = () => {
     messagesEndRef.current?.scrollIntoView({ behavior: "smooth" });
@@ -59,6 +63,9 @@ const Chatbot = ({ plan, onClose, onFinalize }: ChatbotProps) => {
         content: `Hello! You've selected the ${plan.name}. This plan includes: ${plan.features.join(', ')}. To get started, please tell me your name.`
       };
       setMessages([initialMessage]);
+      setSessionId(null);
+      setTurn(0);
+      setSendFullTranscript(false);
       setError(null);
     } catch (err) {
       console.error('Error initializing chat:', err);
@@ -148,8 +155,10 @@ Assistant: "Nice to meet you, Sarah! What's the name of your project?"`;
       try {
         const token = localStorage.getItem('tyforge_token');
         const response = await axios.post(`${API_BASE_URL}/api/chatbot/chat`, {
-          messages: newMessages.map(msg => ({ role: msg.role, content: msg.content })),
+          ...(sendFullTranscript ? { messages: newMessages } : { message: userInput, turn }),
           plan_name: plan.name,
+          // The server opens a new session with the same greeting shown above
+          plan_features: plan.features,
           session_id: sessionId
         }, {
           headers: {
@@ -159,6 +168,7 @@ Assistant: "Nice to meet you, Sarah! What's the name of your project?"`;
         
         const data = response.data;
         setSessionId(data.session_id);
+        setTurn(data.turn);
         
         const botMessage = data.message;
         const aiTriggeredFinalize = data.should_finalize;
@@ -193,6 +203,7 @@ Assistant: "Nice to meet you, Sarah! What's the name of your project?"`;
         
         setShowFinalize(userTriggeredFinalize || aiTriggeredFinalize);
         setMessages(prev => [...prev, { role: 'assistant', content: botMessage }]);
+        setSendFullTranscript(true);
       }
     } catch (error) {
       console.error('Chat API Error:', error);
@@ -208,6 +219,7 @@ Assistant: "Nice to meet you, Sarah! What's the name of your project?"`;
         const fallbackResponse = getChatbotFallbackResponse(userInput, plan, conversationContext);
         
         setMessages(prev => [...prev, { role: 'assistant', content: fallbackResponse }]);
+        setSendFullTranscript(true);
         
         // Show finalize if the fallback suggests it
         if (fallbackResponse.includes('[FINALIZE]')) {
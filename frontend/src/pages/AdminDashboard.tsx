@@ -51,6 +51,22 @@ const adminApiCall = async (endpoint: string, options: any = {}) => {
   return res.json();
 };
 
+// Each tab shows one cursor page at a time instead of the whole table
+const PAGE_SIZE = 50;
+const LIST_PATHS = {
+  users: '/api/users/',
+  projects: '/api/projects/all/list',
+  orders: '/api/orders/all',
+  meetings: '/api/meetings/all',
+  requests: '/api/admin/requests',
+  synopsis: '/api/synopsis/all',
+};
+type ListName = keyof typeof LIST_PATHS;
+const LIST_NAMES = Object.keys(LIST_PATHS) as ListName[];
+
+const fetchPage = (list: ListName, cursor = '') =>
+  adminApiCall(`${LIST_PATHS[list]}?cursor=${encodeURIComponent(cursor)}&limit=${PAGE_SIZE}`);
+
 const AdminDashboard = () => {
   const navigate = useNavigate();
   const [loading, setLoading] = useState(true);
@@ -68,6 +84,16 @@ const AdminDashboard = () => {
   const [meetings, setMeetings] = useState<any[]>([]);
   const [adminRequests, setAdminRequests] = useState<any[]>([]);
   const [synopsis, setSynopsis] = useState<any[]>([]);
+  const [nextCursors, setNextCursors] = useState<Partial<Record<ListName, string | null>>>({});
+  const [loadingMore, setLoadingMore] = useState<ListName | null>(null);
+  const setters = {
+    users: setUsers,
+    projects: setProjects,
+    orders: setOrders,
+    meetings: setMeetings,
+    requests: setAdminRequests,
+    synopsis: setSynopsis,
+  };
   
   // Request approval dialog state
   const [selectedRequest, setSelectedRequest] = useState<any>(null);
@@ -91,22 +117,13 @@ const AdminDashboard = () => {
       const statsData = await adminApiCall('/api/admin/stats');
       setStats(statsData);
 
-      // Fetch all data
-      const [usersData, projectsData, ordersData, meetingsData, requestsData, synopsisData] = await Promise.all([
-        adminApiCall('/api/users/').catch(() => []),
-        adminApiCall('/api/projects/all').catch(() => []),
-        adminApiCall('/api/orders/all').catch(() => []),
-        adminApiCall('/api/meetings/all').catch(() => []),
-        adminApiCall('/api/admin/requests').catch(() => []),
-        adminApiCall('/api/synopsis/all').catch(() => [])
-      ]);
-
-      setUsers(usersData);
-      setProjects(projectsData);
-      setOrders(ordersData);
-      setMeetings(meetingsData);
-      setAdminRequests(requestsData);
-      setSynopsis(synopsisData);
+      // Fetch the first page of every list
+      const pages = await Promise.all(
+        LIST_NAMES.map((list) => fetchPage(list).catch(() => ({ items: [], next_cursor: null })))
+      );
+
+      LIST_NAMES.forEach((list, index) => setters[list](pages[index].items));
+      setNextCursors(Object.fromEntries(LIST_NAMES.map((list, index) => [list, pages[index].next_cursor])));
     } catch (error: any) {
       handleApiError(error, 'Failed to load admin data');
       if (error.message.includes('403') || error.message.includes('401')) {
@@ -125,6 +142,29 @@ const AdminDashboard = () => {
     navigate('/admin/login');
   };
 
+  const loadMore = async (list: ListName) => {
+    try {
+      setLoadingMore(list);
+      const page = await fetchPage(list, nextCursors[list] || '');
+      setters[list]((rows: any[]) => [...rows, ...page.items]);
+      setNextCursors((cursors) => ({ ...cursors, [list]: page.next_cursor }));
+    } catch (error: any) {
+      handleApiError(error, 'Failed to load more');
+    } finally {
+      setLoadingMore(null);
+    }
+  };
+
+  const countLabel = (list: ListName, rows: any[]) => `${rows.length}${nextCursors[list] ? '+' : ''}`;
+
+  const renderLoadMore = (list: ListName) => nextCursors[list] && (
+    <div className="flex justify-center mt-4">
+      <Button variant="outline" size="sm" disabled={loadingMore === list} onClick={() => loadMore(list)}>
+        {loadingMore === list ? 'Loading...' : 'Load more'}
+      </Button>
+    </div>
+  );
+
   const handleDeleteUser = async (userId: string) => {
     if (!confirm('Are you sure you want to delete this user?')) return;
     
@@ -318,12 +358,12 @@ const AdminDashboard = () => {
         {/* Main Content Tabs */}
         <Tabs defaultValue="users" className="space-y-6">
           <TabsList className="grid w-full grid-cols-6 bg-white shadow-md">
-            <TabsTrigger value="users">Users ({users.length})</TabsTrigger>
-            <TabsTrigger value="projects">Projects ({projects.length})</TabsTrigger>
-            <TabsTrigger value="orders">Orders ({orders.length})</TabsTrigger>
-            <TabsTrigger value="meetings">Meetings ({meetings.length})</TabsTrigger>
-            <TabsTrigger value="requests">Requests ({adminRequests.length})</TabsTrigger>
-            <TabsTrigger value="synopsis">Synopsis ({synopsis.length})</TabsTrigger>
+            <TabsTrigger value="users">Users ({countLabel('users', users)})</TabsTrigger>
+            <TabsTrigger value="projects">Projects ({countLabel('projects', projects)})</TabsTrigger>
+            <TabsTrigger value="orders">Orders ({countLabel('orders', orders)})</TabsTrigger>
+            <TabsTrigger value="meetings">Meetings ({countLabel('meetings', meetings)})</TabsTrigger>
+            <TabsTrigger value="requests">Requests ({countLabel('requests', adminRequests)})</TabsTrigger>
+            <TabsTrigger value="synopsis">Synopsis ({countLabel('synopsis', synopsis)})</TabsTrigger>
           </TabsList>
 
           {/* Users Tab */}
@@ -387,6 +427,7 @@ const AdminDashboard = () => {
                     </tbody>
                   </table>
                 </div>
+                {renderLoadMore('users')}
               </CardContent>
             </Card>
           </TabsContent>
@@ -438,6 +479,7 @@ const AdminDashboard = () => {
                     </tbody>
                   </table>
                 </div>
+                {renderLoadMore('projects')}
               </CardContent>
             </Card>
           </TabsContent>
@@ -497,6 +539,7 @@ const AdminDashboard = () => {
                     </tbody>
                   </table>
                 </div>
+                {renderLoadMore('orders')}
               </CardContent>
             </Card>
           </TabsContent>
@@ -642,6 +685,7 @@ const AdminDashboard = () => {
                     </tbody>
                   </table>
                 </div>
+                {renderLoadMore('meetings')}
               </CardContent>
             </Card>
           </TabsContent>
@@ -734,6 +778,7 @@ const AdminDashboard = () => {
                     </div>
                   )}
                 </div>
+                {renderLoadMore('requests')}
               </CardContent>
             </Card>
           </TabsContent>
@@ -794,6 +839,7 @@ const AdminDashboard = () => {
                     </tbody>
                   </table>
                 </div>
+                {renderLoadMore('synopsis')}
               </CardContent>
             </Card>
           </TabsContent>
@@ -63,14 +63,67 @@ interface StudentData {
     totalProjects: number;
     planName: string;
     planAmount: number;
+    totalPaid: number;
     hasPaid: boolean;
   };
 }
 
+interface StudentFilters {
+  search: string;
+  paid: string;
+  signup_step: string;
+}
+
+const PAGE_SIZE = 30;
+
+// One page of /api/admin/students, filtered on the server
+const fetchStudentPage = (filters: StudentFilters, cursor = '') => {
+  const params = new URLSearchParams({ limit: String(PAGE_SIZE), cursor });
+  Object.entries(filters).forEach(([name, value]) => {
+    if (value) params.set(name, value);
+  });
+  return adminApiCall(`/api/admin/students?${params.toString()}`);
+};
+
+// Students arrive already joined with their orders, projects, synopsis and meetings
+const toStudentData = (row: any, ideaSubmissionsData: any[]): StudentData => {
+  const { latest_order, current_order, has_paid, total_paid, projects, synopsis, meetings, ...user } = row;
+
+  // Match idea submissions to this student:
+  // 1) Prefer user_id match when available
+  // 2) Fallback to phone match (idea submissions track phone)
+  const userIdeaSubmissions = ideaSubmissionsData.filter((s: any) =>
+    (s.user_id && s.user_id === user.id) ||
+    (!s.user_id && s.phone && user.phone && String(s.phone) === String(user.phone))
+  );
+
+  // The plan shown is the newest paid order, else the latest one
+  return {
+    user,
+    projects,
+    plan: current_order,
+    synopsis,
+    meetings,
+    ideaSubmissions: userIdeaSubmissions,
+    stats: {
+      totalProjects: projects.length,
+      planName: current_order ? current_order.plan_name : 'No Plan',
+      planAmount: current_order ? current_order.amount : 0,
+      totalPaid: total_paid,
+      hasPaid: has_paid
+    }
+  };
+};
+
 const AdminStudentsGrid = () => {
   const navigate = useNavigate();
   const [loading, setLoading] = useState(true);
   const [students, setStudents] = useState<StudentData[]>([]);
+  const [ideaSubmissions, setIdeaSubmissions] = useState<any[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [searchInput, setSearchInput] = useState('');
+  const [filters, setFilters] = useState<StudentFilters>({ search: '', paid: '', signup_step: '' });
   const [selectedStudent, setSelectedStudent] = useState<StudentData | null>(null);
   const [showDetailModal, setShowDetailModal] = useState(false);
   const [projectFile, setProjectFile] = useState<File | null>(null);
@@ -95,67 +148,20 @@ const AdminStudentsGrid = () => {
       return;
     }
     fetchAllStudents();
-  }, []);
+  }, [filters]);
 
   const fetchAllStudents = async () => {
     try {
       setLoading(true);
       
-      // Fetch all data with better error logging
-      const [usersData, projectsData, ordersData, synopsisData, meetingsData, ideaSubmissionsData] = await Promise.all([
-        adminApiCall('/api/users/').catch((err) => { console.error('Failed to fetch users:', err); return []; }),
-        adminApiCall('/api/projects/all').catch((err) => { console.error('Failed to fetch projects:', err); return []; }),
-        adminApiCall('/api/orders/all').catch((err) => { console.error('Failed to fetch orders:', err); return []; }),
-        adminApiCall('/api/synopsis/all').catch((err) => { console.error('Failed to fetch synopsis:', err); return []; }),
-        adminApiCall('/api/meetings/all').catch((err) => { console.error('Failed to fetch meetings:', err); return []; }),
+      const [page, ideaSubmissionsData] = await Promise.all([
+        fetchStudentPage(filters),
         adminApiCall('/api/idea-generation/submissions').catch((err) => { console.error('Failed to fetch idea submissions:', err); return []; }),
       ]);
-      
-      console.log('📊 Data fetched:', {
-        users: usersData.length,
-        projects: projectsData.length,
-        orders: ordersData.length,
-        synopsis: synopsisData.length,
-        meetings: meetingsData.length,
-        ideaSubmissions: ideaSubmissionsData.length,
-      });
-
-      // Map students with their data
-      const studentsMap = usersData.map((user: any) => {
-        const userProjects = projectsData.filter((p: any) => p.user_id === user.id);
-        const userOrders = ordersData.filter((o: any) => o.user_id === user.id);
-        const userSynopsis = synopsisData.filter((s: any) => s.user_id === user.id);
-        const userMeetings = meetingsData.filter((m: any) => m.user_id === user.id);
-        
-        // Match idea submissions to this student:
-        // 1) Prefer user_id match when available
-        // 2) Fallback to phone match (idea submissions track phone)
-        const userIdeaSubmissions = ideaSubmissionsData.filter((s: any) =>
-          (s.user_id && s.user_id === user.id) ||
-          (!s.user_id && s.phone && user.phone && String(s.phone) === String(user.phone))
-        );
-
-        // Get single plan/order (latest or completed)
-        const userPlan = userOrders.find((o: any) => o.status === 'completed') || userOrders[0] || null;
-        const hasPaid = userPlan && userPlan.status === 'completed';
-
-        return {
-          user,
-          projects: userProjects,
-          plan: userPlan,
-          synopsis: userSynopsis,
-          meetings: userMeetings,
-          ideaSubmissions: userIdeaSubmissions,
-          stats: {
-            totalProjects: userProjects.length,
-            planName: userPlan ? userPlan.plan_name : 'No Plan',
-            planAmount: userPlan ? userPlan.amount : 0,
-            hasPaid
-          }
-        };
-      });
 
-      setStudents(studentsMap);
+      setIdeaSubmissions(ideaSubmissionsData);
+      setStudents(page.items.map((row: any) => toStudentData(row, ideaSubmissionsData)));
+      setNextCursor(page.next_cursor);
     } catch (error: any) {
       handleApiError(error, 'Failed to load students');
       if (error.message.includes('403') || error.message.includes('401')) {
@@ -167,6 +173,20 @@ const AdminStudentsGrid = () => {
     }
   };
 
+  const loadMoreStudents = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const page = await fetchStudentPage(filters, nextCursor);
+      setStudents((rows) => [...rows, ...page.items.map((row: any) => toStudentData(row, ideaSubmissions))]);
+      setNextCursor(page.next_cursor);
+    } catch (error: any) {
+      handleApiError(error, 'Failed to load more students');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleUploadProjectFile = async (studentId: string) => {
     if (!projectFile) return;
 
@@ -401,7 +421,7 @@ const AdminStudentsGrid = () => {
           <Card className="bg-gradient-to-br from-blue-500 to-blue-600 text-white border-0">
             <CardContent className="p-6">
               <Users className="w-8 h-8 mb-2 opacity-80" />
-              <p className="text-3xl font-bold">{students.length}</p>
+              <p className="text-3xl font-bold">{students.length}{nextCursor ? '+' : ''}</p>
               <p className="text-sm opacity-90">Total Students</p>
             </CardContent>
           </Card>
@@ -430,13 +450,51 @@ const AdminStudentsGrid = () => {
             <CardContent className="p-6">
               <DollarSign className="w-8 h-8 mb-2 opacity-80" />
               <p className="text-3xl font-bold">
-                ₹{students.reduce((sum, s) => sum + s.stats.planAmount, 0)}
+                ₹{students.reduce((sum, s) => sum + s.stats.totalPaid, 0)}{nextCursor ? '+' : ''}
               </p>
               <p className="text-sm opacity-90">Total Revenue</p>
             </CardContent>
           </Card>
         </div>
 
+        {/* Filters (applied on the server) */}
+        <form
+          className="flex flex-col md:flex-row gap-3 mb-6"
+          onSubmit={(e) => {
+            e.preventDefault();
+            setFilters({ ...filters, search: searchInput.trim() });
+          }}
+        >
+          <Input
+            className="md:flex-1 bg-white"
+            placeholder="Search by name, email or phone"
+            value={searchInput}
+            onChange={(e) => setSearchInput(e.target.value)}
+          />
+          <select
+            className="px-3 py-2 border rounded text-sm bg-white"
+            value={filters.paid}
+            onChange={(e) => setFilters({ ...filters, paid: e.target.value })}
+          >
+            <option value="">All payments</option>
+            <option value="true">Paid</option>
+            <option value="false">Pending payment</option>
+          </select>
+          <select
+            className="px-3 py-2 border rounded text-sm bg-white"
+            value={filters.signup_step}
+            onChange={(e) => setFilters({ ...filters, signup_step: e.target.value })}
+          >
+            <option value="">All signup steps</option>
+            <option value="basic_info">Basic Info</option>
+            <option value="plan_selection">Plan Selection</option>
+            <option value="synopsis">Synopsis</option>
+            <option value="idea_generation">Idea Generation</option>
+            <option value="completed">Completed</option>
+          </select>
+          <Button type="submit">Search</Button>
+        </form>
+
         {/* Students Grid */}
         <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
           {students.map((studentData) => (
@@ -545,10 +603,20 @@ const AdminStudentsGrid = () => {
           ))}
         </div>
 
+        {nextCursor && (
+          <div className="flex justify-center mt-8">
+            <Button variant="outline" disabled={loadingMore} onClick={loadMoreStudents}>
+              {loadingMore ? 'Loading...' : 'Load more students'}
+            </Button>
+          </div>
+        )}
+
         {students.length === 0 && (
           <div className="text-center py-12">
             <Users className="w-16 h-16 text-gray-300 mx-auto mb-4" />
-            <p className="text-gray-500">No students registered yet</p>
+            <p className="text-gray-500">
+              {Object.values(filters).some(Boolean) ? 'No students match these filters' : 'No students registered yet'}
+            </p>
           </div>
         )}
       </div>
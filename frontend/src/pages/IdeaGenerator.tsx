@@ -16,6 +16,15 @@ import { getIdeaFallbackResponse, checkQuotaStatus } from '@/utils/apiFallback';
 import { quotaManager } from '@/utils/quotaManager';
 import { API_BASE_URL } from '@/config/api';
 
+// JSON headers, with the auth token if the user is logged in (the idea endpoints also serve guests)
+const optionalAuthHeaders = (): HeadersInit => {
+  const token = localStorage.getItem("tyforge_token");
+  return {
+    'Content-Type': 'application/json',
+    ...(token ? { 'Authorization': `Bearer ${token}` } : {}),
+  };
+};
+
 const IdeaGenerator = () => {
   const [formData, setFormData] = useState({ name: "", phoneNo: "", interests: "" });
   const [generatedIdea, setGeneratedIdea] = useState("");
@@ -42,19 +51,9 @@ const IdeaGenerator = () => {
 
     try {
       // Use backend API - works for both logged-in and guest users
-      const token = localStorage.getItem("tyforge_token");
-      const headers: HeadersInit = {
-        'Content-Type': 'application/json',
-      };
-      
-      // Add auth token if user is logged in (optional)
-      if (token) {
-        headers['Authorization'] = `Bearer ${token}`;
-      }
-      
       const response = await fetch(`${API_BASE_URL}/api/idea-generation/generate`, {
         method: 'POST',
-        headers: headers,
+        headers: optionalAuthHeaders(),
         body: JSON.stringify({
           field_of_interest: interests
         })
@@ -95,7 +94,10 @@ const IdeaGenerator = () => {
     
     // Check generation limit first
     try {
-      const response = await fetch(`${API_BASE_URL}/api/idea-generation/count?phone=${formData.phoneNo}`);
+      // Logged-in users are also checked against their own quota
+      const response = await fetch(`${API_BASE_URL}/api/idea-generation/count?phone=${encodeURIComponent(formData.phoneNo)}`, {
+        headers: optionalAuthHeaders(),
+      });
       const data = await response.json();
       
       if (!data.can_generate) {
@@ -125,9 +127,7 @@ const IdeaGenerator = () => {
       // Submit to our backend
       const response = await fetch(`${API_BASE_URL}/api/idea-generation/submit-idea`, {
         method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-        },
+        headers: optionalAuthHeaders(),
         body: JSON.stringify({
           name,
           phone: phoneNo,